@@ -65,6 +65,11 @@ def run(
     input_format: Optional[str] = None,
     input_encoding: Optional[str] = None,
     ignore_sample: bool = False,
+    intermediate_format: str = "csv",
+    variant_store: bool = False,
+    mapper_cache: bool = False,
+    fuse_annotators: bool = False,
+    df_annotators: bool = False,
     uid: Optional[str] = None,
     loop=None,
     outer=None,
@@ -89,6 +94,11 @@ def run(
         skip (List[str]): Skip the specified steps. Options are `converter`, `mapper`, `annotator`, `aggregator`, `postaggregator`, and `reporter`.
         genome (Optional[str]): Genome assembly of all input files. If not given, genome assembly will be figured out or default to what is defined in lib/system/consts.py:default_assembly.
         input_encoding (Optional[str]): input_encoding
+        intermediate_format (str): Format of intermediate files between the converter, mapper, annotators, and aggregator. `csv` or `arrow`.
+        variant_store (bool): Reuse mapper and annotator outputs of variants seen in previous runs from a persistent variant store, and report how much work was reused. Its size is bounded by the `variant_store_max_entries` system option.
+        mapper_cache (bool): Reuse gene mapper results of variants mapped by previous jobs from an on-disk cache in the mapper module's directory. Its size is bounded by the `mapper_cache_max_entries` system option. Not used with `variant_store`, which reuses mapper results too.
+        fuse_annotators (bool): Run annotators without secondary inputs in as many groups as there are workers, each of which reads the shared input file once and gives each row to all annotators in the group.
+        df_annotators (bool): Run annotators which implement `annotate_df` on Polars DataFrames of their input file instead of row by row. Other annotators, and annotators with secondary inputs or a variant store, run row by row. The converter and the aggregator are not affected.
         mp (Optional[int]): Number of cores to use. Default value can be changed by `ov config system max_num_concurrent_annotators_per_job <value>`.
         primary_transcript (List[str]): primary_transcript
         modules_dir (Optional[str]): modules_dir
@@ -182,6 +192,11 @@ def run(
         input_format=input_format,
         input_encoding=input_encoding,
         ignore_sample=ignore_sample,
+        intermediate_format=intermediate_format,
+        variant_store=variant_store,
+        mapper_cache=mapper_cache,
+        fuse_annotators=fuse_annotators,
+        df_annotators=df_annotators,
         uid=uid,
         outer=outer,
     )
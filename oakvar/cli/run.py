@@ -149,7 +149,7 @@ def add_parser_ov_run(subparsers):
         dest="mp",
         type=int,
         default=1,
-        help="number of processes to use to run annotators",
+        help="number of processes to use to run converter, mapper, and annotators",
     )
     parser_ov_run.add_argument(
         "-i",
@@ -289,4 +289,39 @@ def add_parser_ov_run(subparsers):
         default=False,
         help="Ignore samples",
     )
+    parser_ov_run.add_argument(
+        "--intermediate-format",
+        dest="intermediate_format",
+        choices=["csv", "arrow"],
+        default="csv",
+        help="Format of intermediate files. arrow keeps typed columns between steps.",
+    )
+    parser_ov_run.add_argument(
+        "--variant-store",
+        dest="variant_store",
+        action="store_true",
+        default=False,
+        help="Reuse mapper and annotator outputs of variants seen in previous runs.",
+    )
+    parser_ov_run.add_argument(
+        "--mapper-cache",
+        dest="mapper_cache",
+        action="store_true",
+        default=False,
+        help="Reuse gene mapper results of variants mapped by previous jobs. Not used with --variant-store, which reuses mapper results too.",
+    )
+    parser_ov_run.add_argument(
+        "--fuse-annotators",
+        dest="fuse_annotators",
+        action="store_true",
+        default=False,
+        help="Run annotators which read the same input in groups which read it once.",
+    )
+    parser_ov_run.add_argument(
+        "--df-annotators",
+        dest="df_annotators",
+        action="store_true",
+        default=False,
+        help="Run annotators which implement annotate_df on Polars DataFrames of their input file. Other annotators run row by row.",
+    )
     parser_ov_run.set_defaults(func=cli_run)
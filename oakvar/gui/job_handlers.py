@@ -440,6 +440,46 @@ def fetch_job_queue(job_queue, info_of_running_jobs, report_generation_ps):
             self.info_of_running_jobs = []
             self.report_generation_ps = report_generation_ps
             self.loop = main_loop
+            self.annotator_service = None
+            self.annotator_service_env = {}
+            self.start_annotator_service()
+
+        def start_annotator_service(self):
+            from logging import getLogger
+            from ..lib.system import get_sys_conf_value
+            from ..lib.system.consts import annotator_service_key
+            from ..lib.system.consts import annotator_service_modules_key
+            from ..lib.base.annotator_service import start_annotator_service
+
+            enabled = get_sys_conf_value(annotator_service_key)
+            if str(enabled).lower() not in ["true", "1", "yes"]:
+                return
+            module_names = get_sys_conf_value(annotator_service_modules_key) or []
+            if isinstance(module_names, str):
+                module_names = [v.strip() for v in module_names.split(",") if v.strip()]
+            try:
+                (
+                    self.annotator_service,
+                    self.annotator_service_env,
+                ) = start_annotator_service(module_names=module_names)  # type: ignore
+            except Exception as e:
+                logger = getLogger()
+                logger.exception(e)
+                self.annotator_service = None
+                self.annotator_service_env = {}
+
+        def get_run_env(self):
+            from os import environ
+
+            if not self.annotator_service_env:
+                return None
+            if self.annotator_service and not self.annotator_service.is_alive():
+                self.annotator_service = None
+                self.annotator_service_env = {}
+                return None
+            env = environ.copy()
+            env.update(self.annotator_service_env)
+            return env
 
         def add_job(self, queue_item):
             submit_options = queue_item.get("submit_options")
@@ -557,7 +597,7 @@ def fetch_job_queue(job_queue, info_of_running_jobs, report_generation_ps):
                         uid = self.queue.pop(0)
                         run_args = self.run_args[uid]
                         del self.run_args[uid]
-                        p = Popen(run_args)
+                        p = Popen(run_args, env=self.get_run_env())
                         self.processes_of_running_jobs[uid] = p
 
         async def delete_jobs(self, queue_item):
@@ -8,3 +8,15 @@ class Annotator(BaseAnnotator):
         _ = secondary_data
         out = {}
         return out
+
+    # To annotate many variants with one query, such as
+    # "select ... where pos in (...)", implement annotate_batch instead of
+    # annotate. It should return one output dict (or None) per input_data,
+    # in the same order. The batch size can be set with batch_size in
+    # the module's yml file or with --module-options MODULE_NAME.batch_size=N.
+    #
+    # def annotate_batch(
+    #     self, input_data_l: list, secondary_data_l: Optional[list] = None
+    # ):
+    #     _ = secondary_data_l
+    #     return [{} for _ in input_data_l]
@@ -5,6 +5,7 @@ class Aggregator(object):
 
     cr_type_to_sql = {"string": "text", "int": "integer", "float": "real"}
     commit_threshold = 10000
+    insert_batch_size = 100000
 
     def __init__(
         self,
@@ -88,63 +89,12 @@ class Aggregator(object):
         if self.logger is not None:
             self.logger.info("started: %s" % asctime(localtime(start_time)))
         self.dbconn.commit()
-        n = 0
         if not self.append:
-            col_names = self.base_reader.get_column_names()
-            columns = ",".join(col_names)
-            placeholders = ",".join(["?"] * len(col_names))
-            q = f"insert into {self.table_name} ({columns}) values ({placeholders});"
-            batch_size = 1_000_000
-            value_batch = []
-            for lnum, line, rd in self.base_reader.loop_data():
-                try:
-                    n += 1
-                    vals = [rd.get(c) for c in col_names]
-                    value_batch.append(vals)
-                    if len(value_batch) == batch_size:
-                        self.cursor.executemany(q, value_batch)
-                        self.dbconn.commit()
-                        value_batch = []
-                    if lnum % 10000 == 0:
-                        status = f"Running Aggregator ({self.level}:base): line {lnum}"
-                        update_status(
-                            status, logger=self.logger, serveradmindb=self.serveradmindb
-                        )
-                except Exception as e:
-                    self._log_runtime_error(lnum, line, e, fn=self.base_reader.path)
-            if value_batch:
-                self.cursor.executemany(q, value_batch)
-                self.dbconn.commit()
-        for annot_name in self.annotators:
-            reader = self.readers[annot_name]
-            n = 0
-            ordered_cnames = [
-                cname for cname in reader.get_column_names() if cname != self.key_name
-            ]
-            if len(ordered_cnames) == 0:
-                continue
-            update_template = "update {} set {} where {}=?".format(
-                self.table_name,
-                ", ".join([f"{cname}=?" for cname in ordered_cnames]),
-                self.base_prefix + "__" + self.key_name,
-            )
-            for lnum, line, rd in reader.loop_data():
-                try:
-                    n += 1
-                    key_val = rd[self.key_name]
-                    ins_vals = [rd.get(cname) for cname in ordered_cnames]
-                    ins_vals.append(key_val)
-                    self.cursor.execute(update_template, ins_vals)
-                    if n % self.commit_threshold == 0:
-                        self.dbconn.commit()
-                    if lnum % 10000 == 0:
-                        status = f"Running Aggregator ({self.level}:{annot_name}): line {lnum}"
-                        update_status(
-                            status, logger=self.logger, serveradmindb=self.serveradmindb
-                        )
-                except Exception as e:
-                    self._log_runtime_error(lnum, line, e, fn=reader.path)
-            self.dbconn.commit()
+            self.insert_merged_rows()
+        else:
+            for annot_name in self.annotators:
+                reader = self.readers[annot_name]
+                self.update_from_staging(annot_name, reader.loop_data())
         self.fill_categories()
         # self.cursor.execute("pragma synchronous=2;")
         # self.cursor.execute("pragma journal_mode=delete;")
@@ -157,6 +107,155 @@ class Aggregator(object):
         status = f"finished aggregator ({self.level})"
         update_status(status, logger=self.logger, serveradmindb=self.serveradmindb)
 
+    def get_annotator_column_names(self, annot_name):
+        reader = self.readers[annot_name]
+        return [cname for cname in reader.get_column_names() if cname != self.key_name]
+
+    def insert_merged_rows(self):
+        """Inserts each row of the base input once, together with the outputs
+        of all annotators for its key. Annotators write their outputs in the
+        order of the base input, so the base and annotator readers are merged
+        in one pass. Annotator rows which are out of that order are applied
+        afterwards with update_from_staging.
+        """
+        from ..util.run import update_status
+
+        if self.base_reader is None or self.cursor is None or self.dbconn is None:
+            return
+        base_cnames = self.base_reader.get_column_names()
+        base_key_name = (
+            self.base_prefix + "__" + self.key_name if self.key_name else None
+        )
+        annot_cnames = {}
+        for annot_name in self.annotators:
+            cnames = self.get_annotator_column_names(annot_name)
+            if cnames:
+                annot_cnames[annot_name] = cnames
+        # Column names of the readers already have their module prefixes.
+        col_names = base_cnames.copy()
+        for cnames in annot_cnames.values():
+            col_names.extend(cnames)
+        columns = ",".join(col_names)
+        placeholders = ",".join(["?"] * len(col_names))
+        q = f"insert into {self.table_name} ({columns}) values ({placeholders});"
+        annot_iters = {
+            annot_name: self.readers[annot_name].loop_data()
+            for annot_name in annot_cnames
+        }
+        pending = {
+            annot_name: next(annot_iter, None)
+            for annot_name, annot_iter in annot_iters.items()
+        }
+        value_batch = []
+        for lnum, line, rd in self.base_reader.loop_data():
+            try:
+                key_val = rd.get(base_key_name) if base_key_name else None
+                vals = [rd.get(cname) for cname in base_cnames]
+                for annot_name, cnames in annot_cnames.items():
+                    annot_vals = None
+                    # Later rows of the same key overwrite earlier ones, as
+                    # repeated updates would.
+                    while (
+                        pending[annot_name] is not None
+                        and pending[annot_name][2].get(self.key_name) == key_val
+                    ):
+                        annot_rd = pending[annot_name][2]
+                        annot_vals = [annot_rd.get(cname) for cname in cnames]
+                        pending[annot_name] = next(annot_iters[annot_name], None)
+                    vals.extend(annot_vals or [None] * len(cnames))
+                value_batch.append(vals)
+                if len(value_batch) == self.insert_batch_size:
+                    self.cursor.executemany(q, value_batch)
+                    self.dbconn.commit()
+                    value_batch = []
+                if lnum % 10000 == 0:
+                    status = f"Running Aggregator ({self.level}): line {lnum}"
+                    update_status(
+                        status, logger=self.logger, serveradmindb=self.serveradmindb
+                    )
+            except Exception as e:
+                self._log_runtime_error(lnum, line, e, fn=self.base_reader.path)
+        if value_batch:
+            self.cursor.executemany(q, value_batch)
+        self.dbconn.commit()
+        for annot_name, annot_iter in annot_iters.items():
+            if pending[annot_name] is None:
+                continue
+            if self.logger:
+                self.logger.info(
+                    f"{annot_name} output is not in the order of the base input. "
+                    + "Remaining rows are joined through a staging table."
+                )
+            self.update_from_staging(
+                annot_name, chain_rows(pending[annot_name], annot_iter)
+            )
+
+    def update_from_staging(self, annot_name, rows):
+        """Loads annotator rows into a staging table and updates the matching
+        rows of the result table with one join.
+
+        Args:
+            annot_name: annotator name
+            rows: iterator of (lnum, line, row data) of the annotator output
+        """
+        from ..util.run import update_status
+
+        if self.cursor is None or self.dbconn is None:
+            return
+        cnames = self.get_annotator_column_names(annot_name)
+        if not cnames or not self.key_name:
+            return
+        reader = self.readers[annot_name]
+        staging_table_name = self.table_name + "_staging"
+        staging_cnames = [f"v{i}" for i in range(len(cnames))]
+        # The key is typed as in the result table so that the join uses the
+        # primary key index of the staging table.
+        key_type = ""
+        for col_def in reader.get_all_col_defs().values():
+            if col_def.name == self.key_name:
+                key_type = self.cr_type_to_sql.get(col_def.type, "")
+        self.cursor.execute(f"drop table if exists {staging_table_name}")
+        self.cursor.execute(
+            f"create table {staging_table_name} (k {key_type} primary key, "
+            + ", ".join(staging_cnames)
+            + ")"
+        )
+        q = (
+            f"insert or replace into {staging_table_name} values ("
+            + ",".join(["?"] * (len(cnames) + 1))
+            + ")"
+        )
+        value_batch = []
+        for lnum, line, rd in rows:
+            try:
+                vals = [rd[self.key_name]]
+                vals.extend([rd.get(cname) for cname in cnames])
+                value_batch.append(vals)
+                if len(value_batch) == self.insert_batch_size:
+                    self.cursor.executemany(q, value_batch)
+                    value_batch = []
+                if lnum % 10000 == 0:
+                    status = f"Running Aggregator ({self.level}:{annot_name}): line {lnum}"
+                    update_status(
+                        status, logger=self.logger, serveradmindb=self.serveradmindb
+                    )
+            except Exception as e:
+                self._log_runtime_error(lnum, line, e, fn=reader.path)
+        if value_batch:
+            self.cursor.executemany(q, value_batch)
+        key_col = self.base_prefix + "__" + self.key_name
+        q = (
+            f"update {self.table_name} set ("
+            + ", ".join(cnames)
+            + ") = (select "
+            + ", ".join(staging_cnames)
+            + f" from {staging_table_name} where k={self.table_name}.{key_col}) "
+            + f"where {key_col} in (select k from {staging_table_name})"
+        )
+        self.cursor.execute(q)
+        self.cursor.execute(f"drop table {staging_table_name}")
+        self.dbconn.commit()
+
     def make_reportsub(self):
         if self.cursor is None:
             return
@@ -534,3 +633,7 @@ class Aggregator(object):
         else:
             self.logger.error(err_str)
 
+
+def chain_rows(first_row, rows):
+    yield first_row
+    yield from rows
@@ -44,6 +44,11 @@ class BaseAnnotator(object):
         output_columns: List[Dict[str, Any]] = [],
         module_conf: Dict[str, Any] = {},
         code_version: Optional[str] = None,
+        variant_store: bool = False,
+        seekpos: int = 0,
+        chunksize: Optional[int] = None,
+        chunk_no: Optional[int] = None,
+        df_mode: bool = False,
     ):
         """__init__.
 
@@ -64,6 +69,11 @@ class BaseAnnotator(object):
             output_columns (List[Dict]): output_columns
             module_conf (dict): module_conf
             code_version (Optional[str]): code_version
+            variant_store (bool): reuse outputs stored by previous runs
+            seekpos (int): position in input_file to start reading at
+            chunksize (Optional[int]): number of input lines to annotate
+            chunk_no (Optional[int]): chunk number of a split run
+            df_mode (bool): annotate the input in Polars DataFrames if the module implements annotate_df
         """
         import os
         import sys
@@ -73,6 +83,7 @@ class BaseAnnotator(object):
         from ..consts import GENE_LEVEL
         from ..consts import INPUT_LEVEL_KEY
         from ..consts import GENE_LEVEL_KEY
+        from ..consts import DEFAULT_ANNOTATOR_BATCH_SIZE
         from ..module.local import get_module_conf
         from ..module.data_cache import ModuleDataCache
         from ..exceptions import ModuleLoadingError
@@ -84,6 +95,10 @@ class BaseAnnotator(object):
         else:
             self.primary_input_path = None
         self.secondary_inputs = secondary_inputs
+        self.seekpos = seekpos
+        self.chunksize = chunksize
+        self.chunk_no = chunk_no
+        self.df_mode = df_mode
         self.run_name = run_name
         self.output_dir = output_dir
         self.plain_output = plainoutput
@@ -109,10 +124,13 @@ class BaseAnnotator(object):
         self.last_status_update_time = None
         self.output_columns: Optional[List[Dict[str, Any]]] = None
         self.secondary_readers = {}
+        self.merge_join_cursor = None
         self.output_writer = None
         self.log_path = None
         self.unique_excs = []
         self.log_handler = None
+        self.run_failed = False
+        self.warm = False
         self.parse_cmd_args()
         self.serveradmindb = serveradmindb
         self.supported_chroms = set(cannonical_chroms)
@@ -205,6 +223,21 @@ class BaseAnnotator(object):
             else:
                 self.code_version: str = ""
         self.cache = ModuleDataCache(self.module_name, module_type=self.module_type)
+        self.variant_store = None
+        if variant_store and self.level == VARIANT_LEVEL and self.output_dir and self.run_name:
+            from ..util.variant_store import VariantStore
+            from ..util.variant_store import get_run_key
+
+            self.variant_store = VariantStore(
+                run_key=get_run_key(self.output_dir, self.run_name)
+            )
+        self.num_reused_outputs = 0
+        self.num_outputs = 0
+        self.batch_size: int = int(
+            self.module_options.get("batch_size")
+            or self.conf.get("batch_size")
+            or DEFAULT_ANNOTATOR_BATCH_SIZE
+        )
 
     def set_output_columns(self, output_columns: List[Dict[str, Any]]):
         if not self.level:
@@ -419,14 +452,24 @@ class BaseAnnotator(object):
                 self.json_colnames.append(col["name"])
 
     def annotate_df(self, df):
-        """annotate_df.
+        """Annotates a Polars DataFrame of input rows and returns a DataFrame
+        of the id column and the output columns. Modules which can annotate
+        whole columns at once implement this. In df_mode, their input is given
+        to it in batches typed by the column definitions of the input file,
+        without star alleles and unsupported chroms. Modules which do not
+        implement it are always annotated row by row with annotate.
 
         Args:
-            df:
+            df: Polars DataFrame of input rows
         """
         _ = df
         raise NotImplementedError("annotate_df method should be implemented.")
 
+    def has_annotate_df(self) -> bool:
+        """Returns True if the module overrides annotate_df.
+        """
+        return type(self).annotate_df is not BaseAnnotator.annotate_df
+
     def run_df(self, df):
         """run_df.
 
@@ -445,12 +488,23 @@ class BaseAnnotator(object):
             return
         if self.logger is None:
             return
-        from time import time, asctime, localtime
-        from ..util.run import update_status
-        from ..exceptions import ModuleLoadingError
-
         if df is not None:
             return self.run_df(df)
+        self.check_run_conf()
+        try:
+            start_time = self.start_run()
+            self.process_file()
+            self.finish_run(start_time)
+        except Exception as e:
+            self.run_failed = True
+            self._log_exception(e)
+        self.close_log_handler()
+
+    def check_run_conf(self):
+        """Raises ModuleLoadingError if the module is not ready to run a file.
+        """
+        from ..exceptions import ModuleLoadingError
+
         if not self.module_name:
             raise ModuleLoadingError(
                 msg="module_name should be given at initializing Annotator to run."
@@ -477,39 +531,131 @@ class BaseAnnotator(object):
                 )
         else:
             raise ModuleLoadingError(msg="module conf should exist to run.")
+
+    def start_run(self) -> float:
+        """Sets up the module to process its input and returns the start time.
+        """
+        from time import time, asctime, localtime
+        from ..util.run import update_status
+
         status = f"started {self.conf['title']} ({self.module_name})"
         update_status(status, logger=self.logger, serveradmindb=self.serveradmindb)
+        start_time = time()
+        update_status(
+            "started: %s" % asctime(localtime(start_time)),
+            logger=self.logger,
+            serveradmindb=self.serveradmindb,
+        )
+        self.base_setup()
+        self.last_status_update_time = time()
+        if not self.output_columns:
+            self.output_columns = self.conf["output_columns"]
+        self.make_json_colnames()
+        return start_time
+
+    def finish_run(self, start_time: float):
+        """Cleans up the module after processing its input.
+
+        Args:
+            start_time (float): start_time
+        """
+        from time import time, asctime, localtime
+        from ..util.run import update_status
+
+        self.postprocess()
+        self.base_cleanup()
+        status = f"finished {self.conf['title']} ({self.module_name})"
+        update_status(status, logger=self.logger, serveradmindb=self.serveradmindb)
+        end_time = time()
+        update_status(
+            f"{self.module_name}: finished at {asctime(localtime(end_time))}",
+            logger=self.logger,
+            serveradmindb=self.serveradmindb,
+        )
+        run_time = end_time - start_time
+        update_status(
+            f"{self.module_name}: runtime {run_time:0.3f}s",
+            logger=self.logger,
+            serveradmindb=self.serveradmindb,
+        )
+
+    def warm_up(self):
+        """Connects the module's data db and runs setup, so that the module can
+        annotate several inputs with run_warm without setting up each time.
+        Setup of warm modules runs before their input is opened.
+        """
+        if self.warm:
+            return
+        self.connect_db()
+        self._setup_merge_join()
+        self.setup()
+        if not hasattr(self, "supported_chroms"):
+            self.supported_chroms = set(
+                ["chr" + str(n) for n in range(1, 23)] + ["chrX", "chrY"]
+            )
+        self.warm = True
+
+    def run_warm(
+        self,
+        input_file: str,
+        run_name: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        secondary_inputs=None,
+    ) -> bool:
+        """Annotates an input with a warmed-up module. The data db and setup
+        are kept for the next input. Returns False if the run failed.
+
+        Args:
+            input_file (str): input_file
+            run_name (Optional[str]): run_name
+            output_dir (Optional[str]): output_dir
+            secondary_inputs:
+        """
+        from pathlib import Path
+        from time import time
+        from ..util.run import update_status
+
+        self.primary_input_path = Path(input_file).resolve()
+        self.run_name = run_name
+        self.output_dir = output_dir
+        self.secondary_inputs = secondary_inputs
+        self.secondary_paths = {}
+        self.output_basename = None
+        self.run_failed = False
+        self.unique_excs = []
+        self.parse_cmd_args()
+        self.check_run_conf()
         try:
             start_time = time()
-            update_status(
-                "started: %s" % asctime(localtime(start_time)),
-                logger=self.logger,
-                serveradmindb=self.serveradmindb,
-            )
-            self.base_setup()
+            self.warm_up()
+            self._setup_primary_input()
+            self._setup_secondary_inputs()
+            self._setup_outputs()
+            if self.merge_join_cursor is not None:
+                self._setup_merge_join()
             self.last_status_update_time = time()
             if not self.output_columns:
                 self.output_columns = self.conf["output_columns"]
             self.make_json_colnames()
             self.process_file()
             self.postprocess()
-            self.base_cleanup()
-            status = f"started {self.conf['title']} ({self.module_name})"
-            update_status(status, logger=self.logger, serveradmindb=self.serveradmindb)
-            end_time = time()
-            update_status(
-                f"{self.module_name}: finished at {asctime(localtime(end_time))}",
-                logger=self.logger,
-                serveradmindb=self.serveradmindb,
-            )
-            run_time = end_time - start_time
+            if self.output_writer:
+                self.output_writer.close()
+                self.output_writer = None
+            self.close_variant_store()
+            if self.cache:
+                self.cache.commit()
             update_status(
-                f"{self.module_name}: runtime {run_time:0.3f}s",
+                f"{self.module_name}: runtime {time() - start_time:0.3f}s",
                 logger=self.logger,
                 serveradmindb=self.serveradmindb,
             )
         except Exception as e:
+            self.run_failed = True
             self._log_exception(e)
+        return not self.run_failed
+
+    def close_log_handler(self):
         if hasattr(self, "log_handler") and self.log_handler:
             self.log_handler.close()
 
@@ -517,34 +663,228 @@ class BaseAnnotator(object):
         """process_file.
         """
         assert self._id_col_name, "_id_col_name should not be None."
+        if (
+            self.df_mode
+            and self.has_annotate_df()
+            and self.primary_input_reader is not None
+            and (self.primary_input_reader.arrowfmt or self.primary_input_reader.csvfmt)
+            and not self.secondary_readers
+            and not self.variant_store
+            and not self.seekpos
+            and self.chunksize is None
+        ):
+            self.process_file_as_df()
+            return
+        if self.has_annotate_batch():
+            self.process_file_in_batches()
+            return
         for lnum, line, input_data, secondary_data in self._get_input():
+            self.process_row(lnum, line, input_data, secondary_data)
+
+    def process_row(self, lnum, line, input_data, secondary_data):
+        """Annotates an input line and writes its output.
+
+        Args:
+            lnum:
+            line:
+            input_data:
+            secondary_data:
+        """
+        try:
+            self.log_progress(lnum)
+            # * allele and undefined non-canonical chroms are skipped.
+            if self.is_star_allele(input_data) or self.should_skip_chrom(input_data):
+                return
+            output_dict = None
+            if secondary_data == {}:
+                output_dict = self.annotate_with_variant_store(input_data)
+            else:
+                output_dict = self.annotate(input_data, secondary_data=secondary_data)
+            self.write_output(input_data, output_dict)
+        except Exception as e:
+            self._log_runtime_exception(
+                lnum,
+                line,
+                input_data,
+                e,
+                fn=self.primary_input_reader.path
+                if self.primary_input_reader
+                else "?",
+            )
+
+    def process_file_as_df(self):
+        """Annotates the input in Polars DataFrames with annotate_df. If
+        annotate_df fails for a DataFrame, its rows are annotated one by one.
+        Batches whose values do not fit the column types are read and
+        annotated row by row.
+        """
+        import polars as pl
+        from itertools import islice
+        from ..util.inout import iter_df_batches
+        from ..consts import DEFAULT_ANNOTATOR_DF_BATCH_SIZE
+
+        if self.primary_input_reader is None:
+            return
+        batch_size = int(
+            self.module_options.get("df_batch_size")
+            or self.conf.get("df_batch_size")
+            or DEFAULT_ANNOTATOR_DF_BATCH_SIZE
+        )
+        lnum = 0
+        rows = None
+        num_rows_read = 0
+        for num_rows, df in iter_df_batches(self.primary_input_reader, batch_size):
+            start_lnum = lnum
+            lnum += num_rows
+            if df is None:
+                if rows is None:
+                    rows = self.primary_input_reader.loop_data()
+                for _ in islice(rows, start_lnum - num_rows_read):
+                    pass
+                for row_lnum, line, reader_data in islice(rows, num_rows):
+                    try:
+                        input_data = self.get_input_data(reader_data)
+                    except Exception as e:
+                        self._log_runtime_exception(row_lnum, line, reader_data, e)
+                        continue
+                    self.process_row(row_lnum, line, input_data, {})
+                num_rows_read = lnum
+                continue
+            self.log_progress(lnum)
+            if self.conf["level"] == "variant":
+                df = df.filter(
+                    (pl.col("alt_base").fill_null("") != "*")
+                    & pl.col("chrom").is_in(list(self.supported_chroms))
+                )
+            if df.height == 0:
+                continue
             try:
-                self.log_progress(lnum)
-                # * allele and undefined non-canonical chroms are skipped.
-                if self.is_star_allele(input_data) or self.should_skip_chrom(
-                    input_data
-                ):
-                    continue
-                output_dict = None
-                if secondary_data == {}:
-                    output_dict = self.annotate(input_data)
-                else:
-                    output_dict = self.annotate(
-                        input_data, secondary_data=secondary_data
+                output_df = self.annotate_df(df)
+                if output_df is not None:
+                    self.write_output_df(output_df)
+            except Exception:
+                for row_no, reader_data in enumerate(df.iter_rows(named=True)):
+                    try:
+                        input_data = self.get_input_data(reader_data)
+                    except Exception as e:
+                        self._log_runtime_exception(start_lnum + row_no, None, reader_data, e)
+                        continue
+                    self.process_row(start_lnum + row_no, None, input_data, {})
+
+    def write_output_df(self, output_df):
+        """Writes a DataFrame returned by annotate_df. Rows of which all output
+        columns are null are not written.
+
+        Args:
+            output_df: Polars DataFrame with the id column and output columns
+        """
+        import polars as pl
+        from json import dumps
+
+        if self.output_writer is None or output_df.height == 0:
+            return
+        output_colnames = [
+            col_def["name"]
+            for col_def in self.conf["output_columns"]
+            if col_def["name"] in output_df.columns
+            and col_def["name"] != self._id_col_name
+        ]
+        if output_colnames:
+            output_df = output_df.filter(
+                pl.any_horizontal([pl.col(name).is_not_null() for name in output_colnames])
+            )
+        # Table-format columns are written as JSON as in handle_jsondata.
+        for name in output_colnames:
+            if isinstance(output_df.schema[name], (pl.List, pl.Struct, pl.Object)):
+                output_df = output_df.with_columns(
+                    pl.Series(
+                        name,
+                        [
+                            dumps(v) if v is not None else None
+                            for v in output_df[name].to_list()
+                        ],
+                        dtype=pl.String,
                     )
-                # This enables summarizing without writing for now.
-                if output_dict is None:
-                    continue
-                # Handles empty table-format column data.
-                output_dict = self.handle_jsondata(output_dict)
-                # Preserves the first column
-                if output_dict:
-                    output_dict[self._id_col_name] = input_data[self._id_col_name]
-                # Fill absent columns with empty strings
-                output_dict = self.fill_empty_output(output_dict)
-                # Writes output.
-                if self.output_writer:
-                    self.output_writer.write_data(output_dict)
+                )
+        self.output_writer.write_df(output_df)
+
+    def write_output(self, input_data, output_dict):
+        """write_output.
+
+        Args:
+            input_data:
+            output_dict:
+        """
+        # This enables summarizing without writing for now.
+        if output_dict is None:
+            return
+        # Handles empty table-format column data.
+        output_dict = self.handle_jsondata(output_dict)
+        # Preserves the first column
+        if output_dict:
+            output_dict[self._id_col_name] = input_data[self._id_col_name]
+        # Fill absent columns with empty strings
+        output_dict = self.fill_empty_output(output_dict)
+        # Writes output.
+        if self.output_writer:
+            self.output_writer.write_data(output_dict)
+
+    def has_annotate_batch(self) -> bool:
+        """Returns True if the module overrides annotate_batch.
+        """
+        return type(self).annotate_batch is not BaseAnnotator.annotate_batch
+
+    def process_file_in_batches(self):
+        """process_file_in_batches.
+        """
+        batch = []
+        for lnum, line, input_data, secondary_data in self._get_input():
+            self.log_progress(lnum)
+            # * allele and undefined non-canonical chroms are skipped.
+            if self.is_star_allele(input_data) or self.should_skip_chrom(input_data):
+                continue
+            batch.append((lnum, line, input_data, secondary_data))
+            if len(batch) >= self.batch_size:
+                self.process_batch(batch)
+                batch = []
+        if batch:
+            self.process_batch(batch)
+
+    def process_batch(self, batch):
+        """Annotates a batch. If the batch fails, its rows are retried one by
+        one, so that only the failing rows are logged and skipped.
+
+        Args:
+            batch:
+        """
+        try:
+            output_dicts = self.annotate_batch_with_variant_store(
+                [v[2] for v in batch], [v[3] for v in batch]
+            )
+            if len(output_dicts) != len(batch):
+                raise ValueError(
+                    f"annotate_batch returned {len(output_dicts)} outputs "
+                    + f"for {len(batch)} inputs."
+                )
+        except Exception as e:
+            if len(batch) > 1:
+                for row in batch:
+                    self.process_batch([row])
+                return
+            lnum, line, input_data, _ = batch[0]
+            self._log_runtime_exception(
+                lnum,
+                line,
+                input_data,
+                e,
+                fn=self.primary_input_reader.path
+                if self.primary_input_reader
+                else "?",
+            )
+            return
+        for (lnum, line, input_data, _), output_dict in zip(batch, output_dicts):
+            try:
+                self.write_output(input_data, output_dict)
             except Exception as e:
                 self._log_runtime_exception(
                     lnum,
@@ -556,6 +896,97 @@ class BaseAnnotator(object):
                     else "?",
                 )
 
+    def annotate_batch_with_variant_store(self, input_data_l, secondary_data_l):
+        """annotate_batch_with_variant_store.
+
+        Args:
+            input_data_l:
+            secondary_data_l:
+        """
+        if not self.variant_store or self.secondary_readers:
+            if self.secondary_readers:
+                return self.annotate_batch(input_data_l, secondary_data_l=secondary_data_l)
+            return self.annotate_batch(input_data_l)
+        output_dicts = [None] * len(input_data_l)
+        missing = []
+        for i, input_data in enumerate(input_data_l):
+            version, data = self.get_variant_store_key_data(input_data)
+            self.num_outputs += 1
+            found, output_dict = self.variant_store.get_result(
+                self.module_name, version, data
+            )
+            if found:
+                self.num_reused_outputs += 1
+                output_dicts[i] = output_dict
+            else:
+                missing.append((i, version, data))
+        if missing:
+            new_output_dicts = self.annotate_batch(
+                [input_data_l[v[0]] for v in missing]
+            )
+            if len(new_output_dicts) != len(missing):
+                raise ValueError(
+                    f"annotate_batch returned {len(new_output_dicts)} outputs "
+                    + f"for {len(missing)} inputs."
+                )
+            for (i, version, data), output_dict in zip(missing, new_output_dicts):
+                self.variant_store.add_result(
+                    self.module_name, version, data, output_dict
+                )
+                output_dicts[i] = output_dict
+        return output_dicts
+
+    def get_variant_store_key_data(self, input_data):
+        """get_variant_store_key_data.
+
+        Args:
+            input_data:
+        """
+        from json import dumps
+
+        data = {
+            k: input_data[k]
+            for k in self.conf["input_columns"]
+            if k != self._id_col_name
+        }
+        version = dumps([self.code_version, self.module_options], default=str)
+        return version, data
+
+    def annotate_with_variant_store(self, input_data):
+        """Returns the output stored for the same input by a previous run if any.
+
+        Args:
+            input_data:
+        """
+        if not self.variant_store:
+            return self.annotate(input_data)
+        version, data = self.get_variant_store_key_data(input_data)
+        self.num_outputs += 1
+        found, output_dict = self.variant_store.get_result(
+            self.module_name, version, data
+        )
+        if found:
+            self.num_reused_outputs += 1
+            return output_dict
+        output_dict = self.annotate(input_data)
+        self.variant_store.add_result(self.module_name, version, data, output_dict)
+        return output_dict
+
+    def close_variant_store(self):
+        """close_variant_store.
+        """
+        if not self.variant_store:
+            return
+        self.variant_store.add_run_stats(
+            "annotator", self.module_name, self.num_reused_outputs, self.num_outputs
+        )
+        self.variant_store.close()
+        if self.logger:
+            self.logger.info(
+                f"{self.module_name}: reused {self.num_reused_outputs}/"
+                + f"{self.num_outputs} outputs from variant store"
+            )
+
     def postprocess(self):
         """postprocess.
         """
@@ -628,6 +1059,7 @@ class BaseAnnotator(object):
         self._setup_secondary_inputs()
         self._setup_outputs()
         self.connect_db()
+        self._setup_merge_join()
         self.setup()
         if not hasattr(self, "supported_chroms"):
             self.supported_chroms = set(
@@ -644,7 +1076,9 @@ class BaseAnnotator(object):
         from ..exceptions import ConfigurationError
         from ..util.inout import FileReader
 
-        self.primary_input_reader = FileReader(str(self.primary_input_path))
+        self.primary_input_reader = FileReader(
+            str(self.primary_input_path), seekpos=self.seekpos, chunksize=self.chunksize
+        )
         requested_input_columns = self.conf["input_columns"]
         defined_columns = self.primary_input_reader.get_column_names()
         missing_columns = set(requested_input_columns) - set(defined_columns)
@@ -697,15 +1131,18 @@ class BaseAnnotator(object):
                 % (num_expected, num_provided)
             )
         for sec_name, sec_input_path in self.secondary_paths.items():
-            key_col = (
-                self.conf["secondary_inputs"][sec_name]
-                .get("match_columns", {})
-                .get("secondary", "uid")
+            match_columns = self.conf["secondary_inputs"][sec_name].get(
+                "match_columns", {}
             )
+            key_col = match_columns.get("secondary", "uid")
             use_columns = self.conf["secondary_inputs"][sec_name].get("use_columns", [])
-            fetcher = SecondaryInputFetcher(
-                sec_input_path, key_col, fetch_cols=use_columns
-            )
+            # Intermediate files are written in uid order, so uid matches can
+            # be streamed instead of loading the secondary input in memory.
+            if key_col == "uid" and match_columns.get("primary", "uid") == "uid":
+                fetcher_class = SortedSecondaryInputFetcher
+            else:
+                fetcher_class = SecondaryInputFetcher
+            fetcher = fetcher_class(sec_input_path, key_col, fetch_cols=use_columns)
             self.secondary_readers[sec_name] = fetcher
 
     def _setup_outputs(self):
@@ -735,6 +1172,8 @@ class BaseAnnotator(object):
             Path(self.output_dir)
             / f"{self.output_basename}.{self.module_name}{output_suffix}"
         )
+        if self.chunk_no is not None:
+            self.output_path = get_chunk_output_path(self.output_path, self.chunk_no)
         if self.plain_output:
             self.output_writer = FileWriter(
                 self.output_path,
@@ -743,7 +1182,11 @@ class BaseAnnotator(object):
                 titles_prefix="",
             )
         else:
-            self.output_writer = FileWriter(self.output_path)
+            if self.primary_input_reader is not None and self.primary_input_reader.arrowfmt:
+                fmt = "arrow"
+            else:
+                fmt = "csv"
+            self.output_writer = FileWriter(self.output_path, fmt=fmt)
             self.output_writer.write_meta_line("name", self.module_name)
             self.output_writer.write_meta_line(
                 "displayname", self.annotator_display_name
@@ -760,23 +1203,58 @@ class BaseAnnotator(object):
                 "no_aggregate", ",".join(skip_aggregation)
             )
 
+    def _setup_merge_join(self):
+        """Sets up a cursor which walks through a position-sorted table of the
+        module's data db in step with the input, if merge_join is defined in
+        the module yml file.
+        """
+        from ..consts import DEFAULT_MERGE_JOIN_MAX_GAP
+        from ..exceptions import ConfigurationError
+
+        merge_join_conf = self.conf.get("merge_join")
+        if not merge_join_conf:
+            return
+        if self.level != "variant":
+            raise ConfigurationError("merge_join is only for variant-level annotators.")
+        if "table" not in merge_join_conf:
+            raise ConfigurationError("merge_join should have table.")
+        if self.dbconn is None:
+            raise ConfigurationError(
+                f"merge_join needs {self.module_name}.sqlite in the data folder."
+            )
+        self.merge_join_cursor = MergeJoinCursor(
+            self.dbconn,
+            merge_join_conf["table"],
+            chrom_col=merge_join_conf.get("chrom_column", "chrom"),
+            pos_col=merge_join_conf.get("pos_column", "pos"),
+            columns=merge_join_conf.get("columns", []),
+            max_gap=merge_join_conf.get("max_gap", DEFAULT_MERGE_JOIN_MAX_GAP),
+        )
+
     def connect_db(self):
         """connect_db.
         """
         from pathlib import Path
-        import sqlite3
+        from ..module.data_db import connect_module_data_db
 
         db_path = Path(self.data_dir) / (self.module_name + ".sqlite")
         if db_path.exists():
-            self.dbconn = sqlite3.connect(str(db_path))
+            self.dbconn = connect_module_data_db(
+                db_path,
+                readonly=self.conf.get("data_db_readonly", True),
+                immutable=self.conf.get("data_db_immutable", False),
+            )
             self.cursor = self.dbconn.cursor()
 
     def close_db_connection(self):
         """close_db_connection.
         """
+        from ..module.data_db import log_module_data_db_stats
+
         if self.cursor is not None:
             self.cursor.close()
         if self.dbconn is not None:
+            log_module_data_db_stats(self.dbconn, self.logger, self.module_name)
             self.dbconn.close()
 
     # Placeholder, intended to be overridded in derived class
@@ -790,11 +1268,34 @@ class BaseAnnotator(object):
         """
         if self.output_writer:
             self.output_writer.close()
+        self.close_variant_store()
+        self.close_cache()
+        if self.merge_join_cursor is not None and self.logger:
+            self.logger.info(
+                f"merge join: {self.merge_join_cursor.num_lookups} lookups, "
+                + f"{self.merge_join_cursor.num_seeks} seeks"
+            )
         # self.invalid_file.close()
         if self.dbconn is not None:
             self.close_db_connection()
         self.cleanup()
 
+    def close_cache(self):
+        """Flushes the module data cache and logs its hit rate.
+        """
+        if not self.cache:
+            return
+        stats = self.cache.get_stats()
+        self.cache.close()
+        if self.logger and stats["lookups"]:
+            self.logger.info(
+                f"cache: {stats['lookups']} lookups, "
+                + f"{stats['memory_hits']} memory hits, "
+                + f"{stats['disk_hits']} disk hits, "
+                + f"hit rate {stats['hit_rate']:.1%}, "
+                + f"{stats['expired']} expired, {stats['evicted']} evicted"
+            )
+
     # Placeholder, intended to be overridden in derived class
     def cleanup(self):
         """cleanup.
@@ -812,22 +1313,13 @@ class BaseAnnotator(object):
     def _get_input(self):
         """_get_input.
         """
-        from ..util.inout import AllMappingsParser
-        from ..consts import all_mappings_col_name
-        from ..consts import mapping_parser_name
         from ..exceptions import SetupError
 
         if self.conf is None or self.primary_input_reader is None:
             raise SetupError(self.module_name)
         for lnum, line, reader_data in self.primary_input_reader.loop_data():
             try:
-                input_data = {}
-                for col_name in self.conf["input_columns"]:
-                    input_data[col_name] = reader_data[col_name]
-                if all_mappings_col_name in input_data:
-                    input_data[mapping_parser_name] = AllMappingsParser(
-                        input_data[all_mappings_col_name]
-                    )
+                input_data = self.get_input_data(reader_data)
                 secondary_data = {}
                 for module_name, fetcher in self.secondary_readers.items():
                     input_key_col = (
@@ -844,6 +1336,31 @@ class BaseAnnotator(object):
                 )
                 continue
 
+    def get_input_data(self, reader_data, mapping_parser=None):
+        """Returns input_data for annotate out of a row of the primary input.
+
+        Args:
+            reader_data: row of the primary input
+            mapping_parser: AllMappingsParser of the row, if already made
+        """
+        from ..util.inout import AllMappingsParser
+        from ..consts import all_mappings_col_name
+        from ..consts import mapping_parser_name
+        from ..consts import merge_join_name
+
+        input_data = {}
+        for col_name in self.conf["input_columns"]:
+            input_data[col_name] = reader_data[col_name]
+        if all_mappings_col_name in input_data:
+            if mapping_parser is None:
+                mapping_parser = AllMappingsParser(input_data[all_mappings_col_name])
+            input_data[mapping_parser_name] = mapping_parser
+        if self.merge_join_cursor is not None:
+            input_data[merge_join_name] = self.merge_join_cursor.get(
+                reader_data["chrom"], reader_data["pos"]
+            )
+        return input_data
+
     def annotate(self, input_data, secondary_data=None):
         """annotate.
 
@@ -857,6 +1374,26 @@ class BaseAnnotator(object):
             "secondary_data": secondary_data,
         }
 
+    def annotate_batch(self, input_data_l, secondary_data_l=None):
+        """Annotates a batch of variants at once. Modules can override this to
+        look up the whole batch with one query. process_file uses it only if
+        it is overridden.
+
+        Args:
+            input_data_l: list of input_data
+            secondary_data_l: list of secondary_data, given only to modules with secondary inputs
+
+        Returns:
+            A list of output dicts, or None for variants without annotation,
+            in the order of input_data_l.
+        """
+        if secondary_data_l is None:
+            return [self.annotate(input_data) for input_data in input_data_l]
+        return [
+            self.annotate(input_data, secondary_data=secondary_data)
+            for input_data, secondary_data in zip(input_data_l, secondary_data_l)
+        ]
+
     def live_report_substitute(self, d):
         """live_report_substitute.
 
@@ -906,6 +1443,134 @@ class BaseAnnotator(object):
         create_module_files(self, overwrite=overwrite, interactive=interactive)
 
 
+class FusedAnnotators:
+    """Runs several annotators over one read of their shared primary input.
+
+    Each row is read and parsed once, its AllMappingsParser is made once, and
+    the row is given to each annotator, which writes its own output file. An
+    error in one annotator's setup, rows, or cleanup stops only that
+    annotator.
+    """
+
+    def __init__(self, annotators: List[BaseAnnotator]):
+        """__init__.
+
+        Args:
+            annotators (List[BaseAnnotator]): annotators with the same primary input
+        """
+        self.annotators = annotators
+        self.runtimes: Dict[str, float] = {a.module_name: 0.0 for a in annotators}
+
+    def run(self) -> Dict[str, bool]:
+        """Runs the annotators and returns whether each of them succeeded.
+        """
+        from time import perf_counter
+        from ..util.inout import AllMappingsParser
+        from ..consts import all_mappings_col_name
+
+        start_times = {}
+        running = []
+        for annotator in self.annotators:
+            t = perf_counter()
+            try:
+                annotator.check_run_conf()
+                start_times[annotator.module_name] = annotator.start_run()
+                running.append(annotator)
+            except Exception as e:
+                self.fail(annotator, e)
+            self.runtimes[annotator.module_name] += perf_counter() - t
+        if running:
+            reader = running[0].primary_input_reader
+            if reader is None:
+                raise ValueError("primary input is not set up.")
+            batches = {a.module_name: [] for a in running if a.has_annotate_batch()}
+            for lnum, line, reader_data in reader.loop_data():
+                mapping_parser = None
+                if all_mappings_col_name in reader_data:
+                    mapping_parser = AllMappingsParser(reader_data[all_mappings_col_name])
+                for annotator in running:
+                    if annotator.run_failed:
+                        continue
+                    t = perf_counter()
+                    try:
+                        input_data = annotator.get_input_data(
+                            reader_data, mapping_parser=mapping_parser
+                        )
+                        batch = batches.get(annotator.module_name)
+                        if batch is None:
+                            annotator.process_row(lnum, line, input_data, {})
+                        else:
+                            self.add_to_batch(annotator, batch, lnum, line, input_data)
+                    except Exception as e:
+                        self.fail(annotator, e)
+                    self.runtimes[annotator.module_name] += perf_counter() - t
+            for annotator in running:
+                batch = batches.get(annotator.module_name)
+                if not batch or annotator.run_failed:
+                    continue
+                t = perf_counter()
+                try:
+                    annotator.process_batch(batch)
+                except Exception as e:
+                    self.fail(annotator, e)
+                self.runtimes[annotator.module_name] += perf_counter() - t
+        for annotator in running:
+            if annotator.run_failed:
+                continue
+            t = perf_counter()
+            try:
+                annotator.finish_run(start_times[annotator.module_name])
+            except Exception as e:
+                self.fail(annotator, e)
+            self.runtimes[annotator.module_name] += perf_counter() - t
+        for annotator in self.annotators:
+            annotator.close_log_handler()
+        return {a.module_name: not a.run_failed for a in self.annotators}
+
+    def add_to_batch(self, annotator: BaseAnnotator, batch: List, lnum, line, input_data):
+        """Adds a row to an annotator's batch and processes the batch when full.
+
+        Args:
+            annotator (BaseAnnotator): annotator
+            batch (List): rows waiting to be annotated
+            lnum:
+            line:
+            input_data:
+        """
+        annotator.log_progress(lnum)
+        # * allele and undefined non-canonical chroms are skipped.
+        if annotator.is_star_allele(input_data) or annotator.should_skip_chrom(
+            input_data
+        ):
+            return
+        batch.append((lnum, line, input_data, {}))
+        if len(batch) >= annotator.batch_size:
+            annotator.process_batch(batch)
+            batch.clear()
+
+    def fail(self, annotator: BaseAnnotator, e: Exception):
+        """fail.
+
+        Args:
+            annotator (BaseAnnotator): annotator
+            e (Exception): e
+        """
+        annotator.run_failed = True
+        annotator._log_exception(e)
+
+
+def get_chunk_output_path(output_path, chunk_no: int):
+    """Returns the output path of a chunk of a split annotator run.
+
+    Args:
+        output_path: output path of the whole run
+        chunk_no (int): chunk_no
+    """
+    from pathlib import Path
+
+    return Path(str(output_path) + f".{chunk_no}")
+
+
 class SecondaryInputFetcher:
     """SecondaryInputFetcher.
     """
@@ -952,11 +1617,19 @@ class SecondaryInputFetcher:
             key_data = all_col_data.get(self.key_col)
             if key_data not in self.data:
                 self.data[key_data] = []
-            fetch_col_data = {}
-            for col in self.fetch_cols:
-                val = all_col_data.get(col)
-                fetch_col_data[col] = val
-            self.data[key_data].append(fetch_col_data)
+            self.data[key_data].append(self.get_fetch_col_data(all_col_data))
+
+    def get_fetch_col_data(self, all_col_data):
+        """get_fetch_col_data.
+
+        Args:
+            all_col_data:
+        """
+        fetch_col_data = {}
+        for col in self.fetch_cols:
+            val = all_col_data.get(col)
+            fetch_col_data[col] = val
+        return fetch_col_data
 
     def get(self, key_data):
         """get.
@@ -968,3 +1641,194 @@ class SecondaryInputFetcher:
             return self.data[key_data]
         else:
             return None
+
+
+class SortedSecondaryInputFetcher(SecondaryInputFetcher):
+    """Secondary input fetcher which reads the secondary input alongside the
+    primary input, for inputs which are both sorted by the key column, such as
+    uid. Only the rows of the current key are kept in memory. The secondary
+    input is checked to be sorted before it is streamed. If it is not, or if
+    the primary input turns out not to be sorted, the whole secondary input is
+    loaded as in SecondaryInputFetcher.
+    """
+
+    def load_input(self):
+        """load_input.
+        """
+        self.rows = None
+        self.pending = None
+        self.last_key = None
+        self.last_result = None
+        self.sorted = self.input_reader.is_sorted_by(self.key_col)
+        if not self.sorted:
+            SecondaryInputFetcher.load_input(self)
+            return
+        self.rows = self.input_reader.loop_data()
+
+    def load_all_input(self):
+        """Switches to looking up keys in the whole secondary input.
+        """
+        self.sorted = False
+        if self.rows is not None:
+            self.rows.close()
+            self.rows = None
+        self.pending = None
+        self.last_result = None
+        self.data = {}
+        SecondaryInputFetcher.load_input(self)
+
+    def get(self, key_data):
+        """get.
+
+        Args:
+            key_data:
+        """
+        if not self.sorted:
+            return super().get(key_data)
+        try:
+            return self.get_sorted(key_data)
+        except (TypeError, ValueError):
+            self.load_all_input()
+            return super().get(key_data)
+
+    def get_sorted(self, key_data):
+        """get_sorted.
+
+        Args:
+            key_data:
+        """
+        if self.last_key is not None:
+            if key_data == self.last_key:
+                return self.last_result
+            if key_data < self.last_key:
+                raise ValueError(f"{key_data} comes after {self.last_key}.")
+        matches = []
+        while True:
+            if self.pending is None:
+                try:
+                    _, _, all_col_data = next(self.rows)
+                except StopIteration:
+                    break
+                row_key = all_col_data.get(self.key_col)
+                self.pending = (row_key, self.get_fetch_col_data(all_col_data))
+            row_key, fetch_col_data = self.pending
+            if row_key > key_data:
+                break
+            if row_key == key_data:
+                matches.append(fetch_col_data)
+            self.pending = None
+        self.last_key = key_data
+        self.last_result = matches or None
+        return self.last_result
+
+
+class MergeJoinCursor:
+    """Walks through a position-sorted table in step with position-sorted input.
+
+    Instead of one index lookup per variant, one query per chromosome is
+    read sequentially. The query is reopened at the variant's position when
+    the chromosome changes, when the input goes backwards, or when the next
+    variant is more than max_gap bases ahead, where seeking is cheaper than
+    scanning.
+    """
+
+    def __init__(
+        self,
+        conn,
+        table: str,
+        chrom_col: str = "chrom",
+        pos_col: str = "pos",
+        columns: List[str] = [],
+        max_gap: int = 1000,
+    ):
+        """__init__.
+
+        Args:
+            conn: sqlite3 connection
+            table (str): table name. "{chrom}" in it is replaced with the chromosome, for tables split by chromosome.
+            chrom_col (str): chrom_col
+            pos_col (str): pos_col
+            columns (List[str]): columns to fetch. All columns if empty.
+            max_gap (int): max_gap
+        """
+        self.conn = conn
+        self.table = table
+        self.chrom_col = chrom_col
+        self.pos_col = pos_col
+        self.columns = list(columns)
+        if self.columns and pos_col not in self.columns:
+            self.columns.append(pos_col)
+        self.max_gap = max_gap
+        self.cursor = None
+        self.colnames: List[str] = []
+        self.pos_idx = 0
+        self.chrom = None
+        self.last_pos = None
+        self.next_row = None
+        self.matched_pos = None
+        self.matched_rows: List[Dict[str, Any]] = []
+        self.num_lookups = 0
+        self.num_seeks = 0
+
+    def _open(self, chrom, pos):
+        """_open.
+
+        Args:
+            chrom:
+            pos:
+        """
+        from sqlite3 import OperationalError
+
+        self.num_seeks += 1
+        self.chrom = chrom
+        self.matched_pos = None
+        self.matched_rows = []
+        cols = ", ".join(self.columns) if self.columns else "*"
+        if "{chrom}" in self.table:
+            table = self.table.format(chrom=chrom)
+            q = f"select {cols} from {table} where {self.pos_col}>=? order by {self.pos_col}"
+            args = (pos,)
+        else:
+            q = (
+                f"select {cols} from {self.table} where {self.chrom_col}=? and "
+                + f"{self.pos_col}>=? order by {self.pos_col}"
+            )
+            args = (chrom, pos)
+        try:
+            self.cursor = self.conn.execute(q, args)
+        except OperationalError:
+            # No table for the chromosome
+            self.cursor = None
+            self.next_row = None
+            return
+        self.colnames = [v[0] for v in self.cursor.description]
+        self.pos_idx = self.colnames.index(self.pos_col)
+        self.next_row = next(self.cursor, None)
+
+    def get(self, chrom, pos) -> List[Dict[str, Any]]:
+        """Returns the rows of the table at chrom and pos.
+
+        Args:
+            chrom:
+            pos:
+        """
+        self.num_lookups += 1
+        if chrom != self.chrom or self.last_pos is None or pos < self.last_pos:
+            self._open(chrom, pos)
+        elif (
+            self.next_row is not None
+            and pos - self.next_row[self.pos_idx] > self.max_gap
+        ):
+            self._open(chrom, pos)
+        self.last_pos = pos
+        if pos == self.matched_pos:
+            return self.matched_rows
+        while self.next_row is not None and self.next_row[self.pos_idx] < pos:
+            self.next_row = next(self.cursor, None)  # type: ignore
+        rows = []
+        while self.next_row is not None and self.next_row[self.pos_idx] == pos:
+            rows.append(dict(zip(self.colnames, self.next_row)))
+            self.next_row = next(self.cursor, None)  # type: ignore
+        self.matched_pos = pos
+        self.matched_rows = rows
+        return rows
@@ -0,0 +1,306 @@
+from typing import Optional
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from multiprocessing.managers import BaseManager
+
+ANNOTATOR_SERVICE_HOST = "127.0.0.1"
+ANNOTATOR_SERVICE_ADDRESS_ENV_KEY = "OV_ANNOTATOR_SERVICE_ADDRESS"
+ANNOTATOR_SERVICE_AUTHKEY_ENV_KEY = "OV_ANNOTATOR_SERVICE_AUTHKEY"
+ANNOTATOR_SERVICE_NUM_THREADS = 4
+
+
+class AnnotatorServiceManager(BaseManager):
+    pass
+
+
+class AnnotatorServiceClient(BaseManager):
+    pass
+
+
+class AnnotatorService:
+    """Keeps annotators loaded and set up between jobs, so that small jobs do
+    not pay the cost of importing modules, opening their data dbs, and running
+    their setup every time.
+
+    Each module is always run on the same thread, since SQLite connections
+    opened by a module's setup cannot be used from other threads.
+    """
+
+    def __init__(self, num_threads: int = ANNOTATOR_SERVICE_NUM_THREADS):
+        from concurrent.futures import ThreadPoolExecutor
+        from logging import getLogger
+
+        self.executors = [ThreadPoolExecutor(max_workers=1) for _ in range(num_threads)]
+        self.annotators: Dict[str, Any] = {}
+        self.warm_keys: Dict[str, str] = {}
+        self.code_keys: Dict[str, str] = {}
+        self.logger = getLogger("oakvar.annotator_service")
+
+    def get_executor(self, module_name: str):
+        from zlib import crc32
+
+        return self.executors[crc32(module_name.encode()) % len(self.executors)]
+
+    def get_code_key(self, script_path: str) -> str:
+        """Returns the key of the code of a module. The modification times of
+        the script and the yml file of the module are part of the key, so that
+        the key changes when the module is installed again or updated.
+
+        Args:
+            script_path (str): path to the module's script
+        """
+        from json import dumps
+        from pathlib import Path
+
+        p = Path(script_path)
+        mtimes = [
+            path.stat().st_mtime_ns if path.exists() else None
+            for path in [p, p.with_suffix(".yml")]
+        ]
+        return dumps([script_path, mtimes])
+
+    def get_warm_key(self, script_path: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Returns the key of the code and the settings a warm annotator was set
+        up with, or None if the run cannot use a warm annotator.
+
+        Args:
+            script_path (str): path to the module's script
+            kwargs (Dict[str, Any]): arguments of the annotator
+        """
+        from json import dumps
+
+        if kwargs.get("variant_store") or kwargs.get("chunk_no") is not None:
+            return None
+        return dumps(
+            [self.get_code_key(script_path), kwargs.get("module_options", {})],
+            sort_keys=True,
+            default=str,
+        )
+
+    def load_current_code(self, module_name: str, script_path: str):
+        """Removes the imported modules of a module's folder if its code
+        changed since it was imported, so that loading the module reads its
+        current code.
+
+        Args:
+            module_name (str): module_name
+            script_path (str): path to the module's script
+        """
+        import sys
+        from importlib import invalidate_caches
+        from pathlib import Path
+
+        code_key = self.get_code_key(script_path)
+        prev_code_key = self.code_keys.get(module_name)
+        self.code_keys[module_name] = code_key
+        if prev_code_key is None or prev_code_key == code_key:
+            return
+        module_dir = Path(script_path).resolve().parent
+        for name, imported in list(sys.modules.items()):
+            path = getattr(imported, "__file__", None)
+            if path and module_dir in Path(path).resolve().parents:
+                del sys.modules[name]
+        invalidate_caches()
+        self.logger.info(f"{module_name} changed and is reloaded.")
+
+    def preload(self, module_names: List[str]):
+        """Loads and sets up modules before any job asks for them.
+
+        Args:
+            module_names (List[str]): module_names
+        """
+        from ..module.local import get_local_module_info
+
+        futures = []
+        for module_name in module_names:
+            module = get_local_module_info(module_name)
+            if not module or module.type != "annotator":
+                self.logger.warning(f"{module_name} is not an installed annotator.")
+                continue
+            futures.append(
+                self.get_executor(module.name).submit(
+                    self.get_warm_annotator, module.name, str(module.script_path), {}
+                )
+            )
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.exception(e)
+
+    def get_warm_annotator(self, module_name: str, script_path: str, kwargs):
+        from .mp_runners import load_annotator
+        from types import SimpleNamespace
+
+        warm_key = self.get_warm_key(script_path, kwargs)
+        annotator = self.annotators.get(module_name)
+        if annotator is not None and self.warm_keys.get(module_name) == warm_key:
+            return annotator
+        if annotator is not None:
+            annotator.base_cleanup()
+            del self.annotators[module_name]
+        self.load_current_code(module_name, script_path)
+        module = SimpleNamespace(name=module_name, script_path=script_path)
+        annotator_kwargs = {
+            "module_options": kwargs.get("module_options", {}),
+        }
+        annotator = load_annotator(module, annotator_kwargs, None)
+        annotator.warm_up()
+        self.annotators[module_name] = annotator
+        self.warm_keys[module_name] = warm_key or ""
+        self.logger.info(f"{module_name} is warm.")
+        return annotator
+
+    def run_annotator(
+        self, module_name: str, script_path: str, kwargs: Dict[str, Any], log_path=None
+    ) -> Tuple[bool, float]:
+        """Runs an annotator on the thread of the module and returns whether it
+        succeeded and its runtime.
+
+        Args:
+            module_name (str): module_name
+            script_path (str): script_path
+            kwargs (Dict[str, Any]): arguments of the annotator for the job
+            log_path: path to the job's log file
+        """
+        future = self.get_executor(module_name).submit(
+            self._run_annotator, module_name, script_path, kwargs, log_path
+        )
+        return future.result()
+
+    def _run_annotator(
+        self, module_name: str, script_path: str, kwargs: Dict[str, Any], log_path
+    ) -> Tuple[bool, float]:
+        from time import time
+        from logging import getLogger, FileHandler, Formatter
+        from types import SimpleNamespace
+        from .mp_runners import load_annotator
+
+        start_time = time()
+        logger = getLogger("oakvar." + module_name)
+        log_handler = None
+        if log_path:
+            log_handler = FileHandler(log_path, "a")
+            log_handler.setFormatter(
+                Formatter("%(asctime)s %(name)-20s %(message)s", "%Y/%m/%d %H:%M:%S")
+            )
+            logger.addHandler(log_handler)
+        try:
+            if self.get_warm_key(script_path, kwargs) is None:
+                self.load_current_code(module_name, script_path)
+                module = SimpleNamespace(name=module_name, script_path=script_path)
+                annotator = load_annotator(module, kwargs, None)
+                annotator.run()
+                success = not annotator.run_failed
+            else:
+                annotator = self.get_warm_annotator(module_name, script_path, kwargs)
+                annotator.df_mode = kwargs.get("df_mode", False)
+                success = annotator.run_warm(
+                    kwargs["input_file"],
+                    run_name=kwargs.get("run_name"),
+                    output_dir=kwargs.get("output_dir"),
+                    secondary_inputs=kwargs.get("secondary_inputs"),
+                )
+        except Exception as e:
+            logger.exception(e)
+            success = False
+        finally:
+            if log_handler:
+                logger.removeHandler(log_handler)
+                log_handler.close()
+        return success, time() - start_time
+
+    def close(self):
+        for annotator in self.annotators.values():
+            try:
+                annotator.base_cleanup()
+            except Exception as e:
+                self.logger.exception(e)
+        self.annotators = {}
+        for executor in self.executors:
+            executor.shutdown(wait=False)
+
+
+def serve_annotator_service(
+    authkey: bytes, conn, module_names: Optional[List[str]] = None
+):
+    """Runs an annotator service and sends its address through conn.
+
+    Args:
+        authkey (bytes): authkey
+        conn: connection to send the address of the service to
+        module_names (List[str]): modules to load before serving
+    """
+    service = AnnotatorService()
+    service.preload(module_names or [])
+    AnnotatorServiceManager.register(
+        "get_service", callable=lambda: service, exposed=("run_annotator",)
+    )
+    manager = AnnotatorServiceManager(
+        address=(ANNOTATOR_SERVICE_HOST, 0), authkey=authkey
+    )
+    server = manager.get_server()
+    conn.send(server.address)
+    conn.close()
+    try:
+        server.serve_forever()
+    finally:
+        service.close()
+
+
+def start_annotator_service(
+    module_names: Optional[List[str]] = None,
+) -> Tuple[Any, Dict[str, str]]:
+    """Starts an annotator service process and returns the process and the
+    environment variables with which `ov run` can reach it.
+
+    Args:
+        module_names (List[str]): modules to load before serving
+    """
+    from multiprocessing import Pipe
+    from multiprocessing import Process
+    from secrets import token_bytes
+
+    authkey = token_bytes(16)
+    parent_conn, child_conn = Pipe()
+    p = Process(
+        target=serve_annotator_service,
+        args=(authkey, child_conn, module_names),
+        daemon=True,
+    )
+    p.start()
+    host, port = parent_conn.recv()
+    env = {
+        ANNOTATOR_SERVICE_ADDRESS_ENV_KEY: f"{host}:{port}",
+        ANNOTATOR_SERVICE_AUTHKEY_ENV_KEY: authkey.hex(),
+    }
+    return p, env
+
+
+def get_annotator_service_env() -> Optional[Tuple[Tuple[str, int], bytes]]:
+    """Returns the address and authkey of the annotator service given to this
+    process, if any.
+    """
+    from os import environ
+
+    address = environ.get(ANNOTATOR_SERVICE_ADDRESS_ENV_KEY)
+    authkey = environ.get(ANNOTATOR_SERVICE_AUTHKEY_ENV_KEY)
+    if not address or not authkey:
+        return None
+    host, port = address.rsplit(":", 1)
+    return (host, int(port)), bytes.fromhex(authkey)
+
+
+def connect_annotator_service(address, authkey: bytes):
+    """Returns a proxy of the annotator service at address.
+
+    Args:
+        address: address
+        authkey (bytes): authkey
+    """
+    AnnotatorServiceClient.register("get_service")
+    manager = AnnotatorServiceClient(address=address, authkey=authkey)
+    manager.connect()
+    return manager.get_service()
@@ -28,6 +28,10 @@ class BaseConverter(object):
         self.ignore_sample: bool = ignore_sample
         self.header_num_line: int = 0
         self.line_no: int = 0
+        self.input_encoding: Optional[str] = None
+        self._input_f = None
+        self._input_f_path: Optional[str] = None
+        self._next_line_no: int = 1
         if name:
             self.module_name = name
         self.title = title
@@ -56,23 +60,47 @@ class BaseConverter(object):
     def convert_line(self, *__args__, **__kwargs__) -> List[Dict[str, Any]]:
         return []
 
+    def get_input_file_at_line(self, input_path: str, line_no: int):
+        from itertools import islice
+        from ..util.util import open_input_file
+
+        if (
+            getattr(self, "_input_f", None) is not None
+            and self._input_f_path == input_path
+            and self._next_line_no == line_no
+        ):
+            return self._input_f
+        self.close_input_file()
+        self._input_f = open_input_file(
+            input_path, encoding=getattr(self, "input_encoding", None)
+        )
+        self._input_f_path = input_path
+        for _ in islice(self._input_f, line_no - 1):
+            pass
+        self._next_line_no = line_no
+        return self._input_f
+
+    def close_input_file(self):
+        if getattr(self, "_input_f", None) is not None:
+            self._input_f.close()
+        self._input_f = None
+        self._input_f_path = None
+        self._next_line_no = 1
+
     def get_variant_lines(
         self, input_path: str, mp: int, start_line_no: int, batch_size: int
     ) -> Tuple[Dict[int, List[Tuple[int, Any]]], bool]:
-        import linecache
-
         immature_exit: bool = False
         line_no: int = start_line_no
         end_line_no = line_no + mp * batch_size - 1
         lines: Dict[int, List[Tuple[int, Any]]] = {i: [] for i in range(mp)}
         chunk_no: int = 0
         chunk_size: int = 0
-        while True:
-            line = linecache.getline(input_path, line_no)
-            if not line:
-                break
-            line = line[:-1]
+        f = self.get_input_file_at_line(input_path, start_line_no)
+        for line in f:
+            line = line.rstrip("\n")
             lines[chunk_no].append((line_no, line))
+            self._next_line_no = line_no + 1
             chunk_size += 1
             if line_no >= end_line_no:
                 immature_exit = True
@@ -81,9 +109,14 @@ class BaseConverter(object):
             if chunk_size >= batch_size:
                 chunk_no += 1
                 chunk_size = 0
+        if not immature_exit:
+            self.close_input_file()
         return lines, immature_exit
 
     def prepare_for_mp(self):
+        """Called in each conversion worker on a copy of the converter after
+        setup. Attributes which could not be pickled, such as open files, are
+        missing from the copy and can be rebuilt here."""
         pass
 
     def write_extra_info(self, wdict: dict):
@@ -15,6 +15,8 @@ class BaseMapper(object):
         serveradmindb=None,
         module_options: Dict = {},
         postfix: str = "",
+        variant_store: bool = False,
+        mapper_cache: bool = False,
     ):
         from time import time
         from pathlib import Path
@@ -65,8 +67,30 @@ class BaseMapper(object):
         self.module_name = main_fpath.stem
         self.module_dir = main_fpath.parent
         self.gene_info = {}
+        self.extra_setup_done = False
         self.setup_logger()
         self.conf = get_module_conf(self.module_name, module_type="mapper")
+        self.variant_store = None
+        if variant_store and self.output_dir and self.output_base_fname:
+            from ..util.variant_store import VariantStore
+            from ..util.variant_store import get_run_key
+
+            self.variant_store = VariantStore(
+                run_key=get_run_key(self.output_dir, self.output_base_fname)
+            )
+        self.num_reused_mappings = 0
+        self.num_mappings = 0
+        self.mapper_cache = None
+        # The variant store already keeps mapper results.
+        if mapper_cache and not self.variant_store and self.conf is not None:
+            from ..module.mapper_cache import MapperCache
+
+            self.mapper_cache = MapperCache(
+                self.module_name,
+                self.module_dir,
+                self.conf.get("version", ""),
+                primary_transcript_paths=self.primary_transcript_paths,
+            )
 
     def setup(self):
         raise NotImplementedError("Mapper must have a setup() method.")
@@ -98,6 +122,17 @@ class BaseMapper(object):
             self.reader = FileReader(self.input_path)
         return self.reader
 
+    def get_output_fmt(self) -> str:
+        if self.reader is not None and self.reader.arrowfmt:
+            return "arrow"
+        return "csv"
+
+    def close_output_files(self):
+        if self.crx_writer is not None:
+            self.crx_writer.close()
+        if self.crg_writer is not None:
+            self.crg_writer.close()
+
     def make_crx_writer(self):
         from ..util.inout import FileWriter
         from ..util.util import get_crx_def
@@ -109,7 +144,7 @@ class BaseMapper(object):
         crx_def = get_crx_def()
         crx_fname = f"{self.output_base_fname}{VARIANT_LEVEL_MAPPED_FILE_SUFFIX}"
         self.crx_path = self.output_dir / (crx_fname + self.postfix)
-        self.crx_writer = FileWriter(self.crx_path)
+        self.crx_writer = FileWriter(self.crx_path, fmt=self.get_output_fmt())
         self.crx_writer.add_columns(crx_def)
         self.crx_writer.write_definition(self.conf)
         for index_columns in crx_idx:
@@ -134,7 +169,7 @@ class BaseMapper(object):
         crg_def = get_crg_def()
         crg_fname = f"{self.output_base_fname}{GENE_LEVEL_MAPPED_FILE_SUFFIX}"
         self.crg_path = self.output_dir / (crg_fname + self.postfix)
-        self.crg_writer = FileWriter(self.crg_path)
+        self.crg_writer = FileWriter(self.crg_path, fmt=self.get_output_fmt())
         self.crg_writer.add_columns(crg_def)
         self.crg_writer.write_definition(self.conf)
         for index_columns in crg_idx:
@@ -148,6 +183,70 @@ class BaseMapper(object):
     def map(self, crv_data: dict):
         _ = crv_data
 
+    def get_variant_store_version(self) -> str:
+        version = self.conf.get("version", "") if self.conf else ""
+        return f"{version}:{';'.join(self.primary_transcript_paths)}"
+
+    def map_with_variant_store(self, crv_data: dict):
+        if not self.variant_store:
+            return self.map_with_cache(crv_data)
+        uid = crv_data["uid"]
+        data = {k: v for k, v in crv_data.items() if k != "uid"}
+        version = self.get_variant_store_version()
+        self.num_mappings += 1
+        found, crx_data = self.variant_store.get_result(self.module_name, version, data)
+        if found:
+            self.num_reused_mappings += 1
+            if crx_data:
+                crx_data["uid"] = uid
+            return crx_data
+        crx_data = self.map_with_cache(crv_data)
+        if crx_data:
+            self.variant_store.add_result(
+                self.module_name,
+                version,
+                data,
+                {k: v for k, v in crx_data.items() if k != "uid"},
+            )
+        else:
+            self.variant_store.add_result(self.module_name, version, data, crx_data)
+        return crx_data
+
+    def map_with_cache(self, crv_data: dict):
+        if not self.mapper_cache:
+            return self.map(crv_data)
+        crx_data = self.mapper_cache.get(crv_data)
+        if crx_data is not None:
+            crx_data["uid"] = crv_data["uid"]
+            return crx_data
+        crx_data = self.map(crv_data)
+        if crx_data:
+            self.mapper_cache.add(crv_data, crx_data)
+        return crx_data
+
+    def get_mapper_cache_stats(self) -> Dict[str, int]:
+        if not self.mapper_cache:
+            return {}
+        return self.mapper_cache.get_stats()
+
+    def close_mapper_cache(self):
+        if not self.mapper_cache or self.logger is None:
+            return
+        self.mapper_cache.close()
+        stats = self.mapper_cache.get_stats()
+        self.logger.info(
+            f"mapper cache: {stats['hits']} hits, {stats['misses']} misses, "
+            + f"{stats['evicted']} evicted"
+        )
+
+    def close_variant_store(self):
+        if not self.variant_store:
+            return
+        self.variant_store.add_run_stats(
+            "mapper", self.module_name, self.num_reused_mappings, self.num_mappings
+        )
+        self.variant_store.close()
+
     def process_file(self):
         from time import time
         from ..util.run import update_status
@@ -171,7 +270,7 @@ class BaseMapper(object):
                     crx_data = crv_data
                     crx_data["all_mappings"] = "{}"
                 else:
-                    crx_data = self.map(crv_data)
+                    crx_data = self.map_with_variant_store(crv_data)
                 if not crx_data:
                     continue
                 col_name = "pos_end"
@@ -303,9 +402,36 @@ class BaseMapper(object):
         update_status(status, logger=self.logger, serveradmindb=self.serveradmindb)
         self.process_file()
         self.write_crg()
+        self.close_output_files()
+        self.close_variant_store()
+        self.close_mapper_cache()
         stop_time = time()
         tstamp = asctime(localtime(stop_time))
         self.logger.info(f"finished: {tstamp} | {self.seekpos}")
         runtime = stop_time - start_time
         self.logger.info("runtime: %6.3f" % runtime)
         self.end()
+
+    def run_chunk(self, seekpos: int, chunksize: int, pos_no: int):
+        """Maps one chunk of the input. setup() should have been called already,
+        which lets a long-lived worker load gene models once for all its chunks.
+        Only the input reader and output writers are made for each chunk.
+        """
+        from time import time
+
+        if self.logger is None:
+            raise
+        self.seekpos = seekpos
+        self.chunksize = chunksize
+        self.postfix = f".{pos_no:010.0f}"
+        self.gene_info = {}
+        start_time = time()
+        self.setup_input_output()
+        if not self.extra_setup_done:
+            self.extra_setup()
+            self.extra_setup_done = True
+        self.process_file()
+        self.write_crg()
+        self.close_output_files()
+        runtime = time() - start_time
+        self.logger.info(f"chunk {pos_no} | {seekpos}: runtime {runtime:6.3f}")
@@ -16,6 +16,12 @@ chromdict = {
     "chr24": "chrY",
 }
 base_re = compile("^[ATGC]+|[-]+$")
+# Errors are counted by type. Only the first ones of each type are written
+# to the error log, and fewer are kept as examples in the summary.
+MAX_ERROR_LINES_PER_TYPE = 1000
+MAX_ERROR_SAMPLES_PER_TYPE = 5
+# Error types of which a traceback was already formatted in this process.
+formatted_error_types = set()
 
 class LinesData:
     def __init__(self, lines_data: Dict[int, List[Tuple[int, Dict[str, Any]]]]):
@@ -31,26 +37,31 @@ def flush_err_holder(err_holder: list, error_logger, force: bool=False):
             error_logger.error(err_line)
         err_holder.clear()
 
-def _log_conversion_error(logger, error_logger, input_path: str, line_no: int, e, unique_excs: dict, err_holder: list):
+def get_conversion_error_str(e) -> Optional[str]:
     from traceback import format_exc
     from oakvar.lib.exceptions import ExpectedException
     from oakvar.lib.exceptions import NoAlternateAllele
 
     if isinstance(e, NoAlternateAllele):
-        return
+        return None
     if isinstance(e, ExpectedException):
-        err_str = str(e)
+        return str(e)
     else:
-        err_str = format_exc().rstrip()
-    if err_str not in unique_excs:
-        err_no = len(unique_excs)
-        unique_excs[err_str] = err_no
-        logger.error(f"Error [{err_no}]: {input_path}: {err_str}")
-        err_holder.append(f"{err_no}:{line_no}\t{str(e)}")
+        return format_exc().rstrip()
+
+def collect_conversion_error(line_no: int, e, conversion_errors: list):
+    from oakvar.lib.exceptions import NoAlternateAllele
+
+    if isinstance(e, NoAlternateAllele):
+        return
+    err_type = type(e).__name__
+    # Formatting tracebacks is slow, so it is done once per error type.
+    if err_type in formatted_error_types:
+        err_str = None
     else:
-        err_no = unique_excs[err_str]
-        err_holder.append(f"{err_no}:{line_no}\t{str(e)}")
-    flush_err_holder(err_holder, error_logger)
+        formatted_error_types.add(err_type)
+        err_str = get_conversion_error_str(e)
+    conversion_errors.append((line_no, err_type, err_str, str(e)))
 
 def is_chrM(wdict):
     return wdict["chrom"] == "chrM"
@@ -80,6 +91,15 @@ def perform_liftover_if_needed(variant, do_liftover: bool, do_liftover_chrM: boo
             lifter=lifter,
             wgs_reader=wgs_reader,
         )
+        if (
+            len(prelift_wdict["ref_base"]) == 1
+            and variant["chrom"] == prelift_wdict["chrom"]
+            and int(prelift_wdict["pos_end"]) == int(prelift_wdict["pos"])
+        ):
+            # A single-base start was lifted with one lookup, which is
+            # the same lookup as the end.
+            variant["pos_end"] = variant["pos"]
+            return crl_data
         converted_end = liftover_one_pos(
             variant["chrom"], variant["pos_end"], lifter=lifter
         )
@@ -194,7 +214,7 @@ def handle_variant(
     return crl_data
 
 def handle_converted_variants(
-        variants: List[Dict[str, Any]], do_liftover: bool, do_liftover_chrM: bool, lifter, wgs_reader, logger, error_logger, input_path: str, unique_excs: dict, err_holder: list, line_no: int, num_valid_error_lines: Dict[str, int]
+        variants: List[Dict[str, Any]], do_liftover: bool, do_liftover_chrM: bool, lifter, wgs_reader, conversion_errors: list, line_no: int, num_valid_error_lines: Dict[str, int]
 ):
     from oakvar.lib.exceptions import IgnoredVariant
 
@@ -209,7 +229,7 @@ def handle_converted_variants(
         try:
             crl_data = handle_variant(variant, unique_vars, do_liftover, do_liftover_chrM, lifter, wgs_reader, line_no, num_valid_error_lines)
         except Exception as e:
-            _log_conversion_error(logger, error_logger, input_path, line_no, e, unique_excs, err_holder)
+            collect_conversion_error(line_no, e, conversion_errors)
             continue
         variant_l.append(variant)
         if crl_data:
@@ -218,26 +238,20 @@ def handle_converted_variants(
 
 def gather_variantss(
         converter: BaseConverter, 
-        lines_data: Dict[int, List[Tuple[int, Dict[str, Any]]]],
-        core_num: int, 
+        line_data: List[Tuple[int, Any]],
         do_liftover: bool, 
         do_liftover_chrM: bool, 
         lifter, 
         wgs_reader, 
-        logger, 
-        error_logger, 
-        input_path: str, 
-        unique_excs: dict, 
-        err_holder: list,
+        conversion_errors: list,
         num_valid_error_lines: Dict[str, int],
-) -> Tuple[List[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+) -> Tuple[List[List[Dict[str, Any]]], List[List[Dict[str, Any]]]]:
     variants_l = []
     crl_l = []
-    line_data = lines_data[core_num]
     for (line_no, line) in line_data:
         try:
             variants = converter.convert_line(line)
-            variants_datas, crl_datas = handle_converted_variants(variants, do_liftover, do_liftover_chrM, lifter, wgs_reader, logger, error_logger, input_path, unique_excs, err_holder, line_no, num_valid_error_lines)
+            variants_datas, crl_datas = handle_converted_variants(variants, do_liftover, do_liftover_chrM, lifter, wgs_reader, conversion_errors, line_no, num_valid_error_lines)
             if variants_datas is None or crl_datas is None:
                 continue
             variants_l.append(variants_datas)
@@ -245,12 +259,146 @@ def gather_variantss(
         except KeyboardInterrupt:
             raise
         except Exception as e:
-            _log_conversion_error(logger, error_logger, input_path, line_no, e, unique_excs, err_holder)
+            collect_conversion_error(line_no, e, conversion_errors)
             num_valid_error_lines["error"] += 1
     return variants_l, crl_l
 
-def gather_variantss_wrapper(args):
-    return gather_variantss(*args)
+# Per-process state of conversion workers. Each worker gets the master's
+# converter state and builds its own lifter and wgs_reader once, as the
+# lifter and the wgs_reader cannot be pickled.
+conversion_worker: Dict[str, Any] = {}
+
+def init_conversion_worker(
+        script_path: str,
+        converter_state: Dict[str, Any],
+        ignore_sample: bool,
+        genome_assembly: str,
+        do_liftover: bool,
+        do_liftover_chrM: bool,
+):
+    import signal
+    from oakvar.lib.util.util import load_class
+    from oakvar.lib.util.seq import get_lifter
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    formatted_error_types.clear()
+    try:
+        cls = load_class(script_path)
+        converter = cls(ignore_sample=ignore_sample)
+        # setup already ran in the master. Running it again here would repeat
+        # its side effects, such as creating side files, once per worker.
+        converter.__dict__.update(converter_state)
+        converter.prepare_for_mp()
+        if do_liftover or do_liftover_chrM:
+            lifter = get_lifter(source_assembly=genome_assembly)
+        else:
+            lifter = None
+        conversion_worker["converter"] = converter
+        conversion_worker["lifter"] = lifter
+        conversion_worker["wgs_reader"] = get_ref_base_cache()
+        conversion_worker["do_liftover"] = do_liftover
+        conversion_worker["do_liftover_chrM"] = do_liftover_chrM
+    except Exception as e:
+        conversion_worker["exception"] = e
+
+def get_ref_base_cache():
+    from oakvar.lib.util.seq import get_wgs_reader
+    from oakvar.lib.util.seq import RefBaseCache
+
+    wgs_reader = get_wgs_reader(assembly="hg38")
+    if wgs_reader is None:
+        return None
+    return RefBaseCache(wgs_reader)
+
+def get_ref_base_cache_stats(wgs_reader) -> Dict[str, int]:
+    if wgs_reader is None or not hasattr(wgs_reader, "get_stats"):
+        return {"hits": 0, "misses": 0}
+    return wgs_reader.get_stats()
+
+def convert_lines_in_worker(line_data: List[Tuple[int, Any]]):
+    if "exception" in conversion_worker:
+        raise conversion_worker["exception"]
+    conversion_errors = []
+    num_valid_error_lines = {"valid": 0, "error": 0}
+    wgs_reader = conversion_worker["wgs_reader"]
+    stats_before = get_ref_base_cache_stats(wgs_reader)
+    variants_l, crl_l = gather_variantss(
+        conversion_worker["converter"],
+        line_data,
+        conversion_worker["do_liftover"],
+        conversion_worker["do_liftover_chrM"],
+        conversion_worker["lifter"],
+        wgs_reader,
+        conversion_errors,
+        num_valid_error_lines,
+    )
+    stats_after = get_ref_base_cache_stats(wgs_reader)
+    ref_cache_stats = {k: stats_after[k] - stats_before[k] for k in stats_after}
+    return variants_l, crl_l, conversion_errors, num_valid_error_lines, ref_cache_stats
+
+def get_tabix_index_path(input_path: str) -> Optional[str]:
+    from pathlib import Path
+    from oakvar.lib.util.util import is_gzip_file
+
+    if not is_gzip_file(input_path):
+        return None
+    for suffix in [".tbi", ".csi"]:
+        index_path = input_path + suffix
+        if Path(index_path).exists():
+            return index_path
+    return None
+
+def get_tabix_regions(
+        input_path: str, index_path: str, region_size: int
+) -> Optional[Tuple[int, List[Tuple[str, Optional[int], Optional[int]]]]]:
+    from re import search
+
+    try:
+        import pysam
+    except ModuleNotFoundError:
+        return None
+    tbx = pysam.TabixFile(input_path, index=index_path)
+    header = list(tbx.header)
+    contig_lengths: Dict[str, int] = {}
+    for line in header:
+        if not line.startswith("##contig=<"):
+            continue
+        id_match = search(r"[<,]ID=([^,>]+)", line)
+        length_match = search(r"[<,]length=(\d+)", line)
+        if id_match and length_match:
+            contig_lengths[id_match.group(1)] = int(length_match.group(1))
+    regions: List[Tuple[str, Optional[int], Optional[int]]] = []
+    for contig in tbx.contigs:
+        length = contig_lengths.get(contig)
+        if not length:
+            regions.append((contig, None, None))
+            continue
+        for start in range(0, length, region_size):
+            end = start + region_size
+            regions.append((contig, start, end if end < length else None))
+    tbx.close()
+    return len(header), regions
+
+def convert_region_in_worker(input_path: str, index_path: str, region: Tuple[str, Optional[int], Optional[int]]):
+    import pysam
+
+    if "exception" in conversion_worker:
+        raise conversion_worker["exception"]
+    if "tabix" not in conversion_worker:
+        conversion_worker["tabix"] = pysam.TabixFile(input_path, index=index_path)
+    tbx = conversion_worker["tabix"]
+    contig, start, end = region
+    line_data: List[Tuple[int, Any]] = []
+    line_no: int = 0
+    for line in tbx.fetch(contig, start, end):
+        # fetch returns records overlapping the region. Only those starting
+        # in the region are kept so that each record is converted once.
+        if start is not None and int(line.split("\t", 2)[1]) - 1 < start:
+            continue
+        line_no += 1
+        line_data.append((line_no, line))
+    return convert_lines_in_worker(line_data) + (line_no,)
+
 
 class MasterConverter(object):
     def __init__(
@@ -266,10 +414,11 @@ class MasterConverter(object):
         input_encoding=None,
         ignore_sample: bool=False,
         mp: int=1,
+        intermediate_format: str="csv",
+        variant_store: bool=False,
         outer=None,
     ):
         from re import compile
-        from oakvar import get_wgs_reader
         from oakvar.lib.exceptions import ExpectedException
 
         self.logger = None
@@ -286,7 +435,9 @@ class MasterConverter(object):
         self.input_file_handles: Dict[str, str] = {}
         self.output_base_fname: Optional[str] = None
         self.error_logger = None
-        self.unique_excs: Dict[str, int] = {}
+        self.unique_excs: Dict[Tuple[str, str], int] = {}
+        self.error_counts: Dict[Tuple[str, str], int] = {}
+        self.error_samples: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
         self.err_holder = []
         self.wpath = None
         self.crm_path = None
@@ -337,9 +488,21 @@ class MasterConverter(object):
         self.input_encoding = input_encoding
         self.outer = outer
         self.setup_logger()
-        self.wgs_reader = get_wgs_reader(assembly="hg38")
+        # Made on first use, as conversion workers have their own.
+        self.wgs_reader = None
+        self.ref_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
         self.time_error_written: float = 0
         self.mp = mp
+        self.intermediate_format = intermediate_format
+        self.region_size: int = 1_000_000
+        self.variant_store = None
+        if variant_store and self.output_dir and self.name:
+            from oakvar.lib.util.variant_store import VariantStore
+            from oakvar.lib.util.variant_store import get_run_key
+
+            self.variant_store = VariantStore(run_key=get_run_key(self.output_dir, self.name))
+        self.num_stored_variants: int = 0
+        self.num_new_variants: int = 0
 
     def get_genome_assembly(self, converter) -> str:
         from oakvar.lib.system.consts import default_assembly_key
@@ -566,7 +729,7 @@ class MasterConverter(object):
         self.wpath = Path(self.output_dir) / (
             self.output_base_fname + STANDARD_INPUT_FILE_SUFFIX
         )
-        self.crv_writer = FileWriter(self.wpath)
+        self.crv_writer = FileWriter(self.wpath, fmt=self.intermediate_format)
         self.crv_writer.add_columns(crv_def)
         self.crv_writer.write_definition()
         for index_columns in crv_idx:
@@ -665,6 +828,7 @@ class MasterConverter(object):
         self.error_logger = getLogger("err." + converter.module_name)
         converter.input_path = input_path
         converter.input_paths = self.input_paths
+        converter.input_encoding = encoding
         converter.setup(input_path, encoding=encoding)
         genome_assembly = self.get_genome_assembly(converter)
         self.genome_assemblies.append(genome_assembly)
@@ -685,6 +849,11 @@ class MasterConverter(object):
             variant.get("chrom"), variant.get("chrom")
         )
 
+    def get_wgs_reader(self):
+        if self.wgs_reader is None:
+            self.wgs_reader = get_ref_base_cache()
+        return self.wgs_reader
+
     def handle_ref_base(self, variant):
         from oakvar.lib.exceptions import IgnoredVariant
 
@@ -692,9 +861,10 @@ class MasterConverter(object):
             "",
             ".",
         ]:
-            if not self.wgs_reader:
+            wgs_reader = self.get_wgs_reader()
+            if not wgs_reader:
                 raise
-            variant["ref_base"] = self.wgs_reader.get_bases(
+            variant["ref_base"] = wgs_reader.get_bases(
                 variant.get("chrom"), int(variant["pos"])
             ).upper()
         else:
@@ -707,9 +877,10 @@ class MasterConverter(object):
             ]:
                 raise IgnoredVariant("Reference base required for non SNV")
             elif ref_base is None or ref_base == "":
-                if not self.wgs_reader:
+                wgs_reader = self.get_wgs_reader()
+                if not wgs_reader:
                     raise
-                variant["ref_base"] = self.wgs_reader.get_bases(
+                variant["ref_base"] = wgs_reader.get_bases(
                     variant.get("chrom"), int(variant.get("pos"))
                 )
 
@@ -752,10 +923,204 @@ class MasterConverter(object):
             else:
                 variant[col_name] = variant["pos"] + ref_len - 1
 
+    def get_num_workers(self) -> int:
+        from oakvar.lib.system import get_max_num_concurrent_modules_per_job
+
+        num_workers = get_max_num_concurrent_modules_per_job()
+        if self.mp:
+            try:
+                mp = int(self.mp)
+                if mp >= 1:
+                    num_workers = mp
+            except Exception:
+                if self.logger:
+                    self.logger.exception(f"error handling mp argument: {self.mp}")
+        return num_workers
+
+    def get_converter_state(self, converter: BaseConverter) -> Dict[str, Any]:
+        """Returns the attributes of a converter after its setup which can be
+        sent to conversion workers. Attributes which cannot be pickled, such
+        as open files, are left out. Converters which need them in workers
+        should rebuild them in prepare_for_mp.
+
+        Args:
+            converter (BaseConverter): converter after setup
+        """
+        from pickle import dumps
+
+        # The master's input file position is not used by workers.
+        skip_attr_names = ["_input_f", "_input_f_path", "_next_line_no"]
+        state = {}
+        for attr_name, value in converter.__dict__.items():
+            if attr_name in skip_attr_names:
+                continue
+            try:
+                dumps(value)
+            except Exception:
+                if self.logger:
+                    self.logger.info(
+                        f"{converter.module_name}.{attr_name} is not sent to conversion workers."
+                    )
+                continue
+            state[attr_name] = value
+        return state
+
+    def make_conversion_pool(self, converter: BaseConverter, num_workers: int):
+        from multiprocessing import Pool
+
+        initargs = (
+            converter.script_path,
+            self.get_converter_state(converter),
+            self.ignore_sample,
+            self.genome_assemblies[-1],
+            self.do_liftover,
+            self.do_liftover_chrM,
+        )
+        return Pool(num_workers, init_conversion_worker, initargs)
+
+    def convert_lines(self, converter: BaseConverter, line_data: List[Tuple[int, Any]]):
+        conversion_errors = []
+        num_valid_error_lines = {"valid": 0, "error": 0}
+        wgs_reader = self.get_wgs_reader()
+        stats_before = get_ref_base_cache_stats(wgs_reader)
+        variants_l, crl_l = gather_variantss(
+            converter,
+            line_data,
+            self.do_liftover or False,
+            self.do_liftover_chrM or False,
+            self.lifter,
+            wgs_reader,
+            conversion_errors,
+            num_valid_error_lines,
+        )
+        stats_after = get_ref_base_cache_stats(wgs_reader)
+        ref_cache_stats = {k: stats_after[k] - stats_before[k] for k in stats_after}
+        return variants_l, crl_l, conversion_errors, num_valid_error_lines, ref_cache_stats
+
+    def iter_converted_batches(self, converter: BaseConverter, input_path: str, num_workers: int, batch_size: int):
+        from collections import deque
+
+        start_line_no: int = 1
+        immature_exit: bool = True
+        if num_workers == 1:
+            while immature_exit:
+                lines_data, immature_exit = converter.get_variant_lines(input_path, 1, start_line_no, batch_size)
+                start_line_no += batch_size
+                yield self.convert_lines(converter, lines_data[0]) + (len(lines_data[0]),)
+            return
+        index_path = get_tabix_index_path(input_path)
+        if index_path and converter.format_name == "vcf":
+            tabix_regions = get_tabix_regions(input_path, index_path, self.region_size)
+            if tabix_regions:
+                num_header_lines, regions = tabix_regions
+                if self.logger:
+                    self.logger.info(f"converting {input_path} by {len(regions)} genomic regions")
+                yield from self.iter_converted_regions(converter, input_path, index_path, regions, num_header_lines, num_workers)
+                return
+        # Batches are converted in worker processes while results are
+        # consumed in submission order, which keeps uids deterministic.
+        max_num_pending = num_workers * 2
+        pending = deque()
+        pool = self.make_conversion_pool(converter, num_workers)
+        try:
+            while immature_exit or pending:
+                while immature_exit and len(pending) < max_num_pending:
+                    lines_data, immature_exit = converter.get_variant_lines(input_path, 1, start_line_no, batch_size)
+                    start_line_no += batch_size
+                    pending.append((pool.apply_async(convert_lines_in_worker, (lines_data[0],)), len(lines_data[0])))
+                job, num_lines = pending.popleft()
+                yield job.get() + (num_lines,)
+            pool.close()
+            pool.join()
+        finally:
+            pool.terminate()
+
+    def iter_converted_regions(self, converter: BaseConverter, input_path: str, index_path: str, regions: list, num_header_lines: int, num_workers: int):
+        from collections import deque
+
+        max_num_pending = num_workers * 2
+        pending = deque()
+        region_no: int = 0
+        line_no_offset: int = num_header_lines
+        pool = self.make_conversion_pool(converter, num_workers)
+        try:
+            while region_no < len(regions) or pending:
+                while region_no < len(regions) and len(pending) < max_num_pending:
+                    pending.append(pool.apply_async(convert_region_in_worker, (input_path, index_path, regions[region_no])))
+                    region_no += 1
+                variants_l, crl_l, conversion_errors, num_valid_error_lines, ref_cache_stats, num_lines = pending.popleft().get()
+                # Workers number lines from the start of each region. Regions
+                # are consumed in file order, so the offset is known here.
+                for variants in variants_l:
+                    for variant in variants:
+                        if "original_line" in variant:
+                            variant["original_line"] += line_no_offset
+                conversion_errors = [(line_no + line_no_offset, err_type, err_str, msg) for line_no, err_type, err_str, msg in conversion_errors]
+                line_no_offset += num_lines
+                yield variants_l, crl_l, conversion_errors, num_valid_error_lines, ref_cache_stats, num_lines
+            pool.close()
+            pool.join()
+        finally:
+            pool.terminate()
+
+    def log_conversion_errors(self, input_path: str, converter: BaseConverter, conversion_errors: list):
+        from pathlib import Path
+
+        if not self.logger:
+            return
+        converter_name = converter.module_name or converter.format_name or ""
+        for line_no, err_type, err_str, msg in conversion_errors:
+            key = (converter_name, err_type)
+            count = self.error_counts.get(key, 0)
+            if count == 0:
+                err_no = len(self.unique_excs)
+                self.unique_excs[key] = err_no
+                self.logger.error(f"Error [{err_no}]: {input_path}: {err_str or msg}")
+                self.error_samples[key] = []
+            else:
+                err_no = self.unique_excs[key]
+            self.error_counts[key] = count + 1
+            if count < MAX_ERROR_SAMPLES_PER_TYPE:
+                self.error_samples[key].append(
+                    {"input": Path(input_path).name, "line": line_no, "message": msg}
+                )
+            if count < MAX_ERROR_LINES_PER_TYPE:
+                self.err_holder.append(f"{err_no}:{line_no}\t{msg}")
+            elif count == MAX_ERROR_LINES_PER_TYPE:
+                self.err_holder.append(
+                    f"{err_no}:\tmore errors of this type are counted in the summary only."
+                )
+        flush_err_holder(self.err_holder, self.error_logger)
+
+    def get_error_summary(self) -> List[Dict[str, Any]]:
+        summary = []
+        for key, err_no in self.unique_excs.items():
+            converter_name, err_type = key
+            summary.append(
+                {
+                    "no": err_no,
+                    "converter": converter_name,
+                    "error": err_type,
+                    "count": self.error_counts[key],
+                    "samples": self.error_samples[key],
+                }
+            )
+        return summary
+
+    def log_error_summary(self):
+        if not self.logger or not self.unique_excs:
+            return
+        self.logger.info("conversion error summary:")
+        self.logger.info("no\tconverter\terror\tcount\texample")
+        for row in self.get_error_summary():
+            sample = row["samples"][0] if row["samples"] else {}
+            example = f"{sample.get('input')}:{sample.get('line')}: {sample.get('message')}"
+            self.logger.info(
+                f"{row['no']}\t{row['converter']}\t{row['error']}\t{row['count']}\t{example}"
+            )
+
     def run(self):
         from pathlib import Path
-        from multiprocessing.pool import ThreadPool
-        #import time
         from oakvar.lib.util.run import update_status
 
         if not self.input_paths or not self.logger:
@@ -774,9 +1139,10 @@ class MasterConverter(object):
         if not self.crl_writer:
             raise ValueError("No crl_writer")
         batch_size: int = 2500
+        status_interval: int = 10000
         uid = 1
-        num_pool = 4
-        pool = ThreadPool(num_pool)
+        num_workers = self.get_num_workers()
+        self.logger.info(f"num_workers: {num_workers}")
         for input_path in self.input_paths:
             self.input_fname = Path(input_path).name
             fileno = self.input_path_dict2[input_path]
@@ -784,62 +1150,46 @@ class MasterConverter(object):
             self.file_num_valid_variants = 0
             self.file_error_lines = 0
             self.num_valid_error_lines = {"valid": 0, "error": 0}
-            start_line_pos: int = 1
-            start_line_no: int = start_line_pos
-            round_no: int = 0
-            #stime = time.time()
-            while True:
-                #ctime = time.time()
-                lines_data, immature_exit = converter.get_variant_lines(input_path, num_pool, start_line_no, batch_size)
-                args = [
-                    (
-                        converter, 
-                        lines_data,
-                        core_num, 
-                        self.do_liftover, 
-                        self.do_liftover_chrM, 
-                        self.lifter, 
-                        self.wgs_reader, 
-                        self.logger, 
-                        self.error_logger, 
-                        input_path, 
-                        self.unique_excs, 
-                        self.err_holder,
-                        self.num_valid_error_lines,
-                    ) for core_num in range(num_pool)
-                ]
-                results = pool.map(gather_variantss_wrapper, args)
-                lines_data = None
-                for result in results:
-                    variants_l, crl_l = result
-                    for i in range(len(variants_l)):
-                        variants = variants_l[i]
-                        crl_data = crl_l[i]
-                        if len(variants) == 0:
-                            continue
-                        for variant in variants:
-                            variant["uid"] = uid + variant["var_no"]
-                            if variant["unique"]:
-                                self.crv_writer.write_data(variant)
-                                variant["fileno"] = fileno
-                                self.crm_writer.write_data(variant)
-                                converter.write_extra_info(variant)
-                            self.crs_writer.write_data(variant)
-                        for crl in crl_data:
-                            self.crl_writer.write_data(crl)
-                        uid += max([v["var_no"] for v in variants]) + 1
-                    variants_l = None
-                    crl_l = None
-                if not immature_exit:
-                    break
-                start_line_no += batch_size * num_pool
-                round_no += 1
-                status = (
-                    f"Running Converter ({self.input_fname}): line {start_line_no - 1}"
-                )
-                update_status(
-                    status, logger=self.logger, serveradmindb=self.serveradmindb
-                )
+            num_lines: int = 0
+            formatted_error_types.clear()
+            for result in self.iter_converted_batches(converter, input_path, num_workers, batch_size):
+                variants_l, crl_l, conversion_errors, num_valid_error_lines, ref_cache_stats, num_batch_lines = result
+                self.log_conversion_errors(input_path, converter, conversion_errors)
+                for k, v in ref_cache_stats.items():
+                    self.ref_cache_stats[k] += v
+                self.num_valid_error_lines["valid"] += num_valid_error_lines["valid"]
+                self.num_valid_error_lines["error"] += num_valid_error_lines["error"]
+                unique_variants = []
+                for i in range(len(variants_l)):
+                    variants = variants_l[i]
+                    crl_data = crl_l[i]
+                    if len(variants) == 0:
+                        continue
+                    for variant in variants:
+                        variant["uid"] = uid + variant["var_no"]
+                        if variant["unique"]:
+                            unique_variants.append(variant)
+                            self.crv_writer.write_data(variant)
+                            variant["fileno"] = fileno
+                            self.crm_writer.write_data(variant)
+                            converter.write_extra_info(variant)
+                        self.crs_writer.write_data(variant)
+                    for crl in crl_data:
+                        self.crl_writer.write_data(crl)
+                    uid += max([v["var_no"] for v in variants]) + 1
+                self.add_to_variant_store(unique_variants)
+                variants_l = None
+                crl_l = None
+                prev_num_lines = num_lines
+                num_lines += num_batch_lines
+                if num_lines // status_interval > prev_num_lines // status_interval:
+                    status = (
+                        f"Running Converter ({self.input_fname}): line {num_lines}"
+                    )
+                    update_status(
+                        status, logger=self.logger, serveradmindb=self.serveradmindb
+                    )
+            converter.close_input_file()
             self.logger.info(
                 f"{input_path}: number of valid variants: {self.num_valid_error_lines['valid']}"
             )
@@ -850,6 +1200,8 @@ class MasterConverter(object):
         flush_err_holder(self.err_holder, self.error_logger, force=True)
         self.close_output_files()
         self.end()
+        self.log_error_summary()
+        self.log_variant_store_stats()
         self.log_ending()
         ret = {
             "total_lnum": self.total_num_converted_variants,
@@ -857,9 +1209,29 @@ class MasterConverter(object):
             "error_lnum": self.total_error_lines,
             "input_formats": self.input_formats,
             "assemblies": self.genome_assemblies,
+            "conversion_errors": self.get_error_summary(),
         }
         return ret
 
+    def add_to_variant_store(self, variants: List[Dict[str, Any]]):
+        if not self.variant_store or not variants:
+            return
+        num_stored = self.variant_store.add_variants(variants)
+        self.num_stored_variants += num_stored
+        self.num_new_variants += len(variants) - num_stored
+
+    def log_variant_store_stats(self):
+        if not self.variant_store or not self.logger:
+            return
+        num_total = self.num_stored_variants + self.num_new_variants
+        self.variant_store.add_run_stats(
+            "converter", "converter", self.num_stored_variants, num_total
+        )
+        self.variant_store.close()
+        self.logger.info(
+            f"variants already in variant store: {self.num_stored_variants}/{num_total}"
+        )
+
     def set_variables_pre_run(self):
         from time import time
 
@@ -879,6 +1251,12 @@ class MasterConverter(object):
             )
         )
         self.logger.info("total number of lines skipped due to errors: %d" % self.total_error_lines)
+        num_lookups = self.ref_cache_stats["hits"] + self.ref_cache_stats["misses"]
+        if num_lookups:
+            hit_rate = self.ref_cache_stats["hits"] / num_lookups * 100
+            self.logger.info(
+                f"reference base cache hit rate: {hit_rate:.1f}% ({self.ref_cache_stats['hits']}/{num_lookups})"
+            )
         end_time = time()
         self.logger.info("finished: %s" % asctime(localtime(end_time)))
         runtime = round(end_time - self.start_time, 3)
@@ -912,7 +1290,7 @@ class MasterConverter(object):
                 variant["ref_base"],
                 variant["alt_base"],
                 lifter=self.lifter,
-                wgs_reader=self.wgs_reader,
+                wgs_reader=self.get_wgs_reader(),
             )
             converted_end = liftover_one_pos(
                 variant["chrom"], variant["pos_end"], lifter=self.lifter
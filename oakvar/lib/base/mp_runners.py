@@ -4,54 +4,175 @@ def init_worker():
     signal.signal(signal.SIGINT, signal.SIG_IGN)
 
 
+def get_annotator_logger(module_name: str, logtofile, log_path):
+    from logging import getLogger, StreamHandler, FileHandler, Formatter
+
+    logger = None
+    try:
+        logger = getLogger(module_name)
+        if logtofile and log_path:
+            log_handler = FileHandler(log_path, "a")
+        else:
+            log_handler = StreamHandler()
+        formatter = Formatter(
+            "%(asctime)s %(name)-20s %(message)s", "%Y/%m/%d %H:%M:%S"
+        )
+        log_handler.setFormatter(formatter)
+        logger.addHandler(log_handler)
+    except Exception:
+        import traceback
+
+        traceback.print_exc()
+    return logger
+
+
+def load_annotator(module, kwargs, serveradmindb):
+    from ..util.util import load_class
+    from ..exceptions import ModuleLoadingError
+
+    kwargs["serveradmindb"] = serveradmindb
+    annotator_class = load_class(module.script_path, "Annotator")
+    if not annotator_class:
+        annotator_class = load_class(module.script_path, "CravatAnnotator")
+    if not annotator_class:
+        raise ModuleLoadingError(msg=f"Annotator of {module.name} could not be loaded.")
+    return annotator_class(**kwargs)
+
+
 def annot_from_queue(
     start_queue, end_queue, queue_populated, serveradmindb, logtofile, log_path
 ):
-    from ..util.util import load_class
-    from logging import getLogger, StreamHandler, FileHandler, Formatter
     from queue import Empty
+    from time import time
     from ..exceptions import ModuleLoadingError
 
     while True:
         try:
             task = start_queue.get(True, 1)
         except Empty:
-            if queue_populated:
+            if queue_populated.value:
                 break
             else:
                 continue
-        logger = None
         module, kwargs = task
+        if isinstance(module, list):
+            run_fused_annotators(
+                module, kwargs, end_queue, serveradmindb, logtofile, log_path
+            )
+            continue
+        logger = get_annotator_logger(module.name, logtofile, log_path)
+        # The runner waits for a (name, success, runtime) message for every
+        # task, so one is sent whether or not the annotator succeeded.
+        start_time = time()
+        success = False
         try:
-            logger = getLogger(module.name)
-            if logtofile and log_path:
-                log_handler = FileHandler(log_path, "a")
+            annotator = load_annotator(module, kwargs, serveradmindb)
+            annotator.run()
+            success = not getattr(annotator, "run_failed", False)
+        except Exception:
+            err = ModuleLoadingError(module_name=module.name)
+            if logger:
+                logger.exception(err)
+        end_queue.put((module.name, success, time() - start_time))
+
+
+def annot_from_service(
+    start_queue,
+    end_queue,
+    queue_populated,
+    serveradmindb,
+    logtofile,
+    log_path,
+    service_address,
+    service_authkey,
+):
+    from queue import Empty
+    from time import time
+    from logging import getLogger
+    from .annotator_service import connect_annotator_service
+    from ..util.run import announce_module
+    from ..util.run import update_status
+
+    try:
+        service = connect_annotator_service(service_address, service_authkey)
+    except Exception as e:
+        logger = getLogger("oakvar.runner")
+        logger.warning(f"annotator service could not be reached ({e}). Running here.")
+        annot_from_queue(
+            start_queue, end_queue, queue_populated, serveradmindb, logtofile, log_path
+        )
+        return
+    while True:
+        try:
+            task = start_queue.get(True, 1)
+        except Empty:
+            if queue_populated.value:
+                break
             else:
-                log_handler = StreamHandler()
-            formatter = Formatter(
-                "%(asctime)s %(name)-20s %(message)s", "%Y/%m/%d %H:%M:%S"
+                continue
+        module, kwargs = task
+        start_time = time()
+        success = False
+        runtime = 0.0
+        # Annotators in the service have no access to the job's admin db, so
+        # the start and end of each module are reported from here.
+        announce_module(module, serveradmindb=serveradmindb)
+        try:
+            kwargs.pop("serveradmindb", None)
+            success, runtime = service.run_annotator(
+                module.name,
+                str(module.script_path),
+                kwargs,
+                log_path if logtofile else None,
             )
-            log_handler.setFormatter(formatter)
-            logger.addHandler(log_handler)
         except Exception:
             import traceback
 
             traceback.print_exc()
+            runtime = time() - start_time
+        if success:
+            update_status(f"finished {module.name}", serveradmindb=serveradmindb)
+        end_queue.put((module.name, success, runtime))
+
+
+def run_fused_annotators(
+    modules, kwargs_l, end_queue, serveradmindb, logtofile, log_path
+):
+    from time import time
+    from .annotator import FusedAnnotators
+    from ..exceptions import ModuleLoadingError
+
+    loaded_modules = []
+    annotators = []
+    for module, kwargs in zip(modules, kwargs_l):
+        logger = get_annotator_logger(module.name, logtofile, log_path)
+        start_time = time()
         try:
-            kwargs["serveradmindb"] = serveradmindb
-            annotator_class = load_class(module.script_path, "Annotator")
-            if not annotator_class:
-                annotator_class = load_class(module.script_path, "CravatAnnotator")
-            if annotator_class:
-                annotator = annotator_class(**kwargs)
-                annotator.run()
-                end_queue.put(module.name)
-            else:
-                raise ModuleLoadingError(msg=f"Annotator of {module.name} could not be loaded.")
+            annotators.append(load_annotator(module, kwargs, serveradmindb))
+            loaded_modules.append(module)
         except Exception:
             err = ModuleLoadingError(module_name=module.name)
             if logger:
                 logger.exception(err)
+            end_queue.put((module.name, False, time() - start_time))
+    if not annotators:
+        return
+    fused = FusedAnnotators(annotators)
+    try:
+        successes = fused.run()
+    except Exception:
+        import traceback
+
+        traceback.print_exc()
+        successes = {}
+    for module, annotator in zip(loaded_modules, annotators):
+        end_queue.put(
+            (
+                module.name,
+                successes.get(annotator.module_name, False),
+                fused.runtimes[annotator.module_name],
+            )
+        )
 
 
 def mapper_runner(
@@ -64,6 +185,8 @@ def mapper_runner(
     pos_no,
     primary_transcript,
     serveradmindb,
+    variant_store=False,
+    mapper_cache=False,
 ):
     from ..util.util import load_class
     from ..module.local import get_local_module_info
@@ -85,8 +208,72 @@ def mapper_runner(
                 primary_transcript=primary_transcript,
                 serveradmindb=serveradmindb,
                 output_dir=output_dir,
+                variant_store=variant_store,
+                mapper_cache=mapper_cache,
             )
             output = genemapper.run(pos_no)
         else:
             raise ModuleLoadingError(msg=f"Mapper of {module_name} could not be loaded.")
     return output
+
+
+def mapper_from_queue(
+    chunk_queue,
+    crv_path,
+    run_name,
+    output_dir,
+    module_name,
+    primary_transcript,
+    serveradmindb,
+    variant_store=False,
+    mapper_cache=False,
+):
+    from time import time
+    from ..util.util import load_class
+    from ..module.local import get_local_module_info
+    from ..exceptions import ModuleLoadingError
+
+    start_time = time()
+    module = get_local_module_info(module_name)
+    if module is None:
+        raise ModuleLoadingError(module_name=module_name)
+    if primary_transcript:
+        primary_transcript = primary_transcript.split(";")
+    genemapper_class = load_class(module.script_path, "Mapper")
+    if not genemapper_class:
+        raise ModuleLoadingError(msg=f"Mapper of {module_name} could not be loaded.")
+    genemapper = genemapper_class(
+        input_file=crv_path,
+        run_name=run_name,
+        primary_transcript=primary_transcript,
+        serveradmindb=serveradmindb,
+        output_dir=output_dir,
+        variant_store=variant_store,
+        mapper_cache=mapper_cache,
+    )
+    genemapper.setup()
+    setup_time = time() - start_time
+    busy_time = 0.0
+    num_chunks = 0
+    num_lines = 0
+    while True:
+        task = chunk_queue.get()
+        if task is None:
+            break
+        pos_no, seekpos, chunksize = task
+        chunk_start_time = time()
+        genemapper.run_chunk(seekpos, chunksize, pos_no)
+        busy_time += time() - chunk_start_time
+        num_chunks += 1
+        num_lines += chunksize
+    genemapper.close_variant_store()
+    genemapper.close_mapper_cache()
+    genemapper.end()
+    return {
+        "num_chunks": num_chunks,
+        "num_lines": num_lines,
+        "setup_time": setup_time,
+        "busy_time": busy_time,
+        "total_time": time() - start_time,
+        "cache": genemapper.get_mapper_cache_stats(),
+    }
@@ -41,6 +41,8 @@ class BasePostAggregator(object):
         self.dbconn = None
         self.cursor = None
         self.cursor_w = None
+        self.data_dbconn = None
+        self.data_cursor = None
         self.columns_v: Optional[str] = None
         self.columns_g: Optional[str] = None
         self.from_v: Optional[str] = None
@@ -421,8 +423,35 @@ class BasePostAggregator(object):
     # which is intended to be for the derived annotator.
     def base_setup(self):
         self._alter_tables()
+        self._open_data_db_connection()
         self.setup()
 
+    def _open_data_db_connection(self):
+        from pathlib import Path
+        from ..module.local import get_module_dir
+        from ..module.data_db import connect_module_data_db
+
+        module_dir = get_module_dir(self.module_name, module_type="postaggregator")
+        if not module_dir or not self.conf:
+            return
+        db_path = Path(module_dir) / "data" / (self.module_name + ".sqlite")
+        if db_path.exists():
+            self.data_dbconn = connect_module_data_db(
+                db_path,
+                readonly=self.conf.get("data_db_readonly", True),
+                immutable=self.conf.get("data_db_immutable", False),
+            )
+            self.data_cursor = self.data_dbconn.cursor()
+
+    def _close_data_db_connection(self):
+        from ..module.data_db import log_module_data_db_stats
+
+        if self.data_cursor is not None:
+            self.data_cursor.close()
+        if self.data_dbconn is not None:
+            log_module_data_db_stats(self.data_dbconn, self.logger, self.module_name)
+            self.data_dbconn.close()
+
     def _open_db_connection(self):
         from sqlite3 import connect
         import os
@@ -516,6 +545,7 @@ class BasePostAggregator(object):
 
     def base_cleanup(self):
         self.cleanup()
+        self._close_data_db_connection()
         if self.dbconn is not None:
             self._close_db_connection()
 
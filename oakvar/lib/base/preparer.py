@@ -97,7 +97,9 @@ class BasePreparer(object):
         ):
             raise SetupError()
         self.reader = FileReader(self.input_path)
-        self.writer = FileWriter(self.output_path)
+        self.writer = FileWriter(
+            self.output_path, fmt="arrow" if self.reader.arrowfmt else "csv"
+        )
 
     def open_output_files(self):
         from ..exceptions import SetupError
@@ -161,6 +163,7 @@ class BasePreparer(object):
         self.logger.info("runtime: %6.3f" % runtime)
         status = f"finished {self.module_name}"
         update_status(status, logger=self.logger, serveradmindb=self.serveradmindb)
+        self.writer.close()  # type: ignore
         self.replace_crv()
         self.end()
         return output
@@ -273,6 +273,10 @@ class BaseReporter:
                 and sub.module == "base"
                 and sub.col == "all_mappings"
             ):
+                # Most rows have no consequence to substitute, which spares
+                # parsing and re-serializing their mappings.
+                if sub.subs_re is None or not sub.subs_re.search(value):
+                    continue
                 mappings = loads(value)
                 for gene in mappings:
                     for i in range(len(mappings[gene])):
@@ -924,6 +928,8 @@ class BaseReporter:
 
     async def make_report_sub(self, level, conn):
         from json import loads
+        from re import compile
+        from re import escape
         from types import SimpleNamespace
 
         if level not in ["variant", "gene"]:
@@ -941,12 +947,17 @@ class BaseReporter:
             if module_name == self.mapper_name:
                 module_name = "base"
             if module_name in reportsub and field_name in reportsub[module_name]:
+                subs = reportsub[module_name][field_name]
+                subs_re = None
+                if module_name == "base" and field_name == "all_mappings" and subs:
+                    subs_re = compile("|".join([escape(k) for k in subs.keys()]))
                 self.column_subs[level].append(
                     SimpleNamespace(
                         module=module_name,
                         col=field_name,
                         index=i,
-                        subs=reportsub[module_name][field_name],
+                        subs=subs,
+                        subs_re=subs_re,
                     )
                 )
                 self.columns[level][i]["reportsub"] = reportsub[module_name][field_name]
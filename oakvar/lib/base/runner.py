@@ -70,6 +70,12 @@ class Runner(object):
         self.total_num_converted_variants = None
         self.total_num_valid_variants = None
         self.converter_format: Optional[List[str]] = None
+        self.conversion_errors: Optional[List[Dict[str, Any]]] = None
+        self.variant_store = False
+        self.mapper_cache = False
+        self.fuse_annotators = False
+        self.df_annotators = False
+        self.variant_store_report: Optional[List[Dict[str, Any]]] = None
         self.genemapper = None
         self.append_mode = []
         self.exception = None
@@ -273,6 +279,7 @@ class Runner(object):
         await self.do_step_preparer(run_no)
         await self.do_step_mapper(run_no)
         await self.do_step_annotator(run_no)
+        self.log_variant_store_report(run_no)
         await self.do_step_aggregator(run_no)
         await self.do_step_postaggregator(run_no)
         await self.do_step_reporter(run_no)
@@ -392,6 +399,11 @@ class Runner(object):
         if args.get("annotators_replace"):
             args["annotators"] = args.get("annotators_replace")
         self.ignore_sample = args.get("ignore_sample", False)
+        self.intermediate_format = args.get("intermediate_format") or "csv"
+        self.variant_store = args.get("variant_store", False)
+        self.mapper_cache = args.get("mapper_cache", False)
+        self.fuse_annotators = args.get("fuse_annotators", False)
+        self.df_annotators = args.get("df_annotators", False)
         self.args = SimpleNamespace(**args)
         self.outer = self.args.outer
         if self.args.vcf2vcf and self.args.combine_input:
@@ -1126,6 +1138,9 @@ class Runner(object):
 
     def collect_crxs(self, run_no: int):
         from ..util.util import escape_glob_pattern
+        from ..util.inout import is_arrow_file
+        from ..util.inout import merge_arrow_files
+        from ..util.inout import concat_csv_files
         from os import remove
         from pathlib import Path
 
@@ -1133,74 +1148,44 @@ class Runner(object):
         if not output_dir:
             return
         crx_path = Path(output_dir) / f"{run_name}.crx"
-        wf = open(str(crx_path), "w")
         fns = sorted(
             [
                 str(v)
                 for v in Path(output_dir).glob(escape_glob_pattern(run_name) + ".crx.*")
             ]
         )
-        fn = fns[0]
-        f = open(fn)
-        for line in f:
-            wf.write(line)
-        f.close()
-        remove(fn)
-        for fn in fns[1:]:
-            f = open(fn)
-            for line in f:
-                if line[0] != "#":
-                    wf.write(line)
-            f.close()
+        if is_arrow_file(fns[0]):
+            merge_arrow_files(fns, crx_path)
+        else:
+            concat_csv_files(fns, crx_path)
+        for fn in fns:
             remove(fn)
-        wf.close()
 
     def collect_crgs(self, run_no: int):
         from os import remove
         from pathlib import Path
         from ..util.util import escape_glob_pattern
+        from ..util.inout import is_arrow_file
+        from ..util.inout import merge_arrow_files
+        from ..util.inout import merge_sorted_csv_files
         from ..consts import GENE_LEVEL_MAPPED_FILE_SUFFIX
 
         run_name, output_dir = self.get_run_name_output_dir_by_run_no(run_no)
         if not output_dir:
             return
         crg_path = Path(output_dir) / f"{run_name}{GENE_LEVEL_MAPPED_FILE_SUFFIX}"
-        wf = open(str(crg_path), "w")
-        unique_hugos = {}
         fns = sorted(
             [
                 str(v)
                 for v in crg_path.parent.glob(escape_glob_pattern(crg_path.name) + ".*")
             ]
         )
-        fn = fns[0]
-        f = open(fn)
-        for line in f:
-            if line[0] != "#":
-                hugo = line.split()[0]
-                if hugo not in unique_hugos:
-                    unique_hugos[hugo] = line
-            else:
-                wf.write(line)
-        f.close()
-        remove(fn)
-        for fn in fns[1:]:
-            f = open(fn)
-            for line in f:
-                if line[0] != "#":
-                    hugo = line.split()[0]
-                    if hugo not in unique_hugos:
-                        # wf.write(line)
-                        unique_hugos[hugo] = line
-            f.close()
+        if is_arrow_file(fns[0]):
+            merge_arrow_files(fns, crg_path, unique_col="hugo")
+        else:
+            merge_sorted_csv_files(fns, crg_path)
+        for fn in fns:
             remove(fn)
-        hugos = list(unique_hugos.keys())
-        hugos.sort()
-        for hugo in hugos:
-            wf.write(unique_hugos[hugo])
-        wf.close()
-        del unique_hugos
-        del hugos
 
     def table_exists(self, cursor, table):
         sql = (
@@ -1219,6 +1204,7 @@ class Runner(object):
         self, run_no: int
     ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         from pathlib import Path
+        from ..util.inout import FileReader
         from ..consts import VARIANT_LEVEL_MAPPED_FILE_SUFFIX
 
         run_name, output_dir = self.get_run_name_output_dir_by_run_no(run_no)
@@ -1227,17 +1213,13 @@ class Runner(object):
         modulename = None
         fn = Path(output_dir) / (run_name + VARIANT_LEVEL_MAPPED_FILE_SUFFIX)
         if fn.exists():
-            f = open(fn)
-            for line in f:
+            for line in FileReader(str(fn)).get_meta_lines():
                 if line.startswith("#title="):
                     title = line.strip().split("=")[1]
                 elif line.startswith("#version="):
                     version = line.strip().split("=")[1]
                 elif line.startswith("#modulename="):
                     modulename = line.strip().split("=")[1]
-                elif line.startswith("#") is False:
-                    break
-            f.close()
         return title, version, modulename
 
     def get_run_name_output_dir_by_run_no(self, run_no: int) -> Tuple[str, str]:
@@ -1338,6 +1320,10 @@ class Runner(object):
         await self.write_info_row(
             "converter_format", json.dumps(self.converter_format), cursor
         )
+        if self.conversion_errors is not None:
+            await self.write_info_row("conversion_errors", self.conversion_errors, cursor)
+        if self.variant_store_report is not None:
+            await self.write_info_row("variant_store", self.variant_store_report, cursor)
 
     async def write_info_table_annotator_info(self, cursor):
         import json
@@ -1549,6 +1535,7 @@ class Runner(object):
             title="Converter", name="converter", script_path=converter_path
         )
         announce_module(module, logger=self.logger, serveradmindb=self.serveradmindb)
+        self.clear_variant_store_stats(run_no, "converter")
         converter_class = load_class(module.script_path, "MasterConverter")
         if not converter_class:
             converter_class = load_class(module.script_path, "MasterCravatConverter")
@@ -1561,15 +1548,53 @@ class Runner(object):
             serveradmindb=self.serveradmindb,
             ignore_sample=self.ignore_sample,
             mp=self.args.mp,
+            intermediate_format=self.intermediate_format,
+            variant_store=self.variant_store,
             outer=self.outer,
         )
         ret = converter.run()
         self.total_num_converted_variants = ret.get("total_lnum")
         self.total_num_valid_variants = ret.get("write_lnum")
         self.converter_format = ret.get("input_formats") or []
+        self.conversion_errors = ret.get("conversion_errors")
         genome_assembly: List[str] = ret.get("assemblies") or []
         self.genome_assemblies[run_no] = genome_assembly
 
+    def get_variant_store(self, run_no: int):
+        from ..util.variant_store import VariantStore
+        from ..util.variant_store import get_run_key
+
+        if not self.variant_store or not self.run_name or not self.output_dir:
+            return None
+        return VariantStore(
+            run_key=get_run_key(self.output_dir[run_no], self.run_name[run_no])
+        )
+
+    def clear_variant_store_stats(self, run_no: int, stage: str):
+        store = self.get_variant_store(run_no)
+        if not store:
+            return
+        store.clear_run_stats(stage=stage)
+        store.close()
+
+    def log_variant_store_report(self, run_no: int):
+        store = self.get_variant_store(run_no)
+        if not store:
+            return
+        self.variant_store_report = store.get_run_stats()
+        store.close()
+        if not self.logger:
+            return
+        self.logger.info("variant store report (stage, module, reused/total):")
+        for row in self.variant_store_report:
+            if row["total"]:
+                pct = row["reused"] / row["total"] * 100
+            else:
+                pct = 0.0
+            self.logger.info(
+                f"{row['stage']}\t{row['module']}\t{row['reused']}/{row['total']} ({pct:.1f}%)"
+            )
+
     async def run_preparers(self, run_no: int):
         from ..util.util import load_class
         from ..consts import MODULE_OPTIONS_KEY
@@ -1594,76 +1619,114 @@ class Runner(object):
 
     async def run_mapper(self, run_no: int):
         import multiprocessing as mp
-        from ..base.mp_runners import init_worker, mapper_runner
+        from ..base.mp_runners import init_worker, mapper_from_queue
         from ..util.inout import FileReader
+        from ..consts import MAPPER_CHUNKS_PER_WORKER
+        from ..consts import MAPPER_MIN_CHUNKSIZE
+        from ..exceptions import SetupError
 
         if not self.args or not self.run_name or not self.output_dir:
-            raise
+            raise SetupError(msg="Runner arguments are not set up for the mapper.")
+        if not self.manager:
+            raise SetupError(msg="No multiprocessing manager to run the mapper with.")
         run_name = self.run_name[run_no]
         output_dir = self.output_dir[run_no]
         num_workers = self.get_num_workers()
         reader = FileReader(self.crvinput)
+        # Many small chunks on a shared queue keep all workers busy even when
+        # some regions of the genome take much longer to map than others.
         num_lines, chunksize, poss, len_poss, max_num_lines = reader.get_chunksize(
-            num_workers
+            num_workers * MAPPER_CHUNKS_PER_WORKER, min_chunksize=MAPPER_MIN_CHUNKSIZE
         )
+        num_workers = min(num_workers, len_poss)
         if self.logger:
             self.logger.info(
                 f"input line chunksize={chunksize} total number of "
                 + f"input lines={num_lines} number of chunks={len_poss}"
             )
+        self.clear_variant_store_stats(run_no, "mapper")
+        if self.mapper_cache and self.variant_store and self.logger:
+            self.logger.warning(
+                "--mapper-cache is not used because --variant-store already "
+                + "reuses mapper results."
+            )
+        chunk_queue = self.manager.Queue()
+        for pos_no in range(len_poss):
+            seekpos = poss[pos_no][0]
+            if pos_no == len_poss - 1:
+                chunk_num_lines = max_num_lines - chunksize * (len_poss - 1)
+            else:
+                chunk_num_lines = chunksize
+            chunk_queue.put((pos_no, seekpos, chunk_num_lines))
+        for _ in range(num_workers):
+            chunk_queue.put(None)
         pool = mp.Pool(num_workers, init_worker)
-        pos_no = 0
-        while pos_no < len_poss:
-            jobs = []
-            for _ in range(num_workers):
-                if pos_no == len_poss:
-                    break
-                (seekpos, num_lines) = poss[pos_no]
-                if pos_no == len_poss - 1:
-                    job = pool.apply_async(
-                        mapper_runner,
-                        (
-                            self.crvinput,
-                            seekpos,
-                            max_num_lines - num_lines,
-                            run_name,
-                            output_dir,
-                            self.mapper_name,
-                            pos_no,
-                            ";".join(self.args.primary_transcript),
-                            self.serveradmindb,
-                        ),
-                    )
-                else:
-                    job = pool.apply_async(
-                        mapper_runner,
-                        (
-                            self.crvinput,
-                            seekpos,
-                            chunksize,
-                            run_name,
-                            output_dir,
-                            self.mapper_name,
-                            pos_no,
-                            ";".join(self.args.primary_transcript),
-                            self.serveradmindb,
-                        ),
-                    )
-                jobs.append(job)
-                pos_no += 1
-            for job in jobs:
-                job.get()
+        jobs = [
+            pool.apply_async(
+                mapper_from_queue,
+                (
+                    chunk_queue,
+                    self.crvinput,
+                    run_name,
+                    output_dir,
+                    self.mapper_name,
+                    ";".join(self.args.primary_transcript),
+                    self.serveradmindb,
+                    self.variant_store,
+                    self.use_mapper_cache(),
+                ),
+            )
+            for _ in range(num_workers)
+        ]
+        utilizations = [job.get() for job in jobs]
         pool.close()
+        pool.join()
+        self.log_mapper_utilization(utilizations)
         self.collect_crxs(run_no)
         self.collect_crgs(run_no)
 
+    def use_mapper_cache(self) -> bool:
+        """Returns True if the mapper should use the mapper cache. The variant
+        store also keeps mapper results, so only one of them is used for the
+        mapper, to avoid looking up and storing each variant twice.
+        """
+        return bool(self.mapper_cache) and not self.variant_store
+
+    def log_mapper_utilization(self, utilizations: List[Dict[str, Any]]):
+        if not self.logger:
+            return
+        for worker_no, u in enumerate(utilizations):
+            if u["total_time"]:
+                pct = u["busy_time"] / u["total_time"] * 100
+            else:
+                pct = 0.0
+            self.logger.info(
+                f"mapper worker {worker_no}: {u['num_chunks']} chunks, "
+                + f"{u['num_lines']} lines, setup {u['setup_time']:.3f}s, "
+                + f"busy {u['busy_time']:.3f}s of {u['total_time']:.3f}s ({pct:.1f}%)"
+            )
+        if self.use_mapper_cache():
+            num_hits = sum([u["cache"].get("hits", 0) for u in utilizations])
+            num_misses = sum([u["cache"].get("misses", 0) for u in utilizations])
+            num_lookups = num_hits + num_misses
+            hit_rate = num_hits / num_lookups * 100 if num_lookups else 0.0
+            self.logger.info(
+                f"mapper cache: {num_hits} hits, {num_misses} misses "
+                + f"(hit rate {hit_rate:.1f}%)"
+            )
+
     async def run_annotators(self, run_no: int):
         import os
         from ..base.mp_runners import init_worker, annot_from_queue
+        from ..base.mp_runners import annot_from_service
         from multiprocessing import Pool
         from ..system import get_max_num_concurrent_modules_per_job
+        from pathlib import Path
         from ..consts import INPUT_LEVEL_KEY
         from ..consts import VARIANT_LEVEL_KEY
+        from ..consts import parallel_safe_key
+        from ..util.module_runtime import ModuleRuntimeStore
+        from .annotator import get_chunk_output_path
 
         if (
             not self.args
@@ -1730,12 +1793,28 @@ class Runner(object):
             }
             kwargs["run_name"] = run_name
             kwargs["output_dir"] = output_dir
+            if self.variant_store:
+                kwargs["variant_store"] = True
+            if self.df_annotators:
+                kwargs["df_mode"] = True
             run_args[module.name] = (module, kwargs)
+        self.clear_variant_store_stats(run_no, "annotator")
+        runtime_store = ModuleRuntimeStore()
+        num_input_lines = self.get_annotator_num_input_lines(run_args)
+        priorities = self.get_annotator_priorities(
+            num_input_lines, runtime_store.get_rates()
+        )
         start_queue = self.manager.Queue()
         end_queue = self.manager.Queue()
         all_mnames = set(self.annotators_to_run)
         assigned_mnames = set()
         done_mnames = set(self.done_annotators)
+        failed_mnames = set()
+        num_chunks_left: Dict[str, int] = {}
+        chunk_paths: Dict[str, List[Path]] = {}
+        runtimes: Dict[str, float] = {}
+        fused_group_nos: Dict[str, int] = {}
+        fused_groups_left: Dict[int, set] = {}
         queue_populated = self.manager.Value("c_bool", False)
         pool_args = [
             [
@@ -1747,37 +1826,363 @@ class Runner(object):
                 self.log_path
             ]
         ] * num_workers
+        worker_func = annot_from_queue
+        split_modules = True
+        service_env = self.get_annotator_service_env(num_input_lines)
+        if service_env:
+            # Small jobs are run by the warm annotators of the service as
+            # whole modules.
+            worker_func = annot_from_service
+            split_modules = False
+            pool_args = [args + list(service_env) for args in pool_args]
+
+        def skip_modules(mnames: List[str], reason: str):
+            for mname in mnames:
+                if self.logger:
+                    self.logger.error(f"{mname} skipped: {reason}")
+                failed_mnames.add(mname)
+                assigned_mnames.add(mname)
+
+        def assign_ready_modules():
+            while True:
+                unassigned_mnames = [
+                    mname
+                    for mname in self.annotators_to_run
+                    if mname not in assigned_mnames
+                ]
+                skipped_mnames = [
+                    mname
+                    for mname in unassigned_mnames
+                    if set(self.annotators_to_run[mname].secondary_module_names)
+                    & failed_mnames
+                ]
+                if not skipped_mnames:
+                    break
+                skip_modules(skipped_mnames, "a secondary input module failed.")
+            ready_mnames = [
+                mname
+                for mname in unassigned_mnames
+                if set(self.annotators_to_run[mname].secondary_module_names)
+                <= done_mnames
+            ]
+            if not ready_mnames and not num_chunks_left and unassigned_mnames:
+                skip_modules(unassigned_mnames, "secondary input modules are missing.")
+                return
+            # Modules with the longest estimated remaining work go first.
+            ready_mnames.sort(key=lambda mname: priorities[mname], reverse=True)
+            num_running = len(fused_groups_left) + sum(
+                [v for m, v in num_chunks_left.items() if m not in fused_group_nos]
+            )
+            fused_groups = []
+            if self.fuse_annotators and split_modules:
+                fused_groups = self.get_fused_annotator_groups(
+                    ready_mnames, run_args, priorities, num_workers - num_running
+                )
+            for group in fused_groups:
+                group_no = len(fused_group_nos)
+                start_queue.put(
+                    ([run_args[m][0] for m in group], [run_args[m][1] for m in group])
+                )
+                for mname in group:
+                    num_chunks_left[mname] = 1
+                    runtimes[mname] = 0.0
+                    fused_group_nos[mname] = group_no
+                    assigned_mnames.add(mname)
+                fused_groups_left[group_no] = set(group)
+            ready_mnames = [m for m in ready_mnames if m not in assigned_mnames]
+            num_free_workers = (
+                num_workers - num_running - len(fused_groups) - len(ready_mnames)
+            )
+            parallel_mnames = [
+                mname
+                for mname in ready_mnames
+                if self.annotators_to_run[mname].conf.get(parallel_safe_key)
+            ]
+            for mname in ready_mnames:
+                num_chunks = 1
+                if mname in parallel_mnames and num_free_workers > 0 and split_modules:
+                    num_chunks += num_free_workers // len(parallel_mnames)
+                tasks = self.get_annotator_chunk_tasks(run_args[mname], num_chunks)
+                for task in tasks:
+                    start_queue.put(task)
+                num_chunks_left[mname] = len(tasks)
+                runtimes[mname] = 0.0
+                if len(tasks) > 1:
+                    chunk_paths[mname] = [
+                        get_chunk_output_path(
+                            self.get_module_output_path(task[0], run_no), chunk_no
+                        )
+                        for chunk_no in range(len(tasks))
+                    ]
+                assigned_mnames.add(mname)
+
+        def finish_chunk(mname: str, success: bool, runtime: float):
+            group_no = fused_group_nos.get(mname)
+            if group_no is not None and group_no in fused_groups_left:
+                fused_groups_left[group_no].discard(mname)
+                if not fused_groups_left[group_no]:
+                    del fused_groups_left[group_no]
+            num_chunks_left[mname] -= 1
+            runtimes[mname] += runtime
+            if not success:
+                failed_mnames.add(mname)
+            if num_chunks_left[mname] > 0:
+                return
+            del num_chunks_left[mname]
+            paths = chunk_paths.pop(mname, None)
+            if mname in failed_mnames:
+                if self.logger:
+                    self.logger.error(f"{mname} failed.")
+                self.remove_annotator_chunks(paths)
+                return
+            if paths and not self.merge_annotator_chunks(
+                self.annotators_to_run[mname], paths, run_no
+            ):
+                failed_mnames.add(mname)
+                if self.logger:
+                    self.logger.error(f"{mname} failed.")
+                return
+            runtime_store.add_runtime(mname, num_input_lines[mname], runtimes[mname])
+            done_mnames.add(mname)
+
         with Pool(num_workers, init_worker) as pool:
             _ = pool.starmap_async(
-                annot_from_queue,
+                worker_func,
                 pool_args,
                 error_callback=lambda _, mp_pool=pool: mp_pool.terminate(),
             )
             pool.close()
-            for mname, module in self.annotators_to_run.items():
-                if (
-                    mname not in assigned_mnames
-                    and set(module.secondary_module_names) <= done_mnames
-                ):
-                    start_queue.put(run_args[mname])
-                    assigned_mnames.add(mname)
-            while (
-                assigned_mnames != all_mnames
-            ):  # TODO not handling case where parent module errors out
-                finished_module = end_queue.get()
-                done_mnames.add(finished_module)
-                for mname, module in self.annotators_to_run.items():
-                    if (
-                        mname not in assigned_mnames
-                        and set(module.secondary_module_names) <= done_mnames
-                    ):
-                        start_queue.put(run_args[mname])
-                        assigned_mnames.add(mname)
-            queue_populated = True
+            assign_ready_modules()
+            while assigned_mnames != all_mnames or num_chunks_left:
+                finish_chunk(*end_queue.get())
+                assign_ready_modules()
+            queue_populated.value = True
             pool.join()
+        runtime_store.close()
         if len(self.annotators_to_run) > 0:
             self.annotator_ran = True
 
+    def get_annotator_service_env(self, num_input_lines: Dict[str, int]):
+        """Returns the address and authkey of the annotator service this job
+        was started with, if the job is small enough to be run by it.
+
+        Args:
+            num_input_lines (Dict[str, int]): number of input lines by module name
+        """
+        from ..system import get_sys_conf_int_value
+        from ..system.consts import annotator_service_max_num_lines_key
+        from ..system.consts import DEFAULT_ANNOTATOR_SERVICE_MAX_NUM_LINES
+        from .annotator_service import get_annotator_service_env
+
+        service_env = get_annotator_service_env()
+        if not service_env or not num_input_lines:
+            return None
+        max_num_lines = get_sys_conf_int_value(annotator_service_max_num_lines_key)
+        if max_num_lines is None:
+            max_num_lines = DEFAULT_ANNOTATOR_SERVICE_MAX_NUM_LINES
+        if max(num_input_lines.values()) > max_num_lines:
+            return None
+        if self.logger:
+            self.logger.info("running annotators with the annotator service")
+        return service_env
+
+    def get_annotator_num_input_lines(self, run_args: Dict[str, Tuple]) -> Dict[str, int]:
+        """Returns the number of input lines of each annotator to run.
+        Variant-level inputs have as many lines as the converter wrote
+        variants. Other inputs, such as the gene-level file, are small and
+        are counted.
+
+        Args:
+            run_args (Dict[str, Tuple]): (module, kwargs) by module name
+        """
+        from ..util.module_runtime import count_data_lines
+
+        num_lines_by_path: Dict[str, int] = {}
+        if self.total_num_valid_variants is not None:
+            for path in [self.crvinput, self.crxinput]:
+                if path:
+                    num_lines_by_path[path] = self.total_num_valid_variants
+        num_input_lines: Dict[str, int] = {}
+        for mname, (_, kwargs) in run_args.items():
+            input_file = kwargs.get("input_file")
+            if not input_file:
+                num_input_lines[mname] = 0
+                continue
+            if input_file not in num_lines_by_path:
+                num_lines_by_path[input_file] = count_data_lines(input_file)
+            num_input_lines[mname] = num_lines_by_path[input_file]
+        return num_input_lines
+
+    def get_annotator_priorities(
+        self, num_input_lines: Dict[str, int], rates: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Returns the estimated runtime of each annotator to run plus that of
+        the longest chain of annotators waiting on it.
+
+        Args:
+            num_input_lines (Dict[str, int]): number of input lines by module name
+            rates (Dict[str, float]): past seconds per input line by module name
+        """
+        if rates:
+            default_rate = sum(rates.values()) / len(rates)
+        else:
+            default_rate = 1.0
+        costs = {
+            mname: rates.get(mname, default_rate) * num_input_lines[mname]
+            for mname in self.annotators_to_run
+        }
+        dependents: Dict[str, List[str]] = {mname: [] for mname in costs}
+        for mname, module in self.annotators_to_run.items():
+            for secondary_mname in module.secondary_module_names:
+                if secondary_mname in dependents:
+                    dependents[secondary_mname].append(mname)
+        priorities: Dict[str, float] = {}
+
+        def get_priority(mname: str, visiting: set) -> float:
+            if mname in priorities:
+                return priorities[mname]
+            visiting.add(mname)
+            priority = costs[mname] + max(
+                [
+                    get_priority(dependent, visiting)
+                    for dependent in dependents[mname]
+                    if dependent not in visiting
+                ]
+                + [0.0]
+            )
+            visiting.discard(mname)
+            priorities[mname] = priority
+            return priority
+
+        for mname in costs:
+            get_priority(mname, set())
+        if self.logger and rates:
+            for mname in sorted(priorities, key=lambda m: priorities[m], reverse=True):
+                self.logger.info(f"{mname}: estimated runtime {costs[mname]:.1f}s")
+        return priorities
+
+    def get_fused_annotator_groups(
+        self,
+        mnames: List[str],
+        run_args: Dict[str, Tuple],
+        priorities: Dict[str, float],
+        num_groups: int,
+    ) -> List[List[str]]:
+        """Groups annotators which read the same input and have no secondary
+        inputs, so that each group reads its input once. Annotators are spread
+        over at most num_groups groups with balanced estimated runtimes. Only
+        groups of more than one annotator are returned.
+
+        Args:
+            mnames (List[str]): names of annotators ready to run
+            run_args (Dict[str, Tuple]): (module, kwargs) by module name
+            priorities (Dict[str, float]): estimated runtimes by module name
+            num_groups (int): number of workers available for the groups
+        """
+        from heapq import heapify, heappop, heappush
+        from ..consts import parallel_safe_key
+
+        mnames_by_input: Dict[str, List[str]] = {}
+        for mname in mnames:
+            module, kwargs = run_args[mname]
+            if module.secondary_module_names or module.conf.get(parallel_safe_key):
+                continue
+            input_file = kwargs.get("input_file")
+            if not input_file:
+                continue
+            mnames_by_input.setdefault(input_file, []).append(mname)
+        if not mnames_by_input:
+            return []
+        num_groups_per_input = max(1, num_groups // len(mnames_by_input))
+        groups = []
+        for input_mnames in mnames_by_input.values():
+            bins = [(0.0, i, []) for i in range(min(num_groups_per_input, len(input_mnames)))]
+            heapify(bins)
+            for mname in sorted(input_mnames, key=lambda m: priorities[m], reverse=True):
+                load, i, group = heappop(bins)
+                group.append(mname)
+                heappush(bins, (load + priorities[mname], i, group))
+            groups.extend([group for _, _, group in sorted(bins, key=lambda v: v[1])])
+        groups = [group for group in groups if len(group) > 1]
+        if self.logger:
+            for group in groups:
+                self.logger.info(f"fused annotators: {', '.join(group)}")
+        return groups
+
+    def get_annotator_chunk_tasks(self, run_arg, num_chunks: int) -> List[Tuple]:
+        """Splits an annotator run into runs over chunks of its input.
+
+        Args:
+            run_arg: (module, kwargs) of the whole run
+            num_chunks (int): number of chunks wanted
+        """
+        from ..util.inout import FileReader
+        from ..util.inout import is_arrow_file
+        from ..consts import ANNOTATOR_MIN_CHUNKSIZE
+
+        module, kwargs = run_arg
+        input_file = kwargs.get("input_file")
+        if num_chunks <= 1 or not input_file or is_arrow_file(input_file):
+            return [run_arg]
+        reader = FileReader(input_file)
+        _, chunksize, poss, len_poss, max_num_lines = reader.get_chunksize(
+            num_chunks, min_chunksize=ANNOTATOR_MIN_CHUNKSIZE
+        )
+        if len_poss <= 1:
+            return [run_arg]
+        if self.logger:
+            self.logger.info(
+                f"{module.name}: split into {len_poss} chunks of {chunksize} lines"
+            )
+        tasks = []
+        for pos_no in range(len_poss):
+            if pos_no == len_poss - 1:
+                chunk_num_lines = max_num_lines - chunksize * (len_poss - 1)
+            else:
+                chunk_num_lines = chunksize
+            chunk_kwargs = kwargs.copy()
+            chunk_kwargs["seekpos"] = poss[pos_no][0]
+            chunk_kwargs["chunksize"] = chunk_num_lines
+            chunk_kwargs["chunk_no"] = pos_no
+            tasks.append((module, chunk_kwargs))
+        return tasks
+
+    def merge_annotator_chunks(self, module, paths: List, run_no: int) -> bool:
+        """Concatenates the outputs of the chunks of a split annotator run.
+        Returns False if the outputs could not be merged.
+
+        Args:
+            module:
+            paths (List): chunk output paths in input order
+            run_no (int): run_no
+        """
+        import os
+        from ..util.inout import concat_csv_files
+
+        output_path = self.get_module_output_path(module, run_no)
+        if not output_path:
+            return False
+        missing_paths = [str(path) for path in paths if not os.path.exists(path)]
+        if missing_paths:
+            if self.logger:
+                self.logger.error(
+                    f"{module.name}: missing chunk outputs {', '.join(missing_paths)}"
+                )
+            self.remove_annotator_chunks(paths)
+            return False
+        concat_csv_files(paths, output_path)
+        self.remove_annotator_chunks(paths)
+        return True
+
+    def remove_annotator_chunks(self, paths: Optional[List]):
+        import os
+
+        if not paths:
+            return
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
     async def run_aggregator(self, run_no: int):
         db_path = await self.run_aggregator_level("variant", run_no)
         await self.run_aggregator_level("gene", run_no)
@@ -59,6 +59,7 @@ class VCF2VCF:
     def setup_liftover(self):
         from oakvar.lib.util.seq import get_lifter
         from oakvar.lib.util.seq import get_wgs_reader
+        from oakvar.lib.util.seq import RefBaseCache
 
         if self.genome:
             self.lifter = get_lifter(source_assembly=self.genome)
@@ -67,6 +68,8 @@ class VCF2VCF:
             self.lifter = None
             self.do_liftover = False
         self.wgsreader = get_wgs_reader(assembly="hg38")
+        if self.wgsreader is not None:
+            self.wgsreader = RefBaseCache(self.wgsreader)
 
     def load_col_infos(self, module_names: list, mapper: str):
         col_infos = {}
@@ -248,7 +251,12 @@ class VCF2VCF:
                         pos, ref, alt = self.trim_variant(pos, ref, alt)
                         if self.do_liftover:
                             _, pos, ref, alt = liftover(
-                                chrom, pos, ref, alt, lifter=self.lifter
+                                chrom,
+                                pos,
+                                ref,
+                                alt,
+                                lifter=self.lifter,
+                                wgs_reader=self.wgsreader,
                             )
                         uid += 1
                         variant = {"uid": uid}
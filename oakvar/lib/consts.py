@@ -19,9 +19,17 @@ crs_idx = [["uid"], ["sample_id"], ["sample_id", "uid"]]
 crv_idx = [["uid"]]
 crx_idx = [["uid"]]
 crg_idx = [["hugo"]]
+MAPPER_CHUNKS_PER_WORKER = 8
+MAPPER_MIN_CHUNKSIZE = 10000
+DEFAULT_ANNOTATOR_BATCH_SIZE = 1000
+DEFAULT_ANNOTATOR_DF_BATCH_SIZE = 100000
+ANNOTATOR_MIN_CHUNKSIZE = 10000
+parallel_safe_key = "parallel_safe"
 
 all_mappings_col_name = "all_mappings"
 mapping_parser_name = "mapping_parser"
+merge_join_name = "merge_join"
+DEFAULT_MERGE_JOIN_MAX_GAP = 1000
 
 VARIANT = 0
 GENE = 1
@@ -1,9 +1,45 @@
 from typing import Optional
+from typing import Any
+from typing import Dict
+
+DEFAULT_MEMORY_CACHE_SIZE = 10000
+DEFAULT_COMMIT_INTERVAL = 1000
+DEFAULT_COMMIT_SECONDS = 5
+
+
+def copy_value(value):
+    """Copies the dicts and lists of a cached value. Other values are
+    immutable and shared.
+
+    Args:
+        value: cached value
+    """
+    t = type(value)
+    if t is dict:
+        return {
+            k: copy_value(v) if type(v) in (dict, list) else v
+            for k, v in value.items()
+        }
+    if t is list:
+        return [copy_value(v) if type(v) in (dict, list) else v for v in value]
+    return value
 
 
 class ModuleDataCache:
+    """Cache of module results. An in-memory LRU sits in front of a sqlite
+    store in the module's cache folder. Writes to the store are buffered and
+    written and committed in batches, so that no write transaction is left
+    open between batches. Values are kept parsed in memory and are serialized
+    only when written to the store. Every hit returns a new copy.
+
+    The cache section of a module's yml file can set expiration (days),
+    max_entries (size of the sqlite store), and memory_size (size of the LRU).
+    """
+
     def __init__(self, module_name: str, module_type: str = ""):
+        from collections import OrderedDict
         from pathlib import Path
+        from time import time
         from .local import get_cache_conf
         from .local import get_module_dir
 
@@ -16,12 +52,32 @@ class ModuleDataCache:
         self.expiration = (
             self.expiration_in_day * 60 * 60 * 24 if self.expiration_in_day else None
         )
+        self.max_entries: Optional[int] = (
+            self.conf.get("max_entries") if self.conf else None
+        )
+        self.memory_size: int = (
+            self.conf.get("memory_size", DEFAULT_MEMORY_CACHE_SIZE)
+            if self.conf
+            else DEFAULT_MEMORY_CACHE_SIZE
+        )
+        self.memory: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.pending_rows: Dict[Any, tuple] = {}
+        self.pending_deletes = set()
+        self.last_commit_time = time()
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evicted": 0,
+        }
         self.dir = Path(self.module_dir) / "cache" if self.module_dir else None
         self.path = self.dir / "cache.sqlite" if self.dir else None
         if self.path:
             self.create_cache_dir_if_needed()
         self.conn = self.get_conn()
         self.create_cache_table_if_needed()
+        self.delete_expired()
 
     def create_cache_dir_if_needed(self):
         from pathlib import Path
@@ -37,14 +93,15 @@ class ModuleDataCache:
             return None
         if not self.conn:
             try:
-                self.conn = connect(str(self.path))
+                self.conn = connect(str(self.path), timeout=30)
+                self.conn.execute("pragma journal_mode=wal")
             except Exception:
                 print(
                     f"Could not open module cache for {self.module_name}. "
                     + "Restarting the cache db."
                 )
                 remove(self.path)
-                self.conn = connect(str(self.path))
+                self.conn = connect(str(self.path), timeout=30)
         return self.conn
 
     def create_cache_table_if_needed(self):
@@ -55,58 +112,155 @@ class ModuleDataCache:
             + "timestamp float)"
         )
         self.conn.execute(q)
+        q = "create index if not exists cache_timestamp on cache (timestamp)"
+        self.conn.execute(q)
         self.conn.commit()
 
     def commit(self):
+        """Writes buffered changes to the store and commits them."""
+        from json import dumps
+        from time import time
+
+        self.last_commit_time = time()
         if not self.conn:
+            self.pending_rows = {}
+            self.pending_deletes = set()
             return
+        if self.pending_deletes:
+            self.conn.executemany(
+                "delete from cache where k=?", [(k,) for k in self.pending_deletes]
+            )
+        if self.pending_rows:
+            self.conn.executemany(
+                "insert or replace into cache (k, v, timestamp) values (?, ?, ?)",
+                [(k, dumps(v), ts) for k, (v, ts) in self.pending_rows.items()],
+            )
         self.conn.commit()
+        self.pending_rows = {}
+        self.pending_deletes = set()
+
+    def commit_if_needed(self):
+        num_pending = len(self.pending_rows) + len(self.pending_deletes)
+        if not num_pending:
+            return
+        from time import time
+
+        if (
+            num_pending >= DEFAULT_COMMIT_INTERVAL
+            or time() - self.last_commit_time > DEFAULT_COMMIT_SECONDS
+        ):
+            self.commit()
+
+    def add_to_memory(self, key, value, ts: float):
+        self.memory[key] = (value, ts)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
 
     def add_cache(self, key, value, defer_commit=False):
         import time
-        from json import dumps
 
-        if not self.conn:
-            return
-        key = key
-        value = dumps(value)
-        q = "insert or replace into cache (k, v, timestamp) values (?, ?, ?)"
         ts = time.time()
-        self.conn.execute(q, (key, value, ts))
+        v = copy_value(value)
+        self.add_to_memory(key, v, ts)
+        self.pending_deletes.discard(key)
+        self.pending_rows[key] = (v, ts)
         if not defer_commit:
-            self.conn.commit()
+            self.commit_if_needed()
 
     def delete_cache(self, key, defer_commit=False):
-        if not self.conn:
-            return
-        q = "delete from cache where key=?"
-        self.conn.execute(q, (key,))
+        self.memory.pop(key, None)
+        self.pending_rows.pop(key, None)
+        self.pending_deletes.add(key)
         if not defer_commit:
-            self.conn.commit()
+            self.commit_if_needed()
 
-    def get_cache(self, key) -> Optional[str]:
-        import time
+    def is_expired(self, ts: float) -> bool:
+        if not self.expiration:
+            return False
+        from time import time
+
+        return time() - ts > self.expiration
+
+    def get_cache(self, key) -> Optional[Any]:
+        self.commit_if_needed()
+        entry = self.memory.get(key)
+        if entry is not None and not self.is_expired(entry[1]):
+            self.memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return copy_value(entry[0])
+        return self.get_cache_from_store(key)
+
+    def get_cache_from_store(self, key) -> Optional[Any]:
         from json import loads
         from traceback import print_exc
 
-        if not self.conn:
+        entry = self.memory.get(key) or self.pending_rows.get(key)
+        from_memory = entry is not None
+        if entry is None and self.conn and key not in self.pending_deletes:
+            q = "select v, timestamp from cache where k=?"
+            ret = self.conn.execute(q, (key,)).fetchone()
+            if ret:
+                try:
+                    v = loads(ret[0])
+                except Exception:
+                    print_exc()
+                    v = ret[0]
+                entry = (v, float(ret[1]))  # type: ignore
+        if entry is None:
+            self.stats["misses"] += 1
             return
-        q = "select v, timestamp from cache where k=?"
-        ret = self.conn.execute(q, (key,)).fetchone()
-        if ret:
-            v = ret[0]  # type: ignore
-            try:
-                v = loads(v)
-            except Exception:
-                print_exc()
-            timestamp = float(ret[1])  # type: ignore
-            if self.expiration:
-                if time.time() - timestamp > self.expiration:
-                    self.delete_cache(key)
-                    return
-                else:
-                    return v
-            else:
-                return v
+        v, timestamp = entry
+        if self.is_expired(timestamp):
+            self.stats["expired"] += 1
+            self.delete_cache(key)
+            self.stats["misses"] += 1
+            return
+        self.add_to_memory(key, v, timestamp)
+        self.stats["memory_hits" if from_memory else "disk_hits"] += 1
+        return copy_value(v)
+
+    def delete_expired(self):
+        import time
+
+        if not self.conn or not self.expiration:
+            return
+        q = "delete from cache where timestamp<?"
+        cur = self.conn.execute(q, (time.time() - self.expiration,))
+        self.stats["expired"] += cur.rowcount if cur.rowcount > 0 else 0
+        self.commit()
+
+    def evict_if_needed(self):
+        """Deletes the oldest entries if the store has more than max_entries.
+        """
+        if not self.conn or not self.max_entries:
+            return
+        num_entries = self.conn.execute("select count(*) from cache").fetchone()[0]
+        num_to_evict = num_entries - self.max_entries
+        if num_to_evict <= 0:
+            return
+        q = (
+            "delete from cache where k in (select k from cache order by timestamp "
+            + "limit ?)"
+        )
+        self.conn.execute(q, (num_to_evict,))
+        self.stats["evicted"] += num_to_evict
+        self.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.stats)
+        num_lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["lookups"] = num_lookups
+        if num_lookups:
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / num_lookups
         else:
+            stats["hit_rate"] = 0.0
+        return stats
+
+    def close(self):
+        if not self.conn:
             return
+        self.commit()
+        self.evict_if_needed()
+        self.conn.close()
+        self.conn = None
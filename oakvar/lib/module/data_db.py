@@ -0,0 +1,146 @@
+from typing import Any
+from typing import Dict
+from typing import List
+from sqlite3 import Connection
+from sqlite3 import Cursor
+
+DATA_DB_MMAP_SIZE = 256 * 1024 * 1024
+DATA_DB_CACHE_SIZE_KIB = 64 * 1024
+DATA_DB_CACHED_STATEMENTS = 256
+
+
+class TimedCursor(Cursor):
+    """Cursor which adds the time spent in each statement to its connection.
+    Only execute, executemany, and fetchall are timed, so that rows read one
+    at a time do not pay for a timer each."""
+
+    sql = ""
+
+    def execute(self, sql, parameters=()):
+        from time import perf_counter
+
+        self.sql = sql
+        t = perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.connection.add_query_time(sql, perf_counter() - t, 1)  # type: ignore
+
+    def executemany(self, sql, seq_of_parameters):
+        from time import perf_counter
+
+        self.sql = sql
+        t = perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.connection.add_query_time(sql, perf_counter() - t, 1)  # type: ignore
+
+    def fetchall(self):
+        from time import perf_counter
+
+        t = perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self.connection.add_query_time(self.sql, perf_counter() - t, 0)  # type: ignore
+
+
+class TimedConnection(Connection):
+    """Connection which keeps the number of executions and the time spent
+    for each SQL statement run through it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.query_stats: Dict[str, List[Any]] = {}
+
+    def cursor(self, factory=TimedCursor):  # type: ignore
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def add_query_time(self, sql: str, elapsed: float, num_executions: int):
+        stat = self.query_stats.get(sql)
+        if stat is None:
+            self.query_stats[sql] = [num_executions, elapsed]
+        else:
+            stat[0] += num_executions
+            stat[1] += elapsed
+
+    def get_query_stats(self) -> List[Dict[str, Any]]:
+        stats = [
+            {"sql": sql, "count": v[0], "time": v[1]}
+            for sql, v in self.query_stats.items()
+        ]
+        stats.sort(key=lambda v: v["time"], reverse=True)
+        return stats
+
+
+def connect_module_data_db(
+    db_path, readonly: bool = True, immutable: bool = False
+) -> TimedConnection:
+    """Opens a module's data database tuned for reading.
+
+    The database is opened read-only, with memory-mapped I/O, a larger page
+    cache, and more cached prepared statements. Modules which write to
+    their data database can have it opened read-write. An immutable
+    database also makes SQLite skip file locking and change detection,
+    which are slow on network file systems, but it must not change while
+    it is open.
+
+    Args:
+        db_path: path to the database
+        readonly (bool): False for modules which write to their data database
+        immutable (bool): open the database read-only and immutable
+    """
+    from sqlite3 import connect
+    from pathlib import Path
+
+    if readonly or immutable:
+        uri = Path(db_path).absolute().as_uri() + "?mode=ro"
+        if immutable:
+            uri += "&immutable=1"
+        conn = connect(
+            uri,
+            uri=True,
+            factory=TimedConnection,
+            cached_statements=DATA_DB_CACHED_STATEMENTS,
+        )
+    else:
+        conn = connect(
+            str(db_path),
+            factory=TimedConnection,
+            cached_statements=DATA_DB_CACHED_STATEMENTS,
+        )
+    conn.execute(f"pragma mmap_size={DATA_DB_MMAP_SIZE}")
+    conn.execute(f"pragma cache_size=-{DATA_DB_CACHE_SIZE_KIB}")
+    conn.execute("pragma temp_store=memory")
+    conn.query_stats.clear()
+    return conn  # type: ignore
+
+
+def log_module_data_db_stats(conn, logger, module_name: str):
+    """log_module_data_db_stats.
+
+    Args:
+        conn:
+        logger:
+        module_name (str): module_name
+    """
+    if logger is None or not hasattr(conn, "get_query_stats"):
+        return
+    stats = conn.get_query_stats()
+    if not stats:
+        return
+    num_queries = sum([v["count"] for v in stats])
+    total_time = sum([v["time"] for v in stats])
+    logger.info(
+        f"{module_name}: {num_queries} data db queries in {total_time:.3f}s"
+    )
+    for v in stats[:3]:
+        sql = " ".join(v["sql"].split())
+        logger.info(f"{module_name}: {v['count']} queries, {v['time']:.3f}s: {sql}")
@@ -0,0 +1,164 @@
+from typing import Optional
+from typing import List
+from typing import Dict
+from typing import Any
+
+MAPPER_CACHE_FNAME = "mapper_cache.sqlite"
+MAPPER_CACHE_FLUSH_INTERVAL = 1000
+MAPPER_CACHE_EVICTION_RATIO = 0.9
+
+
+class MapperCache:
+    """On-disk cache of gene mapper results shared by jobs and mapper workers.
+
+    Entries are keyed by the normalized variant, the mapper name and version,
+    and the primary transcript setting. Least recently used entries are
+    evicted when the cache grows beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        module_name: str,
+        module_dir,
+        version: str,
+        primary_transcript_paths: List[str] = [],
+        max_entries: Optional[int] = None,
+    ):
+        from json import dumps
+        from pathlib import Path
+        from ..system import get_sys_conf_int_value
+        from ..system.consts import mapper_cache_max_entries_key
+        from ..system.consts import DEFAULT_MAPPER_CACHE_MAX_ENTRIES
+
+        self.conn = None
+        self.module_name = module_name
+        self.namespace = dumps([module_name, version, list(primary_transcript_paths)])
+        if max_entries is None:
+            max_entries = get_sys_conf_int_value(mapper_cache_max_entries_key)
+        self.max_entries: int = max_entries or DEFAULT_MAPPER_CACHE_MAX_ENTRIES
+        self.dir = Path(module_dir) / "cache"
+        self.path = self.dir / MAPPER_CACHE_FNAME
+        self.pending_rows = []
+        self.hit_keys = []
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_evicted = 0
+        self.create_cache_dir_if_needed()
+        self.conn = self.get_conn()
+        self.create_cache_table_if_needed()
+
+    def create_cache_dir_if_needed(self):
+        if not self.dir.exists():
+            self.dir.mkdir(parents=True, exist_ok=True)
+
+    def get_conn(self):
+        from sqlite3 import connect
+
+        if not self.conn:
+            # Mapper workers of several jobs share the cache.
+            self.conn = connect(str(self.path), timeout=60)
+            self.conn.execute("pragma journal_mode=wal")
+            self.conn.execute("pragma synchronous=normal")
+        return self.conn
+
+    def create_cache_table_if_needed(self):
+        if not self.conn:
+            return
+        self.conn.execute(
+            "create table if not exists mapping (k text primary key, v text, "
+            + "atime float)"
+        )
+        self.conn.execute(
+            "create index if not exists mapping_atime on mapping (atime)"
+        )
+        self.conn.commit()
+
+    def get_key(self, crv_data: Dict[str, Any]) -> str:
+        from hashlib import sha1
+        from ..util.variant_store import normalize_variant
+
+        chrom, pos, ref, alt = normalize_variant(
+            crv_data["chrom"],
+            crv_data["pos"],
+            crv_data["ref_base"],
+            crv_data["alt_base"],
+        )
+        s = f"{self.namespace}\t{chrom}:{pos}:{ref}:{alt}"
+        return sha1(s.encode()).hexdigest()
+
+    def get(self, crv_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        from json import loads
+
+        if not self.conn:
+            return None
+        k = self.get_key(crv_data)
+        ret = self.conn.execute("select v from mapping where k=?", (k,)).fetchone()
+        if not ret:
+            self.num_misses += 1
+            return None
+        self.num_hits += 1
+        self.hit_keys.append(k)
+        if len(self.hit_keys) >= MAPPER_CACHE_FLUSH_INTERVAL:
+            self.flush()
+        return loads(ret[0])
+
+    def add(self, crv_data: Dict[str, Any], crx_data: Dict[str, Any]):
+        from json import dumps
+
+        if not self.conn:
+            return
+        k = self.get_key(crv_data)
+        v = dumps({key: value for key, value in crx_data.items() if key != "uid"})
+        self.pending_rows.append((k, v))
+        if len(self.pending_rows) >= MAPPER_CACHE_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        import time
+
+        if not self.conn or (not self.pending_rows and not self.hit_keys):
+            return
+        ts = time.time()
+        with self.conn:
+            if self.pending_rows:
+                self.conn.executemany(
+                    "insert or replace into mapping (k, v, atime) values (?, ?, ?)",
+                    [(k, v, ts) for k, v in self.pending_rows],
+                )
+            if self.hit_keys:
+                self.conn.executemany(
+                    "update mapping set atime=? where k=?",
+                    [(ts, k) for k in self.hit_keys],
+                )
+        self.pending_rows = []
+        self.hit_keys = []
+
+    def evict_if_needed(self):
+        if not self.conn:
+            return
+        num_entries = self.conn.execute("select count(*) from mapping").fetchone()[0]
+        if num_entries <= self.max_entries:
+            return
+        num_to_evict = num_entries - int(self.max_entries * MAPPER_CACHE_EVICTION_RATIO)
+        with self.conn:
+            self.conn.execute(
+                "delete from mapping where k in (select k from mapping "
+                + "order by atime limit ?)",
+                (num_to_evict,),
+            )
+        self.num_evicted += num_to_evict
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.num_hits,
+            "misses": self.num_misses,
+            "evicted": self.num_evicted,
+        }
+
+    def close(self):
+        if not self.conn:
+            return
+        self.flush()
+        self.evict_if_needed()
+        self.conn.close()
+        self.conn = None
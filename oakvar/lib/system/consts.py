@@ -36,6 +36,11 @@ max_num_concurrent_annotators_per_job_key = "max_num_concurrent_annotators_per_j
 max_num_concurrent_modules_per_job_key = "max_num_concurrent_modules_per_job"
 default_assembly_key = "default_assembly"
 report_filter_max_num_cache_per_user_key = "report_filter_max_num_cache_per_user"
+mapper_cache_max_entries_key = "mapper_cache_max_entries"
+variant_store_max_entries_key = "variant_store_max_entries"
+annotator_service_key = "annotator_service"
+annotator_service_modules_key = "annotator_service_modules"
+annotator_service_max_num_lines_key = "annotator_service_max_num_lines"
 
 #
 # default system conf values
@@ -46,6 +51,9 @@ default_gui_port_ssl = 8443
 default_assembly = "hg38"
 default_postaggregator_names = ["tagsampler", "vcfinfo"]
 DEFAULT_REPORT_FILTER_MAX_NUM_CACHE_PER_USER = 20
+DEFAULT_MAPPER_CACHE_MAX_ENTRIES = 5000000
+DEFAULT_VARIANT_STORE_MAX_ENTRIES = 10000000
+DEFAULT_ANNOTATOR_SERVICE_MAX_NUM_LINES = 10000
 
 #
 # Server
@@ -1,6 +1,56 @@
 from typing import Union
 from typing import Optional
+from typing import List
 from pathlib import Path
+from re import compile
+
+ARROW_MAGIC = b"ARROW1"
+ARROW_META_KEY = b"oakvar_meta"
+ARROW_BATCH_SIZE = 10000
+ENCODING_META_PREFIX = b"#encoding="
+CHUNK_PLAN_BLOCK_SIZE = 1 << 20
+
+
+def is_arrow_file(path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(ARROW_MAGIC)) == ARROW_MAGIC
+
+
+def get_arrow_type(col_type):
+    import pyarrow as pa
+
+    if col_type == "int":
+        return pa.int64()
+    elif col_type == "float":
+        return pa.float64()
+    else:
+        return pa.string()
+
+
+def is_list_value(value) -> bool:
+    if isinstance(value, (list, tuple)):
+        return True
+    return isinstance(value, str) and value.startswith("[")
+
+
+def to_arrow_value(value, col_type):
+    if value is None or (isinstance(value, str) and value == ""):
+        return None
+    if col_type == "int":
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            try:
+                return int(float(value))
+            except Exception:
+                return None
+    elif col_type == "float":
+        try:
+            return float(value)
+        except Exception:
+            return None
+    else:
+        return str(value)
 
 
 class BaseFile(object):
@@ -29,12 +79,12 @@ class BaseFile(object):
 
 class FileReader(BaseFile):
     def __init__(self, path, seekpos: int=0, chunksize: Optional[int]=None, logger=None):
-        from .util import detect_encoding
-
         super().__init__(path)
         self.seekpos = seekpos
         self.chunksize = chunksize
-        self.encoding = detect_encoding(self.path)
+        self.arrowfmt: bool = is_arrow_file(self.path)
+        self.encoding = "utf-8"
+        self.header_lines: List[str] = self._read_header()
         self.annotator_name = ""
         self.annotator_displayname = ""
         self.annotator_version = ""
@@ -45,14 +95,35 @@ class FileReader(BaseFile):
         self.logger = logger
         self._setup_definition()
 
+    def _read_header(self) -> List[str]:
+        from .util import detect_encoding
+
+        if self.arrowfmt:
+            return list(self._loop_arrow_definition())
+        blines = []
+        with open(self.path, "rb") as f:
+            for bline in f:
+                if not bline.lstrip().startswith(b"#"):
+                    break
+                blines.append(bline)
+        # OakVar-written files declare their encoding, which makes
+        # detection over the whole file unnecessary.
+        encoding = None
+        for bline in blines:
+            if bline.startswith(ENCODING_META_PREFIX):
+                encoding = bline[len(ENCODING_META_PREFIX) :].strip().decode()
+                break
+        if encoding is None:
+            encoding = detect_encoding(self.path)
+        self.encoding = encoding
+        return [bline.decode(encoding).strip() for bline in blines]
+
     def _setup_definition(self):
         from json import loads
         from json.decoder import JSONDecodeError
 
-        with open(self.path, encoding=self.encoding) as f:
-            line = f.readline()[:-1]
-            if line.startswith("#fmt=csv"):
-                self.csvfmt = True
+        if self.header_lines and self.header_lines[0].startswith("#fmt=csv"):
+            self.csvfmt = True
         for line in self._loop_definition():
             if line.startswith("#name="):
                 self.annotator_name = line.split("=")[1]
@@ -108,37 +179,123 @@ class FileReader(BaseFile):
     def get_annotator_version(self):
         return self.annotator_version
 
-    def get_chunksize(self, num_core):
-        f = open(self.path)
+    def get_meta_lines(self) -> List[str]:
+        return list(self._loop_definition())
+
+    def get_chunksize(self, num_core, min_chunksize: int = 1):
+        if self.arrowfmt:
+            return self._get_arrow_chunksize(num_core, min_chunksize=min_chunksize)
+        # One pass over the data counts newlines per block and keeps where each
+        # block starts. Chunk offsets are then found by rereading only the
+        # blocks in which chunks start.
+        num_header_lines = len(self.header_lines)
+        block_index = []
         max_data_line_no = 0
-        max_line_no = 0
-        for line in f:
-            max_line_no += 1
-            if line.startswith("#"):
-                continue
-            max_data_line_no += 1
-        chunksize = max(int(max_data_line_no / num_core), 1)
-        f.seek(0)
+        with open(self.path, "rb") as f:
+            for _ in range(num_header_lines):
+                f.readline()
+            offset = f.tell()
+            last_byte = b"\n"
+            while True:
+                block = f.read(CHUNK_PLAN_BLOCK_SIZE)
+                if not block:
+                    break
+                block_index.append((offset, max_data_line_no))
+                max_data_line_no += block.count(b"\n")
+                offset += len(block)
+                last_byte = block[-1:]
+            if last_byte != b"\n":
+                max_data_line_no += 1
+            chunksize = max(int(max_data_line_no / num_core), min_chunksize, 1)
+            poss = [[0, 0]]
+            block_no = 0
+            for data_line_no in range(chunksize, max_data_line_no + 1, chunksize):
+                if len(poss) >= num_core:
+                    break
+                while (
+                    block_no + 1 < len(block_index)
+                    and block_index[block_no + 1][1] < data_line_no
+                ):
+                    block_no += 1
+                block_offset, num_lines_before = block_index[block_no]
+                f.seek(block_offset)
+                block = f.read(CHUNK_PLAN_BLOCK_SIZE)
+                line_end = -1
+                for _ in range(data_line_no - num_lines_before):
+                    line_end = block.find(b"\n", line_end + 1)
+                    if line_end == -1:
+                        line_end = len(block) - 1
+                        break
+                poss.append([block_offset + line_end + 1, chunksize])
+        max_line_no = num_header_lines + max_data_line_no
+        return max_line_no, chunksize, poss, len(poss), max_data_line_no
+
+    def _get_arrow_chunksize(self, num_core, min_chunksize: int = 1):
+        import pyarrow as pa
+
+        # seekpos of arrow files is a row offset, not a byte offset.
+        with pa.memory_map(self.path) as source:
+            reader = pa.ipc.open_file(source)
+            max_data_line_no = sum(
+                reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+            )
+        chunksize = max(int(max_data_line_no / num_core), min_chunksize, 1)
         poss = [[0, 0]]
-        line_no = 0
-        data_line_no = 0
-        while True:
-            line = f.readline()
-            line_no += 1
-            if not line.startswith("#"):
-                data_line_no += 1
-                if data_line_no % chunksize == 0 and len(poss) < num_core:
-                    poss.append([f.tell(), chunksize])
-            if line_no == max_line_no:
+        for row_no in range(chunksize, max_data_line_no + 1, chunksize):
+            if len(poss) >= num_core:
                 break
-        f.close()
-        len_poss = len(poss)
-        return max_line_no, chunksize, poss, len_poss, max_data_line_no
+            poss.append([row_no, chunksize])
+        return max_data_line_no, chunksize, poss, len(poss), max_data_line_no
+
+    def loop_record_batches(self):
+        import pyarrow as pa
+
+        start = self.seekpos or 0
+        num_left = self.chunksize
+        with pa.memory_map(self.path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if start >= batch.num_rows:
+                    start -= batch.num_rows
+                    continue
+                if start:
+                    batch = batch.slice(start)
+                    start = 0
+                if num_left is not None:
+                    if num_left <= 0:
+                        return
+                    batch = batch.slice(0, num_left)
+                    num_left -= batch.num_rows
+                yield batch
+
+    def _loop_arrow_data(self):
+        from ..exceptions import BadFormatError
+
+        col_indices = sorted(self.columns.keys())
+        col_names = [self.columns[i].name for i in col_indices]
+        lnum = self.seekpos or 0
+        for batch in self.loop_record_batches():
+            if batch.num_columns < len(self.columns):
+                err_msg = "Too few columns. Received %s. Expected %s." % (
+                    batch.num_columns,
+                    len(self.columns),
+                )
+                return BadFormatError(err_msg)
+            cols = [batch.column(i).to_pylist() for i in col_indices]
+            for row in zip(*cols):
+                lnum += 1
+                yield lnum, ["" if v is None else str(v) for v in row], dict(
+                    zip(col_names, row)
+                )
 
     def loop_data(self):
         from ..exceptions import BadFormatError
         from json import loads
 
+        if self.arrowfmt:
+            yield from self._loop_arrow_data()
+            return
         for lnum, toks in self._loop_data():
             out = {}
             if len(toks) < len(self.columns):
@@ -177,28 +334,68 @@ class FileReader(BaseFile):
                             tok = None
             yield lnum, toks, out
 
+    def is_sorted_by(self, col_name: str) -> bool:
+        """Returns True if the data rows are in non-decreasing order of
+        col_name. Only that column is converted, so this is much cheaper
+        than reading the rows with loop_data.
+
+        Args:
+            col_name (str): col_name
+        """
+        col_index = None
+        col_type = None
+        for index, col_def in self.columns.items():
+            if col_def.name == col_name:
+                col_index = index
+                col_type = col_def.type
+        if col_index is None:
+            return False
+        prev_value = None
+        try:
+            if self.arrowfmt:
+                for batch in self.loop_record_batches():
+                    for value in batch.column(col_index).to_pylist():
+                        if value is None:
+                            return False
+                        if prev_value is not None and value < prev_value:
+                            return False
+                        prev_value = value
+                return True
+            for _, toks in self._loop_data():
+                value = toks[col_index]
+                if col_type == "int":
+                    value = int(value)
+                elif col_type == "float":
+                    value = float(value)
+                if prev_value is not None and value < prev_value:
+                    return False
+                prev_value = value
+        except (ValueError, TypeError, IndexError):
+            return False
+        return True
+
     def get_data(self):
         all_data = [d for _, _, d in self.loop_data()]
         return all_data
 
     def _loop_definition(self):
-        if self.csvfmt:
-            f = open(self.path, newline="", encoding=self.encoding)
-        else:
-            f = open(self.path, encoding=self.encoding)
-        for line in f:
-            line = line.rstrip().lstrip()
-            if line.startswith("#"):
-                yield line
-            else:
-                break
-        f.close()
+        for line in self.header_lines:
+            yield line
+
+    def _loop_arrow_definition(self):
+        from json import loads
+        import pyarrow as pa
+
+        with pa.memory_map(self.path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        for line in loads(metadata.get(ARROW_META_KEY, b"[]")):
+            yield line
 
     def _loop_data(self):
         if not self.encoding:
             return
         if self.csvfmt:
-            with open(self.path, newline="") as f:
+            with open(self.path, newline="", encoding=self.encoding) as f:
                 f.seek(self.seekpos)
                 lnum = 0
                 import csv
@@ -245,18 +442,33 @@ class FileWriter(BaseFile):
     ):
         super().__init__(path)
         self.csvfmt: bool = False
+        self.arrowfmt: bool = False
         if fmt == "csv":
             self.csvfmt = True
+        elif fmt == "arrow":
+            self.arrowfmt = True
         self.csvwriter = None
-        if fmt == "csv":
+        self.arrow_writer = None
+        self.arrow_rows = []
+        self.meta_lines: List[str] = []
+        if self.arrowfmt:
+            if mode != "w":
+                raise Exception("arrow intermediate files cannot be appended to.")
+            # The file is created with the first batch, as the schema carries
+            # the meta lines and the column definitions.
+            self.wf = None
+        elif fmt == "csv":
             self.wf = open(self.path, mode, newline="", encoding="utf-8")
             from csv import writer
 
             self.csvwriter = writer(self.wf)
             if mode == "w":
                 self.wf.write("#fmt=csv\n")
+                self.wf.write("#encoding=utf-8\n")
         else:
             self.wf = open(self.path, mode, encoding="utf-8")
+            if mode == "w":
+                self.wf.write("#encoding=utf-8\n")
         self.mode: str = mode
         self.ready_to_write = False
         self.ordered_columns = []
@@ -295,22 +507,29 @@ class FileWriter(BaseFile):
             self.name_to_col_index[col_def.name] = col_index
         self.ready_to_write = True
 
+    def _write_meta(self, line):
+        if self.arrowfmt:
+            if self.arrow_writer is not None:
+                raise Exception(f"Meta lines must be written before data: {line}")
+            self.meta_lines.append(line.rstrip("\n"))
+            return
+        self.wf.write(line)
+        self.wf.flush()
+
     def write_names(self, annotator_name, annotator_display_name, annotator_version):
         line = "#name={:}\n".format(annotator_name)
-        self.wf.write(line)
+        self._write_meta(line)
         line = "#displayname={:}\n".format(annotator_display_name)
-        self.wf.write(line)
+        self._write_meta(line)
         line = "#version={:}\n".format(annotator_version)
-        self.wf.write(line)
-        self.wf.flush()
+        self._write_meta(line)
 
     def add_index(self, index_columns):
         self.write_meta_line("index", ",".join(index_columns))
 
     def write_meta_line(self, key, value):
         line = "#{:}={:}\n".format(key, value)
-        self.wf.write(line)
-        self.wf.flush()
+        self._write_meta(line)
 
     def write_definition(self, conf=None):
         from json import dumps
@@ -322,19 +541,22 @@ class FileWriter(BaseFile):
             self.write_meta_line(
                 "report_substitution", dumps(conf["report_substitution"])
             )
-        self.wf.flush()
 
     def write_input_paths(self, input_path_dict):
         from json import dumps
 
         s = "#input_paths={}\n".format(dumps(input_path_dict))
-        self.wf.write(s)
-        self.wf.flush()
+        self._write_meta(s)
 
     def write_data(self, data):
         if not data:
             return
         self.prep_for_write()
+        if self.arrowfmt:
+            self.arrow_rows.append(data)
+            if len(self.arrow_rows) >= ARROW_BATCH_SIZE:
+                self._write_arrow_batch()
+            return
         wtoks = [data.get(col.name, "") for col in self.columns.values()]
         if self.csvfmt:
             if self.csvwriter is not None:
@@ -347,13 +569,119 @@ class FileWriter(BaseFile):
         else:
             self.wf.write("\t".join(wtoks) + "\n")
 
+    def write_df(self, df):
+        """Writes the rows of a Polars DataFrame. Columns of the file missing in
+        df are written empty.
+
+        Args:
+            df: Polars DataFrame
+        """
+        import polars as pl
+
+        if df is None or df.height == 0:
+            return
+        self.prep_for_write()
+        df = df.select(
+            [
+                pl.col(col.name) if col.name in df.columns else pl.lit(None).alias(col.name)
+                for col in self.ordered_columns
+            ]
+        )
+        if self.arrowfmt:
+            self.arrow_rows.extend(df.to_dicts())
+            if len(self.arrow_rows) >= ARROW_BATCH_SIZE:
+                self._write_arrow_batch()
+            return
+        if self.csvfmt:
+            # Same line terminator as csv.writer, so that rows written by
+            # write_data and write_df look the same.
+            self.wf.write(df.write_csv(include_header=False, line_terminator="\r\n"))
+        else:
+            self.wf.write(df.write_csv(include_header=False, separator="\t"))
+
+    def _get_arrow_schema(self):
+        from json import dumps
+        import pyarrow as pa
+
+        fields = [
+            pa.field(col.name, get_arrow_type(col.type))
+            for col in self.ordered_columns
+        ]
+        return pa.schema(fields, metadata={ARROW_META_KEY: dumps(self.meta_lines)})
+
+    def _write_arrow_batch(self):
+        import pyarrow as pa
+
+        self.prep_for_write()
+        schema = self._get_arrow_schema()
+        if self.arrow_writer is None:
+            self.arrow_writer = pa.ipc.new_file(self.path, schema)
+        if not self.arrow_rows:
+            return
+        # csv files keep list values of float columns as joined strings, which
+        # float arrow columns cannot hold. Such files are written as csv.
+        float_col_names = [col.name for col in self.ordered_columns if col.type == "float"]
+        for row in self.arrow_rows:
+            for col_name in float_col_names:
+                if is_list_value(row.get(col_name)):
+                    self._switch_to_csv()
+                    return
+        arrays = [
+            pa.array(
+                [to_arrow_value(row.get(col.name), col.type) for row in self.arrow_rows],
+                type=field.type,
+            )
+            for col, field in zip(self.ordered_columns, schema)
+        ]
+        self.arrow_writer.write_batch(pa.record_batch(arrays, schema=schema))
+        self.arrow_rows = []
+
+    def _switch_to_csv(self):
+        """Rewrites the rows written so far and the buffered rows as csv, and
+        continues in csv.
+        """
+        import pyarrow as pa
+        from csv import writer
+        from logging import getLogger
+
+        getLogger("oakvar.inout").warning(
+            f"{self.path} has list values in float columns and is written as csv instead of arrow."
+        )
+        rows = []
+        if self.arrow_writer is not None:
+            self.arrow_writer.close()
+            self.arrow_writer = None
+            with pa.memory_map(self.path) as source:
+                rows = pa.ipc.open_file(source).read_all().to_pylist()
+        rows.extend(self.arrow_rows)
+        self.arrow_rows = []
+        self.arrowfmt = False
+        self.csvfmt = True
+        self.wf = open(self.path, "w", newline="", encoding="utf-8")
+        self.csvwriter = writer(self.wf)
+        self.wf.write("#fmt=csv\n")
+        self.wf.write("#encoding=utf-8\n")
+        for line in self.meta_lines:
+            self.wf.write(line + "\n")
+        for row in rows:
+            self.write_data(row)
+
     def close(self):
+        if self.arrowfmt:
+            self._write_arrow_batch()
+        # The last batch can switch the file to csv.
+        if self.arrowfmt:
+            if self.arrow_writer is not None:
+                self.arrow_writer.close()
+            return
         self.wf.close()
 
 
 class CrxMapping(object):
+    tchange_re = compile(r"([AaTtCcGgUuNn_-]+)(\d+)([AaTtCcGgUuNn_-]+)")
+    achange_re = compile(r"([a-zA-Z_\*]+)(\d+)([AaTtCcGgUuNn_\*]+)")
+
     def __init__(self):
-        from re import compile
         from typing import Optional
 
         self.protein: Optional[str] = None
@@ -369,8 +697,6 @@ class CrxMapping(object):
         self.apos_start = None
         self.aalt = None
         self.mapping = None
-        self.tchange_re = compile(r"([AaTtCcGgUuNn_-]+)(\d+)([AaTtCcGgUuNn_-]+)")
-        self.achange_re = compile(r"([a-zA-Z_\*]+)(\d+)([AaTtCcGgUuNn_\*]+)")
 
     def load_tchange(self, tchange):
         self.tchange = tchange
@@ -400,20 +726,40 @@ class CrxMapping(object):
 
 
 class AllMappingsParser(object):
-    def __init__(self, s):
-        from json import loads
-        from collections import OrderedDict
+    _protein_index = 0
+    _achange_index = 1
+    _so_index = 2
+    _transc_index = 3
+    _tchange_index = 4
 
+    def __init__(self, s):
+        # all_mappings is parsed only when an annotator actually uses
+        # mapping_parser, as most annotators never touch it.
         if type(s) == str:
-            self._d = loads(s, object_pairs_hook=OrderedDict)
+            self._s = s
+            self._parsed = None
         else:
-            self._d = s
-        self._protein_index = 0
-        self._achange_index = 1
-        self._so_index = 2
-        self._transc_index = 3
-        self._tchange_index = 4
-        self.mappings = self.get_all_mappings()
+            self._s = None
+            self._parsed = s
+        self._mappings = None
+
+    @property
+    def _d(self):
+        from json import loads
+
+        if self._parsed is None:
+            self._parsed = loads(self._s) if self._s else {}
+        return self._parsed
+
+    @property
+    def mappings(self):
+        if self._mappings is None:
+            self._mappings = self.get_all_mappings()
+        return self._mappings
+
+    @mappings.setter
+    def mappings(self, mappings):
+        self._mappings = mappings
 
     def get_genes(self):
         return list(self._d.keys())
@@ -604,9 +950,260 @@ class ColumnDefinition(object):
             yield k, v
 
 
+def merge_arrow_files(paths: List[str], out_path, unique_col: Optional[str] = None):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    schema = None
+    tables = []
+    writer = None
+    for path in paths:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            if schema is None:
+                schema = reader.schema
+                writer = pa.ipc.new_file(str(out_path), schema)
+            if unique_col:
+                tables.append(reader.read_all())
+                continue
+            for i in range(reader.num_record_batches):
+                writer.write_batch(reader.get_batch(i))  # type: ignore
+    if writer is None:
+        return
+    if unique_col and tables:
+        table = pa.concat_tables(tables)
+        keys = table.column(unique_col).to_pylist()
+        first_rows = {}
+        for row_no, key in enumerate(keys):
+            if key not in first_rows:
+                first_rows[key] = row_no
+        table = table.take(pa.array(list(first_rows.values())))
+        table = table.take(pc.sort_indices(table, sort_keys=[(unique_col, "ascending")]))
+        writer.write_table(table.replace_schema_metadata(schema.metadata))  # type: ignore
+    writer.close()
+
+
+def get_data_offset(path) -> int:
+    """get_data_offset.
+
+    Args:
+        path:
+    """
+    offset = 0
+    with open(path, "rb") as f:
+        for bline in f:
+            if not bline.startswith(b"#"):
+                break
+            offset += len(bline)
+    return offset
+
+
+def copy_fd_range(in_fd: int, out_fd: int, offset: int, count: int):
+    """Copies count bytes of in_fd from offset to the current position of out_fd.
+
+    Args:
+        in_fd (int): in_fd
+        out_fd (int): out_fd
+        offset (int): offset
+        count (int): count
+    """
+    import os
+
+    # Kernel-side copies avoid moving the data through Python. Either may be
+    # unavailable for the platform or the file system, in which case the next
+    # method continues from where the previous one stopped.
+    kernel_copies = []
+    if hasattr(os, "copy_file_range"):
+        kernel_copies.append(lambda o, c: os.copy_file_range(in_fd, out_fd, c, o))
+    if hasattr(os, "sendfile"):
+        kernel_copies.append(lambda o, c: os.sendfile(out_fd, in_fd, o, c))
+    for copy_fn in kernel_copies:
+        try:
+            while count > 0:
+                n = copy_fn(offset, count)
+                if n == 0:
+                    return
+                offset += n
+                count -= n
+            return
+        except OSError:
+            continue
+    os.lseek(in_fd, offset, os.SEEK_SET)
+    while count > 0:
+        data = os.read(in_fd, min(count, 1 << 20))
+        if not data:
+            return
+        os.write(out_fd, data)
+        count -= len(data)
+
+
+def concat_csv_files(paths: List[str], out_path):
+    """Concatenates intermediate files, keeping the header of the first file only.
+
+    Args:
+        paths (List[str]): paths
+        out_path:
+    """
+    import os
+
+    out_fd = os.open(str(out_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for file_no, path in enumerate(paths):
+            offset = 0 if file_no == 0 else get_data_offset(path)
+            in_fd = os.open(str(path), os.O_RDONLY)
+            try:
+                size = os.fstat(in_fd).st_size
+                copy_fd_range(in_fd, out_fd, offset, size - offset)
+            finally:
+                os.close(in_fd)
+    finally:
+        os.close(out_fd)
+
+
+def _iter_sorted_csv_data(path, check_sorted: bool = True):
+    from csv import reader
+
+    with open(path, newline="", encoding="utf-8", errors="surrogateescape") as f:
+        csvfmt = None
+        prev_key = None
+        for line in f:
+            if line.startswith("#"):
+                if csvfmt is None:
+                    csvfmt = line.startswith("#fmt=csv")
+                continue
+            if not line.strip():
+                continue
+            # The key is the first field (hugo of crg files). Shard merges
+            # used to key csv lines on their first whitespace-separated token,
+            # which kept rows of one gene with different fields as duplicates.
+            if csvfmt:
+                key = next(reader([line]))[0]
+            else:
+                key = line.split()[0]
+            if check_sorted and prev_key is not None and key < prev_key:
+                raise ValueError(f"{path} is not sorted.")
+            prev_key = key
+            yield key, line
+
+
+def merge_sorted_csv_files(paths: List[str], out_path):
+    """Merges intermediate files sorted by their first column, dropping
+    duplicate keys. The header of the first file is kept.
+
+    Args:
+        paths (List[str]): paths
+        out_path:
+    """
+    from heapq import merge
+
+    with open(
+        out_path, "w", newline="", encoding="utf-8", errors="surrogateescape"
+    ) as wf:
+        with open(paths[0], newline="", encoding="utf-8", errors="surrogateescape") as f:
+            for line in f:
+                if not line.startswith("#"):
+                    break
+                wf.write(line)
+        header_end = wf.tell()
+        prev_key = None
+        try:
+            for key, line in merge(
+                *[_iter_sorted_csv_data(path) for path in paths], key=lambda v: v[0]
+            ):
+                if key != prev_key:
+                    wf.write(line)
+                    prev_key = key
+        except ValueError:
+            # Shards not sorted by the mapper are merged in memory.
+            wf.seek(header_end)
+            wf.truncate()
+            unique_lines = {}
+            for path in paths:
+                for key, line in _iter_sorted_csv_data(path, check_sorted=False):
+                    if key not in unique_lines:
+                        unique_lines[key] = line
+            for key in sorted(unique_lines.keys()):
+                wf.write(unique_lines[key])
+
+
+def get_polars_type(col_type):
+    import polars as pl
+
+    if col_type == "int":
+        return pl.Int64
+    elif col_type == "float":
+        return pl.Float64
+    else:
+        return pl.String
+
+
+def iter_df_batches(reader: FileReader, batch_size: int):
+    """Yields the data rows of an arrow or csv-format intermediate file in
+    batches of up to batch_size rows. Each batch is yielded as a tuple of its
+    number of rows and a Polars DataFrame typed by the column definitions of
+    the file, or None instead of the DataFrame if some of its values cannot
+    be cast to the column types. Such rows should be read with loop_data.
+
+    Args:
+        reader (FileReader): reader of the file
+        batch_size (int): batch_size
+    """
+    import polars as pl
+
+    if reader.arrowfmt:
+        import pyarrow as pa
+
+        batches = []
+        num_rows = 0
+        for record_batch in reader.loop_record_batches():
+            batches.append(record_batch)
+            num_rows += record_batch.num_rows
+            if num_rows < batch_size:
+                continue
+            df = pl.from_arrow(pa.Table.from_batches(batches))
+            for batch in df.iter_slices(n_rows=batch_size):  # type: ignore
+                yield batch.height, batch
+            batches = []
+            num_rows = 0
+        if batches:
+            df = pl.from_arrow(pa.Table.from_batches(batches))
+            yield df.height, df  # type: ignore
+        return
+    if not reader.csvfmt:
+        raise ValueError(f"{reader.path} is neither in arrow nor in csv format.")
+    schema = {
+        col.name: get_polars_type(col.type)
+        for _, col in sorted(reader.columns.items())
+    }
+    # Values are read as strings and cast per batch so that a value which
+    # does not fit its column type, such as a list in a float column, only
+    # sends its own batch to loop_data.
+    lf = pl.scan_csv(
+        reader.path,
+        has_header=False,
+        comment_prefix="#",
+        schema={name: pl.String for name in schema},
+    )
+    if hasattr(lf, "collect_batches"):
+        batches = lf.collect_batches(chunk_size=batch_size)
+    else:
+        batches = lf.collect().iter_slices(n_rows=batch_size)
+    for batch in batches:
+        try:
+            yield batch.height, batch.cast(schema, strict=True)  # type: ignore
+        except pl.exceptions.PolarsError:
+            yield batch.height, None
+
+
 def read_crv(fpath):
     import polars as pl
 
+    if is_arrow_file(fpath):
+        import pyarrow as pa
+
+        with pa.memory_map(str(fpath)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return pl.from_arrow(table.select(["uid", "chrom", "pos", "pos_end", "ref_base", "alt_base"]))
     f = open(fpath)
     c = 0
     for line in f:
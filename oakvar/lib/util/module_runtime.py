@@ -0,0 +1,122 @@
+from typing import Optional
+from typing import Dict
+from pathlib import Path
+
+MODULE_RUNTIME_DIR_NAME = "module_runtime"
+MODULE_RUNTIME_FNAME = "module_runtime.sqlite"
+MODULE_RUNTIME_HISTORY_SIZE = 10
+
+
+def get_module_runtime_path() -> Optional[Path]:
+    from ..system import get_cache_dir
+
+    d = get_cache_dir(MODULE_RUNTIME_DIR_NAME)
+    if not d:
+        return None
+    return d / MODULE_RUNTIME_FNAME
+
+
+def count_data_lines(path) -> int:
+    """Counts the data rows of an intermediate file. Rows of arrow files are
+    counted from the record batch headers.
+
+    Args:
+        path:
+    """
+    from .inout import is_arrow_file
+
+    if is_arrow_file(path):
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            return sum(
+                reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+            )
+    num_lines = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.startswith(b"#"):
+                num_lines += 1
+    return num_lines
+
+
+class ModuleRuntimeStore:
+    """Runtimes of modules in past jobs, used to estimate how long a module
+    will take on an input of a given size.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.conn = None
+        self.path = path or get_module_runtime_path()
+        if self.path:
+            self.create_store_dir_if_needed()
+        self.conn = self.get_conn()
+        self.create_tables_if_needed()
+
+    def create_store_dir_if_needed(self):
+        if self.path and not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def get_conn(self):
+        from sqlite3 import connect
+
+        if not self.path:
+            return None
+        if not self.conn:
+            try:
+                self.conn = connect(str(self.path), timeout=30)
+                self.conn.execute("pragma journal_mode=wal")
+            except Exception:
+                self.conn = None
+        return self.conn
+
+    def create_tables_if_needed(self):
+        if not self.conn:
+            return
+        self.conn.execute(
+            "create table if not exists runtime (module text, num_lines integer, "
+            + "runtime float, timestamp float)"
+        )
+        self.conn.execute(
+            "create index if not exists runtime_module on runtime (module, timestamp)"
+        )
+        self.conn.commit()
+
+    def add_runtime(self, module_name: str, num_lines: int, runtime: float):
+        """add_runtime.
+
+        Args:
+            module_name (str): module_name
+            num_lines (int): number of input lines
+            runtime (float): runtime in seconds
+        """
+        import time
+
+        if not self.conn:
+            return
+        q = "insert into runtime (module, num_lines, runtime, timestamp) values (?, ?, ?, ?)"
+        self.conn.execute(q, (module_name, num_lines, runtime, time.time()))
+        q = (
+            "delete from runtime where module=? and rowid not in (select rowid "
+            + "from runtime where module=? order by timestamp desc limit ?)"
+        )
+        self.conn.execute(q, (module_name, module_name, MODULE_RUNTIME_HISTORY_SIZE))
+        self.conn.commit()
+
+    def get_rates(self) -> Dict[str, float]:
+        """Returns seconds per input line of each module over its recent runs."""
+        if not self.conn:
+            return {}
+        q = "select module, sum(runtime), sum(num_lines) from runtime group by module"
+        rates = {}
+        for module_name, runtime, num_lines in self.conn.execute(q):
+            rates[module_name] = runtime / max(num_lines, 1)
+        return rates
+
+    def close(self):
+        if not self.conn:
+            return
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
@@ -1,5 +1,6 @@
 from typing import Optional
 from typing import Tuple
+from typing import Dict
 from liftover.chain_file import ChainFile
 from liftover.download_file import download_file
 
@@ -458,3 +459,58 @@ def get_wgs_reader(assembly="hg38"):
         wgs = ModuleClass()
         wgs.setup()
     return wgs
+
+
+class RefBaseCache(object):
+    """Reads reference bases through windows of a wgs reader.
+
+    Positions of sorted inputs are close to each other, so one window per
+    chromosome serves most lookups without reading the wgs module again.
+    """
+
+    def __init__(self, wgs_reader, window_size: int = 100_000):
+        self.wgs_reader = wgs_reader
+        self.window_size = window_size
+        self.windows: Dict[str, Tuple[int, str]] = {}
+        self.num_hits: int = 0
+        self.num_misses: int = 0
+
+    def __getattr__(self, name):
+        if name == "wgs_reader":
+            raise AttributeError(name)
+        return getattr(self.wgs_reader, name)
+
+    def get_bases(self, chrom: str, start: int, end: Optional[int] = None):
+        if end is None:
+            end = start
+        window = self.windows.get(chrom)
+        if window:
+            window_start, bases = window
+            if window_start <= start and end < window_start + len(bases):
+                self.num_hits += 1
+                return bases[start - window_start : end - window_start + 1]
+        self.num_misses += 1
+        if self.window_size and end - start < self.window_size:
+            try:
+                bases = self.wgs_reader.get_bases(
+                    chrom, start, start + self.window_size - 1
+                )
+            except TypeError:
+                # wgs readers without range lookups are read one position
+                # at a time.
+                self.window_size = 0
+                bases = None
+            except Exception:
+                # Windows running past the end of a chromosome can be out of
+                # range for the reader. Such lookups are done exactly.
+                bases = None
+            if bases:
+                self.windows[chrom] = (start, bases)
+                if end < start + len(bases):
+                    return bases[: end - start + 1]
+        if start == end:
+            return self.wgs_reader.get_bases(chrom, start)
+        return self.wgs_reader.get_bases(chrom, start, end)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"hits": self.num_hits, "misses": self.num_misses}
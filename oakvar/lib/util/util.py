@@ -148,6 +148,34 @@ def get_argument_parser_defaults(parser):
     return defaults
 
 
+def is_gzip_file(path) -> bool:
+    """is_gzip_file. gzip and bgzip files share the same magic bytes.
+
+    Args:
+        path:
+    """
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def open_input_file(path, encoding: Optional[str] = None):
+    """open_input_file. Opens a plain or gzip/bgzip-compressed input file
+    in text mode.
+
+    Args:
+        path:
+        encoding (Optional[str]): encoding
+    """
+    from gzip import open as gzipopen
+
+    if not encoding:
+        encoding = "utf-8"
+    if is_gzip_file(path):
+        return gzipopen(path, "rt", encoding=encoding, errors="replace")
+    else:
+        return open(path, encoding=encoding, errors="replace")
+
+
 def detect_encoding(path):
     """detect_encoding.
 
@@ -159,7 +187,7 @@ def detect_encoding(path):
 
     if " " not in path:
         path = path.strip('"')
-    if path.endswith(".gz"):
+    if is_gzip_file(path):
         f = gzipopen(path)
     else:
         f = open(path, "rb")
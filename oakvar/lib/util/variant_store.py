@@ -0,0 +1,304 @@
+from typing import Optional
+from typing import Any
+from typing import List
+from typing import Dict
+from typing import Tuple
+from pathlib import Path
+
+VARIANT_STORE_DIR_NAME = "variant_store"
+VARIANT_STORE_FNAME = "variant_store.sqlite"
+VARIANT_STORE_BATCH_SIZE = 500
+VARIANT_STORE_COMMIT_INTERVAL = 1000
+VARIANT_STORE_EVICTION_RATIO = 0.9
+
+
+def normalize_variant(chrom, pos, ref, alt) -> Tuple[str, int, str, str]:
+    """normalize_variant.
+
+    Args:
+        chrom:
+        pos:
+        ref:
+        alt:
+    """
+    chrom = str(chrom).strip()
+    if not chrom.startswith("chr"):
+        chrom = "chr" + chrom
+    ref = str(ref or "-").strip().upper() or "-"
+    alt = str(alt or "-").strip().upper() or "-"
+    return chrom, int(pos), ref, alt
+
+
+def get_variant_key(chrom, pos, ref, alt) -> str:
+    """get_variant_key.
+
+    Args:
+        chrom:
+        pos:
+        ref:
+        alt:
+    """
+    from hashlib import sha1
+
+    chrom, pos, ref, alt = normalize_variant(chrom, pos, ref, alt)
+    return sha1(f"{chrom}:{pos}:{ref}:{alt}".encode()).hexdigest()
+
+
+def get_result_key(module_name: str, version: str, data: Dict[str, Any]) -> str:
+    """get_result_key.
+
+    Args:
+        module_name (str): module_name
+        version (str): version
+        data (Dict[str, Any]): data
+    """
+    from hashlib import sha1
+    from json import dumps
+
+    s = dumps([module_name, version, data], sort_keys=True, default=str)
+    return sha1(s.encode()).hexdigest()
+
+
+def get_variant_store_path() -> Optional[Path]:
+    from ..system import get_cache_dir
+
+    d = get_cache_dir(VARIANT_STORE_DIR_NAME)
+    if not d:
+        return None
+    return d / VARIANT_STORE_FNAME
+
+
+def get_run_key(output_dir, run_name) -> str:
+    return str(Path(output_dir).absolute() / str(run_name))
+
+
+class VariantStore:
+    """Persistent store of variants and module outputs shared across runs.
+
+    Variants are keyed by a hash of normalized (chrom, pos, ref, alt), and
+    module outputs by a hash of the module name, version, and input data, so
+    that a variant processed by an earlier job does not have to be mapped or
+    annotated again.
+
+    When the variant or result table grows beyond max_entries (the
+    variant_store_max_entries system option), the entries seen or written
+    least recently are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        run_key: Optional[str] = None,
+        max_entries: Optional[int] = None,
+    ):
+        from ..system import get_sys_conf_int_value
+        from ..system.consts import variant_store_max_entries_key
+        from ..system.consts import DEFAULT_VARIANT_STORE_MAX_ENTRIES
+
+        self.conn = None
+        self.path = path or get_variant_store_path()
+        self.run_key = run_key
+        self.num_uncommitted = 0
+        if max_entries is None:
+            max_entries = get_sys_conf_int_value(variant_store_max_entries_key)
+        self.max_entries: int = max_entries or DEFAULT_VARIANT_STORE_MAX_ENTRIES
+        if self.path:
+            self.create_store_dir_if_needed()
+        self.conn = self.get_conn()
+        self.create_tables_if_needed()
+
+    def create_store_dir_if_needed(self):
+        if self.path and not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def get_conn(self):
+        from sqlite3 import connect
+
+        if not self.path:
+            return None
+        if not self.conn:
+            # Several mapper and annotator processes write at the same time.
+            self.conn = connect(str(self.path), timeout=60)
+            self.conn.execute("pragma journal_mode=wal")
+            self.conn.execute("pragma synchronous=normal")
+        return self.conn
+
+    def create_tables_if_needed(self):
+        if not self.conn:
+            return
+        self.conn.execute(
+            "create table if not exists variant (vkey text primary key, "
+            + "chrom text, pos integer, ref text, alt text, first_seen float, "
+            + "last_seen float, seen_count integer)"
+        )
+        self.conn.execute(
+            "create table if not exists result (k text primary key, "
+            + "module text, v text, timestamp float)"
+        )
+        self.conn.execute(
+            "create table if not exists run_stats (run_key text, stage text, "
+            + "module text, num_reused integer, num_total integer, "
+            + "primary key (run_key, stage, module))"
+        )
+        self.conn.execute(
+            "create index if not exists variant_last_seen on variant (last_seen)"
+        )
+        self.conn.execute(
+            "create index if not exists result_timestamp on result (timestamp)"
+        )
+        self.conn.commit()
+
+    def add_variants(self, variants: List[Dict[str, Any]]) -> int:
+        """Registers variants and returns how many of them were already stored.
+
+        Args:
+            variants (List[Dict[str, Any]]): variants with chrom, pos, ref_base, and alt_base
+        """
+        import time
+
+        if not self.conn or not variants:
+            return 0
+        ts = time.time()
+        rows = {}
+        for variant in variants:
+            norm = normalize_variant(
+                variant["chrom"], variant["pos"], variant["ref_base"], variant["alt_base"]
+            )
+            vkey = get_variant_key(*norm)
+            rows[vkey] = norm
+        vkeys = list(rows.keys())
+        num_seen = 0
+        for i in range(0, len(vkeys), VARIANT_STORE_BATCH_SIZE):
+            batch = vkeys[i : i + VARIANT_STORE_BATCH_SIZE]
+            q = "select count(*) from variant where vkey in ({})".format(
+                ",".join(["?"] * len(batch))
+            )
+            num_seen += self.conn.execute(q, batch).fetchone()[0]
+        q = (
+            "insert into variant (vkey, chrom, pos, ref, alt, first_seen, last_seen, "
+            + "seen_count) values (?, ?, ?, ?, ?, ?, ?, 1) on conflict(vkey) do "
+            + "update set last_seen=excluded.last_seen, seen_count=seen_count + 1"
+        )
+        self.conn.executemany(
+            q, [(vkey, *norm, ts, ts) for vkey, norm in rows.items()]
+        )
+        self.conn.commit()
+        return num_seen
+
+    def get_result(
+        self, module_name: str, version: str, data: Dict[str, Any]
+    ) -> Tuple[bool, Any]:
+        """Returns (found, value) of a stored module output.
+
+        Args:
+            module_name (str): module_name
+            version (str): version
+            data (Dict[str, Any]): input data the output was made from
+        """
+        from json import loads
+
+        if not self.conn:
+            return False, None
+        k = get_result_key(module_name, version, data)
+        ret = self.conn.execute("select v from result where k=?", (k,)).fetchone()
+        if not ret:
+            return False, None
+        return True, loads(ret[0])
+
+    def add_result(self, module_name: str, version: str, data: Dict[str, Any], value):
+        """add_result.
+
+        Args:
+            module_name (str): module_name
+            version (str): version
+            data (Dict[str, Any]): data
+            value:
+        """
+        import time
+        from json import dumps
+
+        if not self.conn:
+            return
+        k = get_result_key(module_name, version, data)
+        q = "insert or replace into result (k, module, v, timestamp) values (?, ?, ?, ?)"
+        self.conn.execute(q, (k, module_name, dumps(value, default=str), time.time()))
+        self.num_uncommitted += 1
+        if self.num_uncommitted >= VARIANT_STORE_COMMIT_INTERVAL:
+            self.commit()
+
+    def add_run_stats(self, stage: str, module_name: str, num_reused: int, num_total: int):
+        """Adds counts of reused outputs of a module to the current run's report.
+
+        Args:
+            stage (str): stage
+            module_name (str): module_name
+            num_reused (int): num_reused
+            num_total (int): num_total
+        """
+        if not self.conn or not self.run_key:
+            return
+        q = (
+            "insert into run_stats (run_key, stage, module, num_reused, num_total) "
+            + "values (?, ?, ?, ?, ?) on conflict(run_key, stage, module) do "
+            + "update set num_reused=num_reused + excluded.num_reused, "
+            + "num_total=num_total + excluded.num_total"
+        )
+        self.conn.execute(q, (self.run_key, stage, module_name, num_reused, num_total))
+        self.commit()
+
+    def clear_run_stats(self, stage: Optional[str] = None):
+        if not self.conn or not self.run_key:
+            return
+        if stage:
+            q = "delete from run_stats where run_key=? and stage=?"
+            self.conn.execute(q, (self.run_key, stage))
+        else:
+            q = "delete from run_stats where run_key=?"
+            self.conn.execute(q, (self.run_key,))
+        self.commit()
+
+    def get_run_stats(self) -> List[Dict[str, Any]]:
+        if not self.conn or not self.run_key:
+            return []
+        q = (
+            "select stage, module, num_reused, num_total from run_stats "
+            + "where run_key=? order by rowid"
+        )
+        rows = self.conn.execute(q, (self.run_key,)).fetchall()
+        return [
+            {"stage": row[0], "module": row[1], "reused": row[2], "total": row[3]}
+            for row in rows
+        ]
+
+    def commit(self):
+        if not self.conn:
+            return
+        self.conn.commit()
+        self.num_uncommitted = 0
+
+    def evict_if_needed(self):
+        if not self.conn:
+            return
+        for table_name, time_col in (("variant", "last_seen"), ("result", "timestamp")):
+            num_entries = self.conn.execute(
+                f"select count(*) from {table_name}"
+            ).fetchone()[0]
+            if num_entries <= self.max_entries:
+                continue
+            num_to_evict = num_entries - int(
+                self.max_entries * VARIANT_STORE_EVICTION_RATIO
+            )
+            self.conn.execute(
+                f"delete from {table_name} where rowid in (select rowid from "
+                + f"{table_name} order by {time_col} limit ?)",
+                (num_to_evict,),
+            )
+        self.commit()
+
+    def close(self):
+        if not self.conn:
+            return
+        self.commit()
+        self.evict_if_needed()
+        self.conn.close()
+        self.conn = None
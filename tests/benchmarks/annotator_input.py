@@ -0,0 +1,72 @@
+"""Throughput of the annotator input loop over a .crx file, with and without
+annotators using mapping_parser.
+
+    python tests/benchmarks/annotator_input.py 100000
+"""
+import sys
+
+ALL_MAPPINGS = (
+    '{"GENE1": [["ENSP1", "p.Ala1Gly", "MIS", "ENST1", "c.2C>G"], '
+    + '["ENSP2", "p.Ala5Gly", "MIS", "ENST2", "c.14C>G"]], '
+    + '"GENE2": [["", "", "2KD", "ENST3", ""]]}'
+)
+
+
+def write_crx(path: str, num_rows: int):
+    from oakvar.lib.util.inout import FileWriter
+    from oakvar.lib.util.util import get_crx_def
+
+    writer = FileWriter(path)
+    writer.add_columns(get_crx_def())
+    writer.write_definition()
+    for uid in range(1, num_rows + 1):
+        writer.write_data(
+            {
+                "uid": uid,
+                "chrom": "chr1",
+                "pos": uid,
+                "pos_end": uid,
+                "ref_base": "A",
+                "alt_base": "G",
+                "hugo": "GENE1",
+                "transcript": "ENST1",
+                "so": "MIS",
+                "all_mappings": ALL_MAPPINGS,
+            }
+        )
+    writer.close()
+
+
+def read_crx(path: str, use_mappings: bool) -> int:
+    from oakvar.lib.util.inout import AllMappingsParser
+    from oakvar.lib.util.inout import FileReader
+
+    num_rows = 0
+    for _, _, reader_data in FileReader(path).loop_data():
+        mapping_parser = AllMappingsParser(reader_data["all_mappings"])
+        if use_mappings:
+            for mapping in mapping_parser.mappings:
+                _ = mapping.so
+        num_rows += 1
+    return num_rows
+
+
+def main():
+    from pathlib import Path
+    from tempfile import TemporaryDirectory
+    from time import perf_counter
+
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with TemporaryDirectory() as d:
+        path = str(Path(d) / "t.crx")
+        write_crx(path, num_rows)
+        for use_mappings in [False, True]:
+            t = perf_counter()
+            read_crx(path, use_mappings)
+            rate = num_rows / (perf_counter() - t)
+            used = "used" if use_mappings else "not used"
+            print(f"mapping_parser {used}: {rate / 1000:.0f}k rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Peak memory of reading converter input with BaseConverter.get_variant_lines
+for growing input sizes. Memory should stay flat as the input grows.
+
+    python tests/benchmarks/converter_memory.py 100000 400000 1600000
+"""
+import sys
+
+BATCH_SIZE = 2500
+INFO = "DP=100;AF=0.5;" + "X" * 150
+
+
+def write_input(path: str, num_lines: int):
+    with open(path, "w") as wf:
+        wf.write("##fileformat=VCFv4.2\n")
+        for i in range(1, num_lines + 1):
+            wf.write(f"chr1\t{i}\t.\tA\tG\t.\tPASS\t{INFO}\n")
+
+
+def read_input(path: str) -> int:
+    from oakvar import BaseConverter
+
+    converter = BaseConverter()
+    num_lines = 0
+    start_line_no = 1
+    immature_exit = True
+    while immature_exit:
+        lines_data, immature_exit = converter.get_variant_lines(
+            path, 1, start_line_no, BATCH_SIZE
+        )
+        start_line_no += BATCH_SIZE
+        num_lines += len(lines_data[0])
+    return num_lines
+
+
+def measure(path: str):
+    from resource import getrusage, RUSAGE_SELF
+    from time import perf_counter
+
+    t = perf_counter()
+    num_lines = read_input(path)
+    elapsed = perf_counter() - t
+    max_rss_mb = getrusage(RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{num_lines} lines: {elapsed:.2f}s, max RSS {max_rss_mb:.0f} MB")
+
+
+def main():
+    from pathlib import Path
+    from subprocess import run
+    from tempfile import TemporaryDirectory
+
+    with TemporaryDirectory() as d:
+        for num_lines in [int(v) for v in sys.argv[1:]]:
+            path = str(Path(d) / f"input_{num_lines}.vcf")
+            write_input(path, num_lines)
+            # Each size is read in a new process, so that max RSS is its own.
+            run([sys.executable, __file__, "--measure", path], check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,116 @@
+"""Time of passing variants through the intermediate files of a job in csv
+and in arrow format. Each stage reads the files of the previous stage with
+FileReader.loop_data and writes its own with FileWriter, as the converter,
+the mapper, annotators, and the aggregator do.
+
+    python tests/benchmarks/intermediate_format.py 200000 5
+"""
+import sys
+
+VAR_COLUMNS = [
+    {"name": "uid", "title": "UID", "type": "int"},
+    {"name": "score", "title": "Score", "type": "float"},
+    {"name": "pred", "title": "Prediction", "type": "string"},
+]
+ALL_MAPPINGS = '{"GENE1": [["ENSP1", "p.Ala1Gly", "MIS", "ENST1", "c.2C>G"]]}'
+
+
+def make_writer(path: str, fmt: str, columns):
+    from oakvar.lib.util.inout import FileWriter
+
+    writer = FileWriter(path, fmt=fmt)
+    writer.add_columns(columns)
+    writer.write_definition()
+    return writer
+
+
+def run_converter(d: str, fmt: str, num_variants: int):
+    from oakvar.lib.util.util import get_crv_def
+
+    writer = make_writer(f"{d}/t.crv", fmt, get_crv_def())
+    for uid in range(1, num_variants + 1):
+        writer.write_data(
+            {
+                "uid": uid,
+                "chrom": "chr1",
+                "pos": uid,
+                "pos_end": uid,
+                "ref_base": "A",
+                "alt_base": "G",
+            }
+        )
+    writer.close()
+
+
+def run_mapper(d: str, fmt: str):
+    from oakvar.lib.util.inout import FileReader
+    from oakvar.lib.util.util import get_crx_def
+
+    writer = make_writer(f"{d}/t.crx", fmt, get_crx_def())
+    for _, _, crv_data in FileReader(f"{d}/t.crv").loop_data():
+        crv_data.update(
+            {
+                "coding": "Y",
+                "hugo": "GENE1",
+                "transcript": "ENST1",
+                "so": "MIS",
+                "cchange": "c.2C>G",
+                "achange": "p.Ala1Gly",
+                "exonno": 1,
+                "all_mappings": ALL_MAPPINGS,
+            }
+        )
+        writer.write_data(crv_data)
+    writer.close()
+
+
+def run_annotators(d: str, fmt: str, num_annotators: int):
+    from oakvar.lib.util.inout import FileReader
+
+    for annotator_no in range(num_annotators):
+        writer = make_writer(f"{d}/t.a{annotator_no}.var", fmt, VAR_COLUMNS)
+        for _, _, crx_data in FileReader(f"{d}/t.crx").loop_data():
+            pos = crx_data["pos"]
+            writer.write_data({"uid": crx_data["uid"], "score": pos / 7, "pred": "D"})
+        writer.close()
+
+
+def run_aggregator(d: str, num_annotators: int) -> int:
+    from oakvar.lib.util.inout import FileReader
+
+    num_rows = 0
+    paths = [f"{d}/t.crx"] + [f"{d}/t.a{n}.var" for n in range(num_annotators)]
+    for path in paths:
+        for _ in FileReader(path).loop_data():
+            num_rows += 1
+    return num_rows
+
+
+def main():
+    from tempfile import TemporaryDirectory
+    from time import perf_counter
+
+    num_variants = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    num_annotators = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    for fmt in ["csv", "arrow"]:
+        with TemporaryDirectory() as d:
+            times = []
+            t = perf_counter()
+            run_converter(d, fmt, num_variants)
+            times.append(("converter", perf_counter() - t))
+            t = perf_counter()
+            run_mapper(d, fmt)
+            times.append(("mapper", perf_counter() - t))
+            t = perf_counter()
+            run_annotators(d, fmt, num_annotators)
+            times.append(("annotators", perf_counter() - t))
+            t = perf_counter()
+            run_aggregator(d, num_annotators)
+            times.append(("aggregator", perf_counter() - t))
+            total = sum(v for _, v in times)
+            stages = ", ".join(f"{name} {v:.2f}s" for name, v in times)
+            print(f"{fmt}: total {total:.2f}s ({stages})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Time of constructing a FileReader on intermediate files.
+
+    python tests/benchmarks/reader_construction.py t.crv t.crs
+"""
+import sys
+
+
+def main():
+    from timeit import repeat
+    from oakvar.lib.util.inout import FileReader
+
+    number = 20
+    for path in sys.argv[1:]:
+        t = min(repeat(lambda: FileReader(path), number=number, repeat=3)) / number
+        print(f"{path}: {t * 1000:.2f} ms per FileReader")
+
+
+if __name__ == "__main__":
+    main()
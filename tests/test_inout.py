@@ -0,0 +1,58 @@
+from oakvar.lib.util.inout import FileReader
+from oakvar.lib.util.inout import FileWriter
+
+
+def make_writer(path):
+    writer = FileWriter(path, fmt="arrow")
+    writer.add_columns(
+        [
+            {"name": "uid", "title": "UID", "type": "int"},
+            {"name": "score", "title": "Score", "type": "float"},
+        ]
+    )
+    writer.write_definition()
+    return writer
+
+
+def test_arrow_writer_switches_to_csv_at_close(tmp_path):
+    path = tmp_path / "t.var"
+    writer = make_writer(path)
+    writer.write_data({"uid": 1, "score": 1.5})
+    writer.write_data({"uid": 2, "score": "[1.0, 2.0]"})
+    writer.close()
+    assert writer.csvfmt
+    assert writer.wf.closed
+    reader = FileReader(path)
+    assert reader.csvfmt
+    rows = [data for _, _, data in reader.loop_data()]
+    assert rows == [{"uid": 1, "score": 1.5}, {"uid": 2, "score": "1.0,2.0"}]
+
+
+def test_arrow_writer_keeps_arrow_without_list_values(tmp_path):
+    path = tmp_path / "t.var"
+    writer = make_writer(path)
+    writer.write_data({"uid": 1, "score": 1.5})
+    writer.close()
+    reader = FileReader(path)
+    assert reader.arrowfmt
+    rows = [data for _, _, data in reader.loop_data()]
+    assert rows == [{"uid": 1, "score": 1.5}]
+
+
+def test_tsv_writer_declares_encoding(tmp_path, monkeypatch):
+    import oakvar.lib.util.util as util
+
+    path = tmp_path / "t.crs"
+    writer = FileWriter(path, fmt="tsv")
+    writer.add_columns([{"name": "uid", "title": "UID", "type": "int"}])
+    writer.write_definition()
+    writer.write_data({"uid": "1"})
+    writer.close()
+
+    def fail_detection(*_):
+        raise AssertionError("encoding detection should be skipped")
+
+    monkeypatch.setattr(util, "detect_encoding", fail_detection)
+    reader = FileReader(path)
+    assert reader.encoding == "utf-8"
+    assert [data for _, _, data in reader.loop_data()] == [{"uid": 1}]